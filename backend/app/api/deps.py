@@ -1,12 +1,15 @@
 from typing import Annotated, Generator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import JWTError
 from sqlmodel import Session
 
-from app.core.database import get_session
+from app.core.database import get_session, get_async_session, get_read_session, get_async_read_session
 from app.core.config import settings
 from app.models.user_model import User, UserRole, UserArea
+from app.core.principal import Principal
+from app.core.security import decode_token, ACCESS_TOKEN_TYPE
+from app.core.token_revocation import revocations
 
 # Configuración de OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/login/access-token")
@@ -14,45 +17,65 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/login/acce
 # --- 1. Dependencia de Base de Datos ---
 # Creamos un alias para que 'get_db' funcione igual que 'get_session'
 get_db = get_session
+# Versión asíncrona (AsyncSession) para endpoints 'async def'
+get_async_db = get_async_session
+
+# Lecturas públicas: se enrutan a la réplica (si existe) con respaldo al primario.
+# Un endpoint de solo lectura se suscribe cambiando Depends(get_db) por Depends(get_read_db).
+get_read_db = get_read_session
+get_async_read_db = get_async_read_session
 
 # --- 2. Obtener Usuario Actual (Validar Token) ---
 async def get_current_user(
         token: Annotated[str, Depends(oauth2_scheme)],
-        session: Annotated[Session, Depends(get_db)]
-) -> User:
+) -> Principal:
+    """
+    Regresa una foto inmutable del usuario (Principal) con rol, área, carrera y estado.
+    Sale de los claims del access token y de la lista de revocados en memoria:
+    no se consulta la BD. Para modificar el registro del propio usuario usar get_current_db_user.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudieron validar las credenciales",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        # Decodificar el token
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+        # Decodificar el token (firma, expiración y tipo)
+        payload = decode_token(token, ACCESS_TOKEN_TYPE)
+        principal = Principal.from_claims(payload)
+    except (JWTError, KeyError, ValueError):
+        # Tokens sin claims (emitidos antes de esta versión) también caen aquí: volver a iniciar sesión
         raise credentials_exception
 
-    # Buscar usuario en BD
-    user = session.get(User, int(user_id))
-    if user is None:
+    # Revocado: usuario editado/desactivado/borrado después de emitir el token
+    if revocations.is_revoked(payload):
         raise credentials_exception
 
+    return principal
+
+
+# --- 2.1 Registro completo del usuario actual (perfil propio) ---
+def get_current_db_user(
+        current_user: Annotated[Principal, Depends(get_current_user)],
+        session: Annotated[Session, Depends(get_db)]
+) -> User:
+    user = session.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No se pudieron validar las credenciales")
     return user
 
 # --- 3. Obtener Usuario Activo ---
 def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Usuario inactivo")
     return current_user
 
 # --- 4. Obtener Superusuario (Admin) ---
 def get_current_active_superuser(
-    current_user: User = Depends(get_current_active_user),
-) -> User:
+    current_user: Principal = Depends(get_current_active_user),
+) -> Principal:
     if current_user.role != UserRole.ADMIN_SYS:
         raise HTTPException(
             status_code=403, detail="El usuario no tiene suficientes privilegios"
@@ -61,8 +84,8 @@ def get_current_active_superuser(
 
 # --- 5. Obtener Gestor de Becas ---
 def get_becas_manager(
-    current_user: User = Depends(get_current_active_user),
-) -> User:
+    current_user: Principal = Depends(get_current_active_user),
+) -> Principal:
     # Tienen acceso: Admins, Mesa Directiva, o cualquier miembro asignado al Área de Becas
     if current_user.role not in [UserRole.ADMIN_SYS, UserRole.ESTRUCTURA]:
         if current_user.area != UserArea.BECAS:
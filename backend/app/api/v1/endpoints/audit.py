@@ -1,11 +1,13 @@
 import os
 import subprocess
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from fastapi.responses import FileResponse
 from sqlmodel import Session, select
 from app.core.database import get_session
 from app.core.config import settings
+from app.core.pagination import keyset_paginate
 from app.models.audit_model import AuditLog
 from app.models.user_model import User, UserRole
 from app.api.deps import get_current_user
@@ -15,17 +17,27 @@ router = APIRouter()
 
 @router.get("/")
 def get_audit_logs(
+        response: Response,
         module: str = None,
         limit: int = 100,
+        cursor: Optional[str] = None,
         session: Session = Depends(get_session),
         current_user: User = Depends(get_current_user)
 ):
+    """
+    Bitácora ordenada de lo más reciente a lo más antiguo.
+    Para seguir paginando, enviar como 'cursor' el valor del header X-Next-Cursor.
+    """
     if current_user.role != UserRole.ADMIN_SYS:
         raise HTTPException(status_code=403, detail="No autorizado")
-    query = select(AuditLog).order_by(AuditLog.created_at.desc())
+    query = select(AuditLog)
     if module:
         query = query.where(AuditLog.module == module)
-    return session.exec(query.limit(limit)).all()
+
+    logs, next_cursor = keyset_paginate(session, query, AuditLog.created_at, AuditLog.id, cursor, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return logs
 
 
 @router.get("/dump")
@@ -2,7 +2,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
 
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
 from app.models.user_model import User, UserRole
 from app.models.career_model import Career
 from app.schemas.career_schema import CareerCreate, CareerRead, CareerUpdate
@@ -14,7 +14,7 @@ router = APIRouter()
 # --- PÚBLICO: LISTAR CARRERAS ---
 @router.get("/", response_model=List[CareerRead])
 def read_careers(
-        session: Session = Depends(get_session),
+        session: Session = Depends(get_read_session),
         active_only: bool = False  # Cambiamos a False por defecto para que el Admin vea todas
 ):
     query = select(Career)
@@ -1,20 +1,20 @@
-import shutil
-import os
-from uuid import uuid4
 from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Request, BackgroundTasks, File, UploadFile, Form, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, File, UploadFile, Form, Query
 from sqlmodel import Session, select, func
 from pydantic import BaseModel
 
 from app.core.config import settings
-from app.core.database import get_session
+from app.core.database import get_session, get_async_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.pagination import paginate, keyset_paginate, encode_cursor
 from app.models.user_model import User, UserRole
 from app.models.complaint_model import Complaint, ComplaintStatus
 from app.schemas.complaint_schema import ComplaintCreate, ComplaintRead
 from app.api.deps import get_current_user
 from app.core.limiter import limiter
-from app.core.email_utils import send_email_background
+from app.core.email_utils import queue_email
+from app.services.upload_service import store_upload, DOCUMENT_TYPES
 
 # URL base para los correos
 PORTAL_TRANSPARENCIA_URL = "https://ceitm.ddnsking.com/buzon"
@@ -34,8 +34,9 @@ class ComplaintTrackPublic(BaseModel):
 
 # 👇 NUEVO: Esquema para Paginación de Quejas
 class PaginatedComplaints(BaseModel):
-    total: int
+    total: Optional[int] = None  # None en modo cursor: el total ya vino en la primera página
     items: List[ComplaintRead]
+    next_cursor: Optional[str] = None
 
 
 # --- UTILIDAD: GENERAR FOLIO ---
@@ -50,10 +51,9 @@ def generate_tracking_code(session: Session) -> str:
 # 1. PÚBLICO: CREAR QUEJA (CON FOLIO Y EVIDENCIA)
 # ==========================================
 @router.post("/", response_model=ComplaintRead)
-@limiter.limit("5/minute")
+@limiter.limit(settings.RATE_LIMIT_COMPLAINT_CREATE)
 def create_complaint(
         request: Request,
-        background_tasks: BackgroundTasks,
         full_name: str = Form(...),
         control_number: str = Form(...),
         phone_number: str = Form(...),
@@ -69,15 +69,10 @@ def create_complaint(
     evidence_url = None
 
     if evidencia:
-        upload_dir = "static/uploads/quejas"
-        os.makedirs(upload_dir, exist_ok=True)
         try:
-            ext = evidencia.filename.split(".")[-1]
-            filename = f"{uuid4()}.{ext}"
-            file_path = os.path.join(upload_dir, filename)
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(evidencia.file, buffer)
-            evidence_url = f"{settings.DOMAIN}/{file_path}"
+            evidence_url = store_upload(evidencia, DOCUMENT_TYPES, settings.UPLOAD_MAX_FILE_BYTES)
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"Error subiendo evidencia de queja: {e}")
 
@@ -96,9 +91,8 @@ def create_complaint(
     )
 
     session.add(complaint)
-    session.commit()
-    session.refresh(complaint)
 
+    # El correo se guarda con el mismo commit que la queja (lo envía el worker de correo)
     if email:
         try:
             email_data = {
@@ -106,15 +100,18 @@ def create_complaint(
                 "folio": tracking_code,
                 "portal_url": PORTAL_TRANSPARENCIA_URL
             }
-            send_email_background(
-                background_tasks=background_tasks,
+            queue_email(
+                session=session,
                 subject=f"Reporte Recibido: {tracking_code}",
                 email_to=email,
                 template_name="complaint_received.html",
                 context=email_data
             )
         except Exception as e:
-            print(f"Error enviando correo de confirmación: {e}")
+            print(f"Error encolando correo de confirmación: {e}")
+
+    session.commit()
+    session.refresh(complaint)
 
     return complaint
 
@@ -123,14 +120,14 @@ def create_complaint(
 # 2. PÚBLICO: RASTREAR QUEJA (POR FOLIO)
 # ==========================================
 @router.get("/track/{tracking_code}", response_model=ComplaintTrackPublic)
-@limiter.limit("10/minute")
-def track_complaint(
+@limiter.limit(settings.RATE_LIMIT_COMPLAINT_TRACK)
+async def track_complaint(
         request: Request,
         tracking_code: str,
-        session: Session = Depends(get_session)
+        session: AsyncSession = Depends(get_async_session)
 ):
     statement = select(Complaint).where(Complaint.tracking_code == tracking_code.upper())
-    complaint = session.exec(statement).first()
+    complaint = (await session.exec(statement)).first()
 
     if not complaint:
         raise HTTPException(status_code=404, detail="Folio no encontrado.")
@@ -144,7 +141,6 @@ def track_complaint(
 @router.put("/{complaint_id}/resolve", response_model=ComplaintRead)
 def resolve_complaint(
         complaint_id: int,
-        background_tasks: BackgroundTasks,
         status: str = Form(...),
         admin_response: str = Form(...),
         evidencia: UploadFile = File(None),
@@ -159,15 +155,12 @@ def resolve_complaint(
         raise HTTPException(status_code=404, detail="Queja no encontrada")
 
     if evidencia:
-        upload_dir = "static/uploads/resoluciones"
-        os.makedirs(upload_dir, exist_ok=True)
         try:
-            file_ext = evidencia.filename.split(".")[-1]
-            unique_filename = f"{uuid4()}.{file_ext}"
-            file_path = os.path.join(upload_dir, unique_filename)
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(evidencia.file, buffer)
-            complaint.resolution_evidence_url = f"{settings.DOMAIN}/{file_path}"
+            complaint.resolution_evidence_url = store_upload(
+                evidencia, DOCUMENT_TYPES, settings.UPLOAD_MAX_FILE_BYTES
+            )
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"Error subiendo evidencia resolución: {e}")
 
@@ -180,8 +173,6 @@ def resolve_complaint(
     complaint.resolved_at = datetime.utcnow()
 
     session.add(complaint)
-    session.commit()
-    session.refresh(complaint)
 
     if complaint.email:
         try:
@@ -200,15 +191,18 @@ def resolve_complaint(
                 "evidence_url": complaint.resolution_evidence_url,
                 "portal_url": PORTAL_TRANSPARENCIA_URL
             }
-            send_email_background(
-                background_tasks=background_tasks,
+            queue_email(
+                session=session,
                 subject=subject,
                 email_to=complaint.email,
                 template_name=template,
                 context=email_data
             )
         except Exception as e:
-            print(f"Error enviando correo resolución: {e}")
+            print(f"Error encolando correo resolución: {e}")
+
+    session.commit()
+    session.refresh(complaint)
 
     return complaint
 
@@ -223,6 +217,7 @@ def read_complaints(
         search: Optional[str] = Query(None),
         status: Optional[str] = Query(None),
         career: Optional[str] = Query(None),
+        cursor: Optional[str] = Query(None, description="Cursor de la página anterior (modo keyset)"),
         session: Session = Depends(get_session),
         current_user: User = Depends(get_current_user)
 ):
@@ -248,15 +243,22 @@ def read_complaints(
             (Complaint.control_number.icontains(search))
         )
 
-    # Contar total
-    all_matching = session.exec(base_query).all()
-    total = len(all_matching)
+    # Modo cursor (keyset): sin OFFSET y sin volver a contar (el total se pide en la primera página)
+    if cursor:
+        complaints, next_cursor = keyset_paginate(
+            session, base_query, Complaint.created_at, Complaint.id, cursor, limit
+        )
+        return PaginatedComplaints(items=complaints, next_cursor=next_cursor)
 
-    # Paginar
-    query = base_query.order_by(Complaint.created_at.desc()).offset(skip).limit(limit)
-    complaints = session.exec(query).all()
+    # Contar total (COUNT en SQL) y paginar
+    total, complaints = paginate(
+        session, base_query, skip, limit, Complaint.created_at.desc(), Complaint.id.desc()
+    )
+    next_cursor = None
+    if complaints and skip + len(complaints) < total:
+        next_cursor = encode_cursor(complaints[-1].created_at, complaints[-1].id)
 
-    return PaginatedComplaints(total=total, items=complaints)
+    return PaginatedComplaints(total=total, items=complaints, next_cursor=next_cursor)
 
 
 # ==========================================
@@ -3,7 +3,8 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlmodel import Session, select
 from pydantic import BaseModel
 
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
+from app.core.pagination import paginate
 from app.models.convenio_model import Convenio, ConvenioCreate, ConvenioRead
 
 from app.api.deps import get_current_user
@@ -23,7 +24,7 @@ class PaginatedConvenios(BaseModel):
 # 1. PÚBLICO: OBTENER TODOS LOS CONVENIOS (Lista plana)
 # ==========================================
 @router.get("/all", response_model=List[ConvenioRead])
-def read_all_convenios(session: Session = Depends(get_session)):
+def read_all_convenios(session: Session = Depends(get_read_session)):
     """
     Endpoint para la página pública. Devuelve todos los convenios sin paginar.
     """
@@ -50,13 +51,8 @@ def read_convenios_paginated(
             (Convenio.descripcion.icontains(search))
         )
 
-    # Contamos total de registros
-    all_matching = session.exec(base_query).all()
-    total = len(all_matching)
-
-    # Paginamos
-    query = base_query.order_by(Convenio.id.desc()).offset(skip).limit(limit)
-    convenios = session.exec(query).all()
+    # Contamos total de registros (COUNT en SQL) y paginamos
+    total, convenios = paginate(session, base_query, skip, limit, Convenio.id.desc())
 
     return PaginatedConvenios(total=total, items=convenios)
 
@@ -91,7 +87,7 @@ def create_convenio(
 # 4. PÚBLICO/PRIVADO: OBTENER CONVENIO POR ID
 # ==========================================
 @router.get("/{convenio_id}", response_model=ConvenioRead)
-def read_convenio(convenio_id: int, session: Session = Depends(get_session)):
+def read_convenio(convenio_id: int, session: Session = Depends(get_read_session)):
     convenio = session.get(Convenio, convenio_id)
     if not convenio:
         raise HTTPException(status_code=404, detail="Convenio no encontrado")
@@ -3,7 +3,8 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select
 from pydantic import BaseModel
 
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
+from app.core.pagination import paginate
 from app.models.document_model import Document, DocumentCategory
 from app.models.user_model import User, UserRole
 from app.schemas.document_schema import DocumentCreate, DocumentUpdate, DocumentPublic
@@ -21,7 +22,7 @@ class PaginatedDocuments(BaseModel):
 @router.get("/", response_model=List[DocumentPublic])
 def read_documents(
         category: Optional[DocumentCategory] = None,
-        session: Session = Depends(get_session)
+        session: Session = Depends(get_read_session)
 ):
     """
     Obtener lista de documentos públicos.
@@ -58,13 +59,8 @@ def read_all_documents_paginated(
             (Document.category.icontains(search))
         )
 
-    # Contar total
-    all_docs = session.exec(base_query).all()
-    total = len(all_docs)
-
-    # Paginar
-    query = base_query.order_by(Document.created_at.desc()).offset(skip).limit(limit)
-    docs = session.exec(query).all()
+    # Contar total (COUNT en SQL) y paginar
+    total, docs = paginate(session, base_query, skip, limit, Document.created_at.desc())
 
     return PaginatedDocuments(total=total, items=docs)
 
@@ -1,14 +1,20 @@
 from typing import Annotated
-from datetime import timedelta
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Request # <--- AGREGADO: Request
 from fastapi.security import OAuth2PasswordRequestForm
+from jose import JWTError
 from sqlmodel import Session, select
 
 from app.core.database import get_session
-from app.core.security import create_access_token, verify_password
+from app.core.security import (
+    create_access_token, create_refresh_token, decode_token, verify_and_update_password, REFRESH_TOKEN_TYPE
+)
 from app.core.config import settings
+from app.core.principal import Principal
+from app.core.principal_cache import load_principal
+from app.core.token_revocation import revocations, revoke_token
 from app.models.user_model import User
-from app.models.token import Token
+from app.models.token import Token, RefreshTokenRequest
 from app.core.audit_logger import log_action
 from app.core.limiter import limiter
 
@@ -16,7 +22,7 @@ router = APIRouter()
 
 
 @router.post("/login/access-token", response_model=Token)
-@limiter.limit("5/minute") # 🛡️ PROTECCIÓN: Máx 5 intentos por minuto por IP
+@limiter.limit(settings.RATE_LIMIT_LOGIN) # 🛡️ PROTECCIÓN: Máx intentos por minuto por IP
 def login_access_token(
         request: Request, # <--- OBLIGATORIO: SlowAPI necesita el objeto Request para leer la IP
         session: Annotated[Session, Depends(get_session)],
@@ -28,8 +34,9 @@ def login_access_token(
     # 1. Buscar usuario por email (username en el formulario cuenta como email)
     user = session.exec(select(User).where(User.email == form_data.username)).first()
 
-    # 2. Validar usuario y contraseña
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # 2. Validar usuario y contraseña (bcrypt corre en su propio pool, ver core/security.py)
+    valid, new_hash = verify_and_update_password(form_data.password, user.hashed_password) if user else (False, None)
+    if not valid:
         # Nota: Podríamos loguear intentos fallidos aquí, pero requiere cuidado para no llenar la BD
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -41,11 +48,14 @@ def login_access_token(
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Usuario inactivo")
 
-    # 4. Crear el token de acceso
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        subject=user.id, expires_delta=access_token_expires
-    )
+    # Si el hash tenía otro costo de bcrypt, se guarda el nuevo (se confirma junto con la bitácora)
+    if new_hash:
+        user.hashed_password = new_hash
+        session.add(user)
+
+    # 4. Crear el token de acceso (corto, con rol/área) y el de renovación
+    access_token = create_access_token(Principal.from_user(user))
+    refresh_token = create_refresh_token(user.id)
 
     # 👇 LOG: REGISTRO DE INICIO DE SESIÓN
     # Usamos el objeto 'user' que ya recuperamos de la base de datos
@@ -59,4 +69,54 @@ def login_access_token(
     )
     session.commit()
 
-    return Token(access_token=access_token, token_type="bearer")
\ No newline at end of file
+    return Token(access_token=access_token, token_type="bearer", refresh_token=refresh_token)
+
+
+@router.post("/login/refresh-token", response_model=Token)
+@limiter.limit(settings.RATE_LIMIT_REFRESH_TOKEN)
+def refresh_access_token(
+        request: Request,
+        body: RefreshTokenRequest,
+        session: Annotated[Session, Depends(get_session)],
+):
+    """
+    Cambia un refresh token vigente por un access token nuevo (con rol/área releídos
+    de la BD) y un refresh token nuevo. El usado queda revocado: cada uno sirve una sola vez.
+    """
+    invalid_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Sesión expirada, inicia sesión de nuevo",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = decode_token(body.refresh_token, REFRESH_TOKEN_TYPE)
+    except JWTError:
+        raise invalid_exception
+    if revocations.is_token_revoked(payload.get("jti")):
+        raise invalid_exception
+
+    # Rol/área/estado vigentes: de la caché de usuarios si no han cambiado, si no de la BD
+    principal = load_principal(session, int(payload["sub"]))
+    if not principal or not principal.is_active:
+        raise invalid_exception
+
+    # Rotación: si otro worker ya lo usó, el INSERT falla y esta petición se rechaza
+    if not revoke_token(payload["jti"], principal.id, datetime.utcfromtimestamp(payload["exp"])):
+        raise invalid_exception
+
+    return Token(
+        access_token=create_access_token(principal),
+        token_type="bearer",
+        refresh_token=create_refresh_token(principal.id),
+    )
+
+
+@router.post("/login/logout")
+def logout(body: RefreshTokenRequest):
+    """Revoca el refresh token de la sesión. El access token muere solo en unos minutos."""
+    try:
+        payload = decode_token(body.refresh_token, REFRESH_TOKEN_TYPE)
+    except JWTError:
+        return {"ok": True}  # Ya no servía de todos modos
+    revoke_token(payload["jti"], int(payload["sub"]), datetime.utcfromtimestamp(payload["exp"]))
+    return {"ok": True}
\ No newline at end of file
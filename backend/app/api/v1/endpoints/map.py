@@ -1,6 +1,7 @@
 from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select, col
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.api import deps
 from app.models.map_model import Building, Room
@@ -27,7 +28,7 @@ def check_map_permissions(current_user: User = Depends(deps.get_current_active_u
 
 @router.get("/buildings", response_model=List[BuildingRead])
 def read_buildings(
-        db: Session = Depends(deps.get_db),
+        db: Session = Depends(deps.get_read_db),
         skip: int = 0,
         limit: int = 100,
 ) -> Any:
@@ -37,9 +38,9 @@ def read_buildings(
 
 
 @router.get("/buildings/search", response_model=List[MapSearchResult])
-def search_map(
+async def search_map(
         q: str = Query(..., min_length=1),
-        db: Session = Depends(deps.get_db)
+        db: AsyncSession = Depends(deps.get_async_read_db)
 ) -> Any:
     """
     Buscador Híbrido: Devuelve lista mixta con CATEGORÍA para iconos correctos.
@@ -53,7 +54,7 @@ def search_map(
         (col(Building.code).ilike(f"%{query}%")) |
         (col(Building.tags).ilike(f"%{query}%"))
     )
-    buildings = db.exec(statement_buildings).all()
+    buildings = (await db.exec(statement_buildings)).all()
 
     for b in buildings:
         results.append(MapSearchResult(
@@ -70,7 +71,7 @@ def search_map(
     statement_rooms = select(Room, Building).join(Building).where(
         col(Room.name).ilike(f"%{query}%")
     )
-    rooms_data = db.exec(statement_rooms).all()
+    rooms_data = (await db.exec(statement_rooms)).all()
 
     for room, parent in rooms_data:
         results.append(MapSearchResult(
@@ -89,7 +90,7 @@ def search_map(
 @router.get("/buildings/{building_id}", response_model=BuildingWithRooms)
 def read_building(
         building_id: int,
-        db: Session = Depends(deps.get_db)
+        db: Session = Depends(deps.get_read_db)
 ) -> Any:
     """Obtener detalle de un edificio específico y sus salones."""
     building = db.get(Building, building_id)
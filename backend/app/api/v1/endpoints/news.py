@@ -5,7 +5,9 @@ from slugify import slugify
 from datetime import datetime
 from pydantic import BaseModel
 
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session, get_async_read_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.pagination import paginate
 from app.models.news_model import News
 from app.models.user_model import User, UserRole, UserArea  # 👇 AÑADIDO: Importamos UserArea
 from app.schemas.news_schema import NewsCreate, NewsUpdate, NewsPublic
@@ -45,8 +47,8 @@ def verify_news_manager(user: User):
 # 1. PÚBLICO: OBTENER NOTICIAS PUBLICADAS
 # ==========================================
 @router.get("/public", response_model=List[NewsPublic])
-def read_public_news(
-        session: Session = Depends(get_session),
+async def read_public_news(
+        session: AsyncSession = Depends(get_async_read_session),
         category: Optional[str] = Query(None, description="Filtrar por categoría (ej. BECAS, ACADEMICO)")
 ):
     """
@@ -57,7 +59,7 @@ def read_public_news(
         statement = statement.where(News.category == category)
 
     statement = statement.order_by(News.created_at.desc())
-    news = session.exec(statement).all()
+    news = (await session.exec(statement)).all()
     return news
 
 
@@ -84,11 +86,7 @@ def read_admin_news(
             (News.excerpt.icontains(search))
         )
 
-    all_matching = session.exec(base_query).all()
-    total = len(all_matching)
-
-    query = base_query.order_by(News.created_at.desc()).offset(skip).limit(limit)
-    news = session.exec(query).all()
+    total, news = paginate(session, base_query, skip, limit, News.created_at.desc())
 
     return PaginatedNews(total=total, items=news)
 
@@ -205,7 +203,7 @@ def delete_news(
 # 6. PÚBLICO: LEER NOTICIA POR SLUG (Debe ir al final)
 # ==========================================
 @router.get("/{slug}", response_model=NewsPublic)
-def read_single_news(slug: str, session: Session = Depends(get_session)):
+def read_single_news(slug: str, session: Session = Depends(get_read_session)):
     news = session.exec(select(News).where(News.slug == slug)).first()
     if not news:
         raise HTTPException(status_code=404, detail="Noticia no encontrada")
@@ -1,14 +1,18 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Request, BackgroundTasks, Query
-from fastapi.responses import StreamingResponse
+import os
+from typing import BinaryIO, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session, select
 from sqlalchemy.orm import selectinload
-from sqlalchemy import func  # 👇 IMPORTANTE PARA CONTEO DINÁMICO
+from sqlalchemy import func, update  # 👇 IMPORTANTE PARA CONTEO DINÁMICO
 from datetime import datetime
 from pydantic import BaseModel
-import io
 
-from app.core.database import get_session
+from app.core.database import (
+    engine, get_session, get_async_session, get_read_session, get_async_read_session, read_session_scope
+)
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.user_model import User, UserRole, UserArea
 from app.models.scholarship_model import Scholarship, ScholarshipApplication, ApplicationStatus, ScholarshipQuota, \
     ScholarshipPeriod, Cafeteria
@@ -22,9 +26,12 @@ from app.schemas.scholarship_schema import (
 )
 from app.api.deps import get_current_user
 from app.core.limiter import limiter
-from app.core.email_utils import send_email_background
+from app.core.email_utils import queue_email
 from app.core.config import settings
-from app.services.pdf_service import generate_scholarship_pdf
+from app.core.pagination import paginate, keyset_paginate, encode_cursor
+from app.core.cache import TTLCache
+from app.services.pdf_service import generate_scholarship_pdf, RenderQueueFull, PDF_GENERATION_ERRORS
+from app.services import pdf_cache, export_service
 
 router = APIRouter()
 
@@ -35,14 +42,22 @@ def get_frontend_url():
     return "https://ceitm.ddnsking.com"
 
 
+# Caché corta para el listado público de cafeterías (se invalida al asignar/dictaminar becas)
+cafeterias_cache = TTLCache(
+    "cafeterias", ttl_seconds=30,
+    fresh_seconds=settings.READ_REPLICA_LAG_SECONDS, redis_url=settings.CACHE_REDIS_URL,
+)
+
+
 class PaginatedScholarships(BaseModel):
     total: int
     items: List[ScholarshipRead]
 
 
 class PaginatedApplications(BaseModel):
-    total: int
+    total: Optional[int] = None  # None en modo cursor: el total ya vino en la primera página
     items: List[ApplicationRead]
+    next_cursor: Optional[str] = None
 
 
 # ==========================================
@@ -86,9 +101,102 @@ def generate_release_folio(
     return f"{activity_code}{control}{type_code}{year_short}{period_letter}"
 
 
-def sync_student_record(session: Session, application_in: ApplicationCreate) -> Student:
-    student = session.get(Student, application_in.control_number)
-    career_obj = session.exec(select(Career).where(Career.name == application_in.career)).first()
+# Estados que ocupan un lugar en el cupo de la carrera
+COUNTED_STATUSES = [ApplicationStatus.APROBADA, ApplicationStatus.LIBERADA]
+
+
+def reserve_quota_slot(session: Session, scholarship_id: int, career: str, enforce_limit: bool = True) -> None:
+    """
+    Aparta un lugar en el cupo de la carrera de forma atómica:
+    UPDATE ... SET used_slots = used_slots + 1 WHERE used_slots < total_slots RETURNING id.
+    La fila queda bloqueada hasta el commit, así dos dictámenes simultáneos no pueden sobrepasar el cupo.
+    No hace commit: debe ir en la misma transacción que el cambio de estatus.
+    """
+    statement = (
+        update(ScholarshipQuota)
+        .where(ScholarshipQuota.scholarship_id == scholarship_id)
+        .where(ScholarshipQuota.career_name == career)
+        .values(used_slots=ScholarshipQuota.used_slots + 1)
+        .returning(ScholarshipQuota.id)
+    )
+    if enforce_limit:
+        statement = statement.where(ScholarshipQuota.used_slots < ScholarshipQuota.total_slots)
+
+    if session.execute(statement).first() is not None:
+        return
+
+    # Ninguna fila actualizada: o la carrera no tiene cupo configurado (se permite) o ya está lleno
+    quota_exists = session.exec(
+        select(ScholarshipQuota.id)
+        .where(ScholarshipQuota.scholarship_id == scholarship_id)
+        .where(ScholarshipQuota.career_name == career)
+    ).first()
+    if quota_exists is not None:
+        raise HTTPException(status_code=400, detail="¡Cupo Lleno para esta carrera!")
+
+
+def release_quota_slot(session: Session, scholarship_id: int, career: str) -> None:
+    """Libera un lugar del cupo de forma atómica (nunca baja de 0). No hace commit."""
+    session.execute(
+        update(ScholarshipQuota)
+        .where(ScholarshipQuota.scholarship_id == scholarship_id)
+        .where(ScholarshipQuota.career_name == career)
+        .where(ScholarshipQuota.used_slots > 0)
+        .values(used_slots=ScholarshipQuota.used_slots - 1)
+    )
+
+
+def approved_counts_subquery(scholarship_id: int):
+    """Lugares realmente ocupados por carrera (solicitudes en COUNTED_STATUSES), con un solo GROUP BY."""
+    return (
+        select(
+            ScholarshipApplication.career.label("career"),
+            func.count(ScholarshipApplication.id).label("real_used")
+        )
+        .where(
+            ScholarshipApplication.scholarship_id == scholarship_id,
+            ScholarshipApplication.status.in_(COUNTED_STATUSES)
+        )
+        .group_by(ScholarshipApplication.career)
+        .subquery()
+    )
+
+
+def reconcile_quota_usage(session: Session, scholarship_id: int, quota_ids: List[int]) -> None:
+    """
+    Corrige 'used_slots' de los cupos indicados con el conteo real. No hace commit.
+    Primero bloquea las filas (FOR UPDATE) y DESPUÉS cuenta: un dictamen en curso ya tiene la fila
+    bloqueada por reserve_quota_slot, así que esperamos su commit y el conteo ya lo incluye.
+    El conteo va dentro del mismo UPDATE (subconsulta correlacionada) y no en Python: contar
+    antes y escribir el número absoluto después borraría las reservas hechas en medio.
+    """
+    session.exec(
+        select(ScholarshipQuota.id)
+        .where(ScholarshipQuota.id.in_(quota_ids))
+        .order_by(ScholarshipQuota.id)
+        .with_for_update()
+    ).all()
+
+    real_used = (
+        select(func.count(ScholarshipApplication.id))
+        .where(
+            ScholarshipApplication.scholarship_id == scholarship_id,
+            ScholarshipApplication.career == ScholarshipQuota.career_name,
+            ScholarshipApplication.status.in_(COUNTED_STATUSES)
+        )
+        .scalar_subquery()
+    )
+    session.execute(
+        update(ScholarshipQuota)
+        .where(ScholarshipQuota.id.in_(quota_ids))
+        .values(used_slots=real_used)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def sync_student_record(session: AsyncSession, application_in: ApplicationCreate) -> Student:
+    student = await session.get(Student, application_in.control_number)
+    career_obj = (await session.exec(select(Career).where(Career.name == application_in.career))).first()
     career_id = career_obj.id if career_obj else None
 
     if student:
@@ -172,25 +280,22 @@ def get_quotas(
                                  UserRole.CONCEJAL] and current_user.area != UserArea.BECAS:
         raise HTTPException(status_code=403, detail="No autorizado")
 
-    quotas = session.exec(select(ScholarshipQuota).where(ScholarshipQuota.scholarship_id == scholarship_id)).all()
-
-    # 👇 CORRECCIÓN CLAVE: Sincronizar 'used_slots' contando en tiempo real las solicitudes aprobadas
-    for quota in quotas:
-        real_used = session.exec(
-            select(func.count(ScholarshipApplication.id)).where(
-                ScholarshipApplication.scholarship_id == scholarship_id,
-                ScholarshipApplication.career == quota.career_name,
-                ScholarshipApplication.status.in_([ApplicationStatus.APROBADA, ApplicationStatus.LIBERADA])
-            )
-        ).one()
+    approved_counts = approved_counts_subquery(scholarship_id)
+    rows = session.exec(
+        select(ScholarshipQuota, func.coalesce(approved_counts.c.real_used, 0))
+        .outerjoin(approved_counts, approved_counts.c.career == ScholarshipQuota.career_name)
+        .where(ScholarshipQuota.scholarship_id == scholarship_id)
+        .order_by(ScholarshipQuota.id)
+    ).all()
 
-        # Si había desfase manual, la base de datos se auto-repara
-        if quota.used_slots != real_used:
-            quota.used_slots = real_used
-            session.add(quota)
+    # Si había desfase manual, la base de datos se auto-repara.
+    # El polling normal no escribe: solo se bloquean y corrigen las filas que realmente cambiaron.
+    drifted_ids = [quota.id for quota, real_used in rows if quota.used_slots != real_used]
+    if drifted_ids:
+        reconcile_quota_usage(session, scholarship_id, drifted_ids)
+        session.commit()
 
-    session.commit()
-    return quotas
+    return [quota for quota, _ in rows]
 
 
 @router.patch("/quotas/{quota_id}", response_model=ScholarshipQuotaRead)
@@ -224,48 +329,46 @@ def update_quota(
 # 3. ENDPOINTS DE SOLICITUD
 # ==========================================
 @router.post("/apply", response_model=ApplicationRead)
-@limiter.limit("5/minute")
-def submit_application(
+@limiter.limit(settings.RATE_LIMIT_SCHOLARSHIP_APPLY)
+async def submit_application(
         request: Request,
         application_in: ApplicationCreate,
-        background_tasks: BackgroundTasks,
-        session: Session = Depends(get_session)
+        session: AsyncSession = Depends(get_async_session)
 ):
-    scholarship = session.get(Scholarship, application_in.scholarship_id)
+    scholarship = await session.get(Scholarship, application_in.scholarship_id)
     if not scholarship or not scholarship.is_active:
         raise HTTPException(status_code=400, detail="La convocatoria no está activa")
 
-    student = sync_student_record(session, application_in)
+    student = await sync_student_record(session, application_in)
 
-    existing = session.exec(
+    existing = (await session.exec(
         select(ScholarshipApplication)
         .where(ScholarshipApplication.control_number == application_in.control_number)
         .where(ScholarshipApplication.scholarship_id == application_in.scholarship_id)
-    ).first()
+    )).first()
 
+    resubmitted = False
     if existing:
         if existing.status in [ApplicationStatus.DOCUMENTACION_FALTANTE, ApplicationStatus.RECHAZADA]:
             existing.sqlmodel_update(application_in.model_dump(exclude_unset=True))
             existing.status = ApplicationStatus.PENDIENTE
             existing.admin_comments = None
             session.add(existing)
-            session.commit()
-            session.refresh(existing)
             application = existing
+            resubmitted = True
         else:
             raise HTTPException(status_code=400, detail="Ya tienes una solicitud activa para esta beca.")
     else:
         application = ScholarshipApplication.model_validate(application_in)
         application.student_id = student.control_number
         session.add(application)
-        session.commit()
-        session.refresh(application)
 
+    # El acuse se guarda con el mismo commit que la solicitud (lo envía el worker de correo)
     try:
         scholarship_name = scholarship.name
         frontend_link = f"{get_frontend_url()}/becas/resultados"
-        send_email_background(
-            background_tasks,
+        queue_email(
+            session,
             subject=f"📝 Solicitud Recibida: {scholarship_name}",
             email_to=application.email,
             template_name="complaint_received.html",
@@ -278,7 +381,14 @@ def submit_application(
             }
         )
     except Exception as e:
-        print(f"⚠️ Error enviando correo: {e}")
+        print(f"⚠️ Error encolando correo: {e}")
+
+    await session.commit()
+    await session.refresh(application)
+
+    if resubmitted:
+        cafeterias_cache.invalidate()
+        pdf_cache.invalidate(application.id)
 
     return application
 
@@ -358,26 +468,19 @@ def submit_application_admin(
     )
     
     session.add(application)
-    session.commit()
-    session.refresh(application)
 
-    # Actualizar cupo
-    quota = session.exec(
-        select(ScholarshipQuota)
-        .where(ScholarshipQuota.scholarship_id == application.scholarship_id)
-        .where(ScholarshipQuota.career_name == application.career)
-    ).first()
+    # Actualizar cupo (atómico, en la misma transacción; el admin puede exceder el límite)
+    reserve_quota_slot(session, application.scholarship_id, application.career, enforce_limit=False)
 
-    if quota:
-        quota.used_slots += 1
-        session.add(quota)
-        session.commit()
+    session.commit()
+    session.refresh(application)
+    cafeterias_cache.invalidate()
 
     return application
 
 
 @router.get("/all", response_model=List[ScholarshipRead])
-def read_all_scholarships(active_only: bool = True, session: Session = Depends(get_session)):
+def read_all_scholarships(active_only: bool = True, session: Session = Depends(get_read_session)):
     query = select(Scholarship).options(selectinload(Scholarship.quotas))
     if active_only:
         query = query.where(Scholarship.is_active == True)
@@ -399,11 +502,7 @@ def read_scholarships_paginated(
             (Scholarship.cycle.icontains(search))
         )
 
-    all_items = session.exec(query).all()
-    total = len(all_items)
-
-    query = query.order_by(Scholarship.id.desc()).offset(skip).limit(limit)
-    items = session.exec(query).all()
+    total, items = paginate(session, query, skip, limit, Scholarship.id.desc())
     return PaginatedScholarships(total=total, items=items)
 
 
@@ -429,6 +528,7 @@ def read_all_applications_paginated(
         limit: int = Query(10, ge=1, le=100),
         search: Optional[str] = Query(None),
         status: Optional[str] = Query(None),
+        cursor: Optional[str] = Query(None, description="Cursor de la página anterior (modo keyset)"),
         session: Session = Depends(get_session),
         current_user: User = Depends(get_current_user)
 ):
@@ -455,13 +555,22 @@ def read_all_applications_paginated(
             (ScholarshipApplication.full_name.icontains(search))
         )
 
-    all_items = session.exec(query).all()
-    total = len(all_items)
+    # Modo cursor: no usa OFFSET ni vuelve a contar, las páginas profundas cuestan lo mismo que la primera
+    if cursor:
+        items, next_cursor = keyset_paginate(
+            session, query, ScholarshipApplication.created_at, ScholarshipApplication.id, cursor, limit
+        )
+        return PaginatedApplications(items=items, next_cursor=next_cursor)
 
-    query = query.order_by(ScholarshipApplication.created_at.desc()).offset(skip).limit(limit)
-    items = session.exec(query).all()
+    total, items = paginate(
+        session, query, skip, limit,
+        ScholarshipApplication.created_at.desc(), ScholarshipApplication.id.desc()
+    )
+    next_cursor = None
+    if items and skip + len(items) < total:
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
 
-    return PaginatedApplications(total=total, items=items)
+    return PaginatedApplications(total=total, items=items, next_cursor=next_cursor)
 
 
 @router.patch("/{scholarship_id}", response_model=ScholarshipRead)
@@ -494,14 +603,16 @@ def update_scholarship(
 def update_application_status(
         application_id: int,
         application_in: ApplicationUpdate,
-        background_tasks: BackgroundTasks,
         session: Session = Depends(get_session),
         current_user: User = Depends(get_current_user),
 ):
+    # FOR UPDATE: si dos revisores dictaminan la misma solicitud a la vez, el segundo espera al primero
+    # y ve el estatus ya actualizado (evita apartar el mismo lugar dos veces).
     application = session.exec(
         select(ScholarshipApplication)
         .where(ScholarshipApplication.id == application_id)
         .options(selectinload(ScholarshipApplication.scholarship))
+        .with_for_update(of=ScholarshipApplication)
     ).first()
 
     if not application:
@@ -520,47 +631,17 @@ def update_application_status(
     if new_status and new_status != old_status:
         scholarship = application.scholarship or session.get(Scholarship, application.scholarship_id)
 
-        # 👇 CORRECCIÓN: Si pasa a ser APROBADA, revisamos cupos en tiempo real.
-        if new_status == ApplicationStatus.APROBADA:
-            quota = session.exec(
-                select(ScholarshipQuota)
-                .where(ScholarshipQuota.scholarship_id == application.scholarship_id)
-                .where(ScholarshipQuota.career_name == application.career)
-            ).first()
-
-            if quota:
-                real_used = session.exec(
-                    select(func.count(ScholarshipApplication.id)).where(
-                        ScholarshipApplication.scholarship_id == application.scholarship_id,
-                        ScholarshipApplication.career == application.career,
-                        ScholarshipApplication.status.in_([ApplicationStatus.APROBADA, ApplicationStatus.LIBERADA])
-                    )
-                ).one()
-
-                if real_used >= quota.total_slots and current_user.role != UserRole.ADMIN_SYS:
-                    raise HTTPException(status_code=400, detail="¡Cupo Lleno para esta carrera!")
-
-                quota.used_slots = real_used + 1
-                session.add(quota)
-
-        # 👇 CORRECCIÓN: Si se echa para atrás (Ej. Aprobada a Rechazada), actualizamos el cupo dinámicamente
-        elif old_status in [ApplicationStatus.APROBADA, ApplicationStatus.LIBERADA] and new_status not in [
-            ApplicationStatus.APROBADA, ApplicationStatus.LIBERADA]:
-            quota = session.exec(
-                select(ScholarshipQuota)
-                .where(ScholarshipQuota.scholarship_id == application.scholarship_id)
-                .where(ScholarshipQuota.career_name == application.career)
-            ).first()
-            if quota:
-                real_used = session.exec(
-                    select(func.count(ScholarshipApplication.id)).where(
-                        ScholarshipApplication.scholarship_id == application.scholarship_id,
-                        ScholarshipApplication.career == application.career,
-                        ScholarshipApplication.status.in_([ApplicationStatus.APROBADA, ApplicationStatus.LIBERADA])
-                    )
-                ).one()
-                quota.used_slots = max(0, real_used - 1)
-                session.add(quota)
+        # 👇 Cupos atómicos: al entrar a un estatus que ocupa lugar se aparta con un UPDATE condicional
+        # (WHERE used_slots < total_slots) y al salir se libera; sin recontar toda la tabla.
+        if new_status in COUNTED_STATUSES and old_status not in COUNTED_STATUSES:
+            reserve_quota_slot(
+                session, application.scholarship_id, application.career,
+                enforce_limit=current_user.role != UserRole.ADMIN_SYS
+            )
+
+        # Si se echa para atrás (Ej. Aprobada a Rechazada), liberamos el lugar
+        elif old_status in COUNTED_STATUSES and new_status not in COUNTED_STATUSES:
+            release_quota_slot(session, application.scholarship_id, application.career)
 
         if new_status == ApplicationStatus.LIBERADA:
             application.release_folio = generate_release_folio(
@@ -578,25 +659,63 @@ def update_application_status(
         setattr(application, key, value)
 
     session.add(application)
-    session.commit()
-    session.refresh(application)
 
+    # El aviso al alumno se guarda con el mismo commit que el dictamen (lo envía el worker de correo):
+    # un dictamen masivo ya no abre cientos de conexiones SMTP desde el servidor web
     if new_status != old_status:
         scholarship_name = application.scholarship.name if application.scholarship else "Beca"
         link = f"{get_frontend_url()}/becas/resultados"
 
         if new_status == ApplicationStatus.APROBADA:
-            send_email_background(background_tasks, f"✅ Aprobada: {scholarship_name}", application.email,
-                                  "accepted.html",
-                                  {"name": application.full_name, "scholarship_name": scholarship_name, "link": link})
+            queue_email(session, f"✅ Aprobada: {scholarship_name}", application.email,
+                        "accepted.html",
+                        {"name": application.full_name, "scholarship_name": scholarship_name, "link": link})
         elif new_status in [ApplicationStatus.RECHAZADA, ApplicationStatus.DOCUMENTACION_FALTANTE]:
-            send_email_background(background_tasks, f"⚠️ Aviso: {scholarship_name}", application.email, "rejected.html",
-                                  {"name": application.full_name, "scholarship_name": scholarship_name,
-                                   "observations": application.admin_comments, "link": link})
+            queue_email(session, f"⚠️ Aviso: {scholarship_name}", application.email, "rejected.html",
+                        {"name": application.full_name, "scholarship_name": scholarship_name,
+                         "observations": application.admin_comments, "link": link})
+
+    session.commit()
+    session.refresh(application)
+
+    if "status" in update_data or "cafeteria_asignada_id" in update_data:
+        cafeterias_cache.invalidate()
+
+    # El expediente PDF en caché ya no corresponde a la solicitud
+    pdf_cache.invalidate(application.id)
 
     return application
 
 
+PDF_CHUNK_SIZE = 64 * 1024  # Mismo tamaño de bloque que usa FileResponse
+
+
+def _pdf_file_response(handle: BinaryIO, filename: str) -> StreamingResponse:
+    """
+    Envía por bloques un expediente ya abierto y cierra el archivo al terminar.
+    No usamos FileResponse porque vuelve a abrir la ruta: si entre la consulta a la caché
+    y el envío otro worker desaloja el archivo, la descarga fallaría a medias.
+    """
+    def chunks():
+        try:
+            while True:
+                chunk = handle.read(PDF_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            handle.close()
+
+    return StreamingResponse(
+        chunks(),
+        media_type="application/pdf",
+        headers={
+            "Content-Length": str(os.fstat(handle.fileno()).st_size),
+            "Content-Disposition": f'attachment; filename="{filename}"',
+        },
+    )
+
+
 @router.get("/applications/{application_id}/download")
 async def download_application_pdf(
         application_id: int,
@@ -606,40 +725,163 @@ async def download_application_pdf(
     application = session.get(ScholarshipApplication, application_id)
     if not application: raise HTTPException(status_code=404, detail="No encontrada")
 
+    filename = f"{application.control_number}.pdf"
+
+    # Si el expediente no ha cambiado, lo servimos directo del disco (por bloques, sin cargarlo en memoria)
+    cached = await run_in_threadpool(pdf_cache.open_cached, application)
+    if cached:
+        return _pdf_file_response(cached, filename)
+
+    # El expediente se escribe en un archivo temporal y se publica en la caché.
+    # Lo abrimos ANTES de publicarlo: así el desalojo o una invalidación no nos lo quitan a medio envío
+    spool_path = pdf_cache.new_spool_file()
+    handle = None
     try:
-        pdf_bytes = await generate_scholarship_pdf(application)
-        return StreamingResponse(io.BytesIO(pdf_bytes), media_type="application/pdf", headers={
-            "Content-Disposition": f"attachment; filename={application.control_number}.pdf"})
-    except:
+        await generate_scholarship_pdf(application, spool_path)
+        handle = await run_in_threadpool(open, spool_path, "rb")
+        await run_in_threadpool(pdf_cache.store_file, application, spool_path)
+    except RenderQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except PDF_GENERATION_ERRORS as e:
+        print(f"❌ Error generando el expediente de la solicitud {application_id}: {e!r}")
+        if handle:
+            handle.close()
         raise HTTPException(status_code=500, detail="Error generando PDF")
+    finally:
+        pdf_cache.discard_spool_file(spool_path)  # No hace nada si ya se publicó
+
+    return _pdf_file_response(handle, filename)
+
+
+# ==========================================
+# EXPORTACIÓN MASIVA DE EXPEDIENTES
+# ==========================================
+def _can_see_all_applications(user: User) -> bool:
+    return user.role in [UserRole.ADMIN_SYS, UserRole.ESTRUCTURA] or user.area == UserArea.BECAS
+
+
+@router.post("/{scholarship_id}/export")
+async def start_applications_export(
+        scholarship_id: int,
+        status: Optional[ApplicationStatus] = Query(None),
+        career: Optional[str] = Query(None),
+        session: AsyncSession = Depends(get_async_session),
+        current_user: User = Depends(get_current_user)
+):
+    """
+    Lanza la exportación (un ZIP con un PDF por alumno) de todos los expedientes de una beca,
+    opcionalmente por estatus/carrera.
+    Regresa un job_id; el progreso se consulta en /exports/{job_id} y el archivo en /exports/{job_id}/download.
+    """
+    if not await session.get(Scholarship, scholarship_id):
+        raise HTTPException(status_code=404, detail="Beca no encontrada")
+
+    query = select(ScholarshipApplication.id).where(ScholarshipApplication.scholarship_id == scholarship_id)
+
+    # Mismas reglas de visibilidad que el listado de solicitudes
+    if _can_see_all_applications(current_user):
+        pass
+    elif current_user.role in [UserRole.CONCEJAL, UserRole.COORDINADOR] and current_user.career:
+        from sqlmodel import col
+        query = query.where(col(ScholarshipApplication.career).contains(current_user.career))
+    else:
+        raise HTTPException(status_code=403, detail="No tienes permisos para exportar solicitudes.")
+
+    if status:
+        query = query.where(ScholarshipApplication.status == status)
+    if career:
+        query = query.where(ScholarshipApplication.career == career)
+
+    application_ids = (await session.exec(
+        query.order_by(ScholarshipApplication.career, ScholarshipApplication.id))).all()
+    if not application_ids:
+        raise HTTPException(status_code=404, detail="No hay solicitudes con esos filtros")
+
+    return export_service.start_export(scholarship_id, list(application_ids), current_user.id)
+
+
+def _read_own_export(job_id: str, user: User) -> dict:
+    """
+    El ZIP puede contener expedientes filtrados por carrera: solo lo ve quien lo pidió
+    o alguien que de todos modos puede ver todas las solicitudes.
+    """
+    job = export_service.read_job(job_id)
+    if not job: raise HTTPException(status_code=404, detail="Exportación no encontrada")
+    if job.get("requester_id") != user.id and not _can_see_all_applications(user):
+        raise HTTPException(status_code=403, detail="No tienes permisos para ver esta exportación.")
+    return job
+
+
+@router.get("/exports/{job_id}")
+def read_export_progress(job_id: str, current_user: User = Depends(get_current_user)):
+    return _read_own_export(job_id, current_user)
+
+
+@router.get("/exports/{job_id}/download")
+def download_export(job_id: str, current_user: User = Depends(get_current_user)):
+    job = _read_own_export(job_id, current_user)
+    if job["status"] != "completado":
+        raise HTTPException(status_code=409, detail="La exportación aún no termina")
+
+    return FileResponse(export_service.result_path(job), media_type="application/zip",
+                        filename=f"expedientes_beca_{job['scholarship_id']}.zip")
 
 
 @router.get("/status/{control_number}", response_model=List[ApplicationPublicStatus])
-@limiter.limit("5/minute")
-def check_application_status(request: Request, control_number: str, session: Session = Depends(get_session)):
-    return session.exec(
+@limiter.limit(settings.RATE_LIMIT_SCHOLARSHIP_STATUS)
+async def check_application_status(
+        request: Request,
+        control_number: str,
+        session: AsyncSession = Depends(get_async_read_session)
+):
+    result = await session.exec(
         select(ScholarshipApplication).where(ScholarshipApplication.control_number == control_number).order_by(
-            ScholarshipApplication.created_at.desc())).all()
+            ScholarshipApplication.created_at.desc()))
+    return result.all()
 
 
 # --- NUEVO: GESTIÓN DE CAFETERÍAS ---
-@router.get("/cafeterias", response_model=List[CafeteriaRead])
-def read_cafeterias(session: Session = Depends(get_session)):
-    cafeterias = session.exec(select(Cafeteria)).all()
+def load_cafeterias_with_counts(session: Session) -> List[dict]:
+    """Cafeterías con sus becas asignadas en UNA sola consulta (LEFT JOIN + GROUP BY)."""
+    rows = session.exec(
+        select(Cafeteria, func.count(ScholarshipApplication.id))
+        .outerjoin(
+            ScholarshipApplication,
+            (ScholarshipApplication.cafeteria_asignada_id == Cafeteria.id) &
+            (ScholarshipApplication.status.in_(COUNTED_STATUSES))
+        )
+        .group_by(Cafeteria.id)
+        .order_by(Cafeteria.id)
+    ).all()
+
     result = []
-    for caf in cafeterias:
-        asignadas = session.exec(
-            select(func.count(ScholarshipApplication.id)).where(
-                ScholarshipApplication.cafeteria_asignada_id == caf.id,
-                ScholarshipApplication.status.in_([ApplicationStatus.APROBADA, ApplicationStatus.LIBERADA])
-            )
-        ).one()
+    for caf, asignadas in rows:
         caf_dict = caf.model_dump()
         caf_dict["becas_asignadas"] = asignadas
         result.append(caf_dict)
     return result
 
 
+def _load_cafeterias_from_replica() -> List[dict]:
+    with read_session_scope() as session:
+        return load_cafeterias_with_counts(session)
+
+
+def _load_cafeterias_from_primary() -> List[dict]:
+    # Justo después de un cambio la réplica puede no tenerlo aún: no guardarlo viejo en la caché
+    with Session(engine) as session:
+        return load_cafeterias_with_counts(session)
+
+
+@router.get("/cafeterias", response_model=List[CafeteriaRead])
+def read_cafeterias():
+    # Endpoint público: servimos desde caché para que el tráfico no escale la carga de la BD
+    # (solo se abre una sesión cuando hay que recalcular)
+    return cafeterias_cache.get_or_set(
+        "all", _load_cafeterias_from_replica, fresh_loader=_load_cafeterias_from_primary
+    )
+
+
 @router.post("/cafeterias", response_model=CafeteriaRead)
 def create_cafeteria(*, session: Session = Depends(get_session), cafeteria_in: CafeteriaCreate,
                      current_user: User = Depends(get_current_user)):
@@ -649,6 +891,7 @@ def create_cafeteria(*, session: Session = Depends(get_session), cafeteria_in: C
     session.add(cafeteria)
     session.commit()
     session.refresh(cafeteria)
+    cafeterias_cache.invalidate()
     return cafeteria
 
 
@@ -665,6 +908,7 @@ def update_cafeteria(*, session: Session = Depends(get_session), id: int, cafete
     session.add(cafeteria)
     session.commit()
     session.refresh(cafeteria)
+    cafeterias_cache.invalidate()
     return cafeteria
 
 
@@ -677,6 +921,7 @@ def delete_cafeteria(*, session: Session = Depends(get_session), id: int,
     if not cafeteria: raise HTTPException(status_code=404, detail="Cafetería no encontrada")
     session.delete(cafeteria)
     session.commit()
+    cafeterias_cache.invalidate()
     return {"ok": True}
 
 
@@ -702,4 +947,5 @@ def reset_cafeteria_assignments(
         session.add(app)
 
     session.commit()
+    cafeterias_cache.invalidate()
     return {"ok": True, "message": f"Se liberaron los cupos de {count} becarios."}
\ No newline at end of file
@@ -5,9 +5,11 @@ from sqlalchemy.orm import selectinload
 from datetime import datetime, timedelta # 👈 AGREGADO timedelta
 
 from app.core.database import get_session
+from app.core.pagination import count_query
 from app.models.user_model import User, UserRole, UserArea
 from app.models.student_model import Student
-from app.models.scholarship_model import ScholarshipApplication, ApplicationStatus
+from app.models.scholarship_model import Scholarship, ScholarshipApplication, ApplicationStatus
+from app.models.career_model import Career
 from app.models.attendance_model import Attendance, AttendanceStatus # 👈 AGREGADO para poder consultar las faltas
 from app.api.deps import get_current_user
 
@@ -66,97 +68,134 @@ def read_students(
         start_of_week = today - timedelta(days=today.weekday())
         end_of_week = start_of_week + timedelta(days=4)
 
-        # 👇 2. Consulta Base
-        base_query = select(Student).join(ScholarshipApplication).where(
-            ScholarshipApplication.status.in_([ApplicationStatus.APROBADA, ApplicationStatus.LIBERADA])
-        ).distinct()
-
-        # 👇 3. Búsqueda
+        counted = [ApplicationStatus.APROBADA, ApplicationStatus.LIBERADA]
+
+        # 👇 2. Subconsultas agregadas (todo se resuelve en UNA sola sentencia SQL)
+        # 2.1 Servicios totales y liberados por alumno
+        services = (
+            select(
+                ScholarshipApplication.student_id.label("student_id"),
+                func.count(ScholarshipApplication.id).label("total_services"),
+                func.count(ScholarshipApplication.id).filter(
+                    ScholarshipApplication.status == ApplicationStatus.LIBERADA
+                ).label("released_services")
+            )
+            .where(ScholarshipApplication.status.in_(counted))
+            .group_by(ScholarshipApplication.student_id)
+            .subquery()
+        )
+
+        # 2.2 Solicitud activa más reciente de cada alumno (ROW_NUMBER = 1 por alumno)
+        latest_app = (
+            select(
+                ScholarshipApplication.student_id.label("student_id"),
+                ScholarshipApplication.scholarship_id.label("scholarship_id"),
+                func.row_number().over(
+                    partition_by=ScholarshipApplication.student_id,
+                    order_by=(ScholarshipApplication.created_at.desc(), ScholarshipApplication.id.desc())
+                ).label("rn")
+            )
+            .where(ScholarshipApplication.status.in_(counted))
+            .subquery()
+        )
+
+        # 2.3 Faltas de la semana actual
+        week_faults = (
+            select(
+                Attendance.student_id.label("student_id"),
+                func.count(Attendance.id).label("faults")
+            )
+            .where(
+                Attendance.date >= start_of_week,
+                Attendance.date <= end_of_week,
+                Attendance.status == AttendanceStatus.FALTA
+            )
+            .group_by(Attendance.student_id)
+            .subquery()
+        )
+
+        # 👇 3. Consulta Base (el INNER JOIN con 'services' deja solo a los becarios aprobados/liberados)
+        query = (
+            select(
+                Student.control_number,
+                Student.full_name,
+                Student.email,
+                Student.is_blacklisted,
+                Career.name.label("career_name"),
+                Scholarship.type.label("scholarship_type"),
+                Scholarship.results_date,
+                services.c.total_services,
+                services.c.released_services,
+                func.coalesce(week_faults.c.faults, 0).label("faults"),
+                func.count().over().label("total_count")
+            )
+            .join(services, services.c.student_id == Student.control_number)
+            .join(latest_app, (latest_app.c.student_id == Student.control_number) & (latest_app.c.rn == 1))
+            .outerjoin(Scholarship, Scholarship.id == latest_app.c.scholarship_id)
+            .outerjoin(Career, Career.id == Student.career_id)
+            .outerjoin(week_faults, week_faults.c.student_id == Student.control_number)
+        )
+
+        # 👇 4. Búsqueda
         if search:
-            base_query = base_query.where(
+            query = query.where(
                 (Student.full_name.icontains(search)) |
                 (Student.control_number.icontains(search))
             )
 
-        # 👇 4. Ordenamiento Dinámico
+        # 👇 5. Ordenamiento Dinámico
         if sort_by == "name_asc":
-            base_query = base_query.order_by(Student.full_name.asc())
+            query = query.order_by(Student.full_name.asc())
         elif sort_by == "name_desc":
-            base_query = base_query.order_by(Student.full_name.desc())
+            query = query.order_by(Student.full_name.desc())
         elif sort_by == "control_asc":
-            base_query = base_query.order_by(Student.control_number.asc())
+            query = query.order_by(Student.control_number.asc())
         else:
-            base_query = base_query.order_by(Student.control_number.desc())
-
-        all_matching_students = session.exec(base_query).all()
-        total = len(all_matching_students)
+            query = query.order_by(Student.control_number.desc())
 
-        query = base_query.options(
-            selectinload(Student.career_rel),
-            selectinload(Student.applications).selectinload(ScholarshipApplication.scholarship)
-        ).offset(skip).limit(limit)
+        rows = session.exec(query.offset(skip).limit(limit)).all()
 
-        students_db = session.exec(query).all()
+        # El total viene en cada fila (count(*) OVER ()); si la página está vacía lo contamos aparte
+        if rows:
+            total = rows[0].total_count
+        else:
+            total = count_query(session, query.with_only_columns(Student.control_number))
 
         items = []
         now = datetime.utcnow()
 
-        for student in students_db:
-            active_app = None
-            total_serv = 0
-            released_serv = 0
-
-            for app in student.applications:
-                if app.status in [ApplicationStatus.APROBADA, ApplicationStatus.LIBERADA]:
-                    total_serv += 1
-                    if app.status == ApplicationStatus.LIBERADA:
-                        released_serv += 1
-
-                    if not active_app or (
-                            app.created_at and active_app.created_at and app.created_at > active_app.created_at):
-                        active_app = app
-
+        for row in rows:
             s_type = None
             d_active = None
 
-            if active_app and active_app.scholarship:
+            if row.scholarship_type is not None:
                 # Extracción súper segura del ENUM (Evita crash 500)
                 try:
-                    s_type = active_app.scholarship.type.value
+                    s_type = row.scholarship_type.value
                 except AttributeError:
-                    s_type = str(active_app.scholarship.type)
-
-                if active_app.scholarship.results_date:
-                    try:
-                        delta = now.replace(tzinfo=None) - active_app.scholarship.results_date.replace(tzinfo=None)
-                        d_active = max(0, delta.days)
-                    except Exception:
-                        pass
-
-            career_name = student.career_rel.name if student.career_rel else None
-
-            # 👇 NUEVO: Calculamos cuántas faltas tiene este becario esta semana
-            faults = session.exec(
-                select(func.count(Attendance.id)).where(
-                    Attendance.student_id == student.control_number,
-                    Attendance.date >= start_of_week,
-                    Attendance.date <= end_of_week,
-                    Attendance.status == AttendanceStatus.FALTA
-                )
-            ).one()
+                    s_type = str(row.scholarship_type)
+
+            if row.results_date:
+                try:
+                    delta = now.replace(tzinfo=None) - row.results_date.replace(tzinfo=None)
+                    d_active = max(0, delta.days)
+                except Exception:
+                    pass
+
+            career_name = row.career_name
 
             student_data = StudentReadWithCareer(
-                control_number=student.control_number,
-                full_name=student.full_name,
-                email=student.email,
+                control_number=row.control_number,
+                full_name=row.full_name,
+                email=row.email,
                 career=career_name,
-                is_blacklisted=student.is_blacklisted,
+                is_blacklisted=row.is_blacklisted,
                 career_rel=CareerRelRead(name=career_name) if career_name else None,
                 scholarship_type=s_type,
                 days_active=d_active,
-                total_services=total_serv,
-                released_services=released_serv,
-                current_week_faults=faults # 👈 AQUÍ SE LO MANDAMOS AL FRONTEND
+                total_services=row.total_services,
+                released_services=row.released_services,
+                current_week_faults=row.faults  # 👈 AQUÍ SE LO MANDAMOS AL FRONTEND
             )
 
             items.append(student_data)
@@ -5,9 +5,12 @@ from pydantic import BaseModel
 
 from app.core.database import get_session
 from app.core.security import get_password_hash
+from app.core.pagination import paginate
 from app.models.user_model import User, UserRole
 from app.schemas.user_schema import UserPublic, UserCreate, UserUpdate, UserUpdateMe
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_current_db_user
+from app.core.token_revocation import revoke_user_tokens
+from app.core.principal_cache import invalidate_principal
 from app.core.audit_logger import log_action
 
 router = APIRouter()
@@ -23,7 +26,7 @@ class PaginatedUsers(BaseModel):
 # ==========================================
 
 @router.get("/me", response_model=UserPublic)
-def read_user_me(current_user: User = Depends(get_current_user)):
+def read_user_me(current_user: User = Depends(get_current_db_user)):
     """
     Obtener mis datos.
     """
@@ -33,7 +36,7 @@ def read_user_me(current_user: User = Depends(get_current_user)):
 @router.put("/me", response_model=UserPublic)
 def update_user_me(
         user_in: UserUpdateMe,
-        current_user: User = Depends(get_current_user),
+        current_user: User = Depends(get_current_db_user),
         session: Session = Depends(get_session),
 ):
     """
@@ -61,6 +64,8 @@ def update_user_me(
     )
 
     session.commit()
+    revoke_user_tokens(current_user.id)
+    invalidate_principal(current_user.id)
     session.refresh(current_user)
     return current_user
 
@@ -116,13 +121,8 @@ def read_users(
             (User.role.icontains(search))
         )
 
-    # 3. Contamos el total de registros de forma segura para SQLite
-    all_matching_users = session.exec(base_query).all()
-    total = len(all_matching_users)
-
-    # 4. Traemos solo la página solicitada
-    query = base_query.order_by(User.id).offset(skip).limit(limit)
-    users = session.exec(query).all()
+    # 3. Contamos el total en SQL (COUNT) y traemos solo la página solicitada
+    total, users = paginate(session, base_query, skip, limit, User.id)
 
     return PaginatedUsers(total=total, items=users)
 
@@ -207,6 +207,9 @@ def update_user(
     )
 
     session.commit()
+    # Rol, área, carrera o estado (desactivación) pudieron cambiar: sus access tokens ya no valen
+    revoke_user_tokens(user_id)
+    invalidate_principal(user_id)
     session.refresh(db_user)
     return db_user
 
@@ -245,4 +248,6 @@ def delete_user(
     )
 
     session.commit()
+    revoke_user_tokens(user_id)
+    invalidate_principal(user_id)
     return {"ok": True}
\ No newline at end of file
@@ -1,70 +1,46 @@
-import shutil
-import os
-from pathlib import Path
-from uuid import uuid4
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request
 from pydantic import EmailStr
 
 # 👇 Importamos settings
 from app.core.config import settings
-from app.core.email_utils import send_email_background, send_email_async
+from app.core.email_utils import send_email_async
+from app.services.upload_service import save_upload, reject_oversized_request, IMAGE_TYPES, DOCUMENT_TYPES
 
 router = APIRouter()
 
 
 @router.post("/upload-image", response_model=dict)
-async def upload_image(file: UploadFile = File(...)):
+async def upload_image(request: Request, file: UploadFile = File(...)):
     """
     Sube una imagen al servidor y retorna su URL pública.
     """
-    # 1. Validar formato
+    reject_oversized_request(request, settings.UPLOAD_MAX_IMAGE_BYTES)
+
+    # 1. Validar formato (el tipo real se confirma con la firma del archivo al guardarlo)
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="El archivo debe ser una imagen")
 
-    # 2. Generar nombre único
-    file_ext = file.filename.split(".")[-1]
-    unique_filename = f"{uuid4()}.{file_ext}"
-
-    # 3. Ruta de guardado
-    upload_dir = "static/images"
-    if not os.path.exists(upload_dir):
-        os.makedirs(upload_dir)
-
-    file_path = f"{upload_dir}/{unique_filename}"
-
-    # 4. Guardar el archivo
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-
-    # 5. Retornar la URL completa DINÁMICA
-    # 👇 CAMBIO AQUÍ: Usamos settings.DOMAIN
-    url = f"{settings.DOMAIN}/static/images/{unique_filename}"
+    # 2. Guardar por bloques en el almacén por contenido (imágenes repetidas se guardan una vez)
+    url = await save_upload(file, IMAGE_TYPES, settings.UPLOAD_MAX_IMAGE_BYTES)
 
+    # 3. Retornar la URL completa DINÁMICA (usa settings.DOMAIN)
     return {"url": url}
 
 
 @router.post("/upload/file")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(request: Request, file: UploadFile = File(...)):
     """
     Sube cualquier tipo de archivo (PDF, DOCX, ZIP).
     """
-    try:
-        # 1. Definir carpeta de destino
-        upload_dir = Path("static/uploads")
-        upload_dir.mkdir(parents=True, exist_ok=True)
-
-        # 2. Limpiar nombre
-        clean_filename = file.filename.replace(" ", "_")
-        destination = upload_dir / clean_filename
+    reject_oversized_request(request, settings.UPLOAD_MAX_FILE_BYTES)
 
-        # 3. Guardar
-        with destination.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        # 4. Retornar la URL pública DINÁMICA
-        # 👇 CAMBIO AQUÍ: Usamos settings.DOMAIN
-        return f"{settings.DOMAIN}/static/uploads/{clean_filename}"
+    try:
+        # Guardar por bloques en el almacén por contenido (el mismo archivo se guarda una sola vez)
+        # y retornar la URL pública DINÁMICA (usa settings.DOMAIN)
+        return await save_upload(file, DOCUMENT_TYPES, settings.UPLOAD_MAX_FILE_BYTES)
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error subiendo archivo: {e}")
         raise HTTPException(status_code=500, detail=f"No se pudo guardar el archivo: {str(e)}")
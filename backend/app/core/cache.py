@@ -0,0 +1,136 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import redis
+
+
+class TTLCache:
+    """
+    Caché con expiración por tiempo (TTL) para respuestas públicas muy consultadas que cambian poco.
+    - Sin redis_url: en memoria del proceso. Cada worker tiene la suya, así que después de un
+      invalidate() los demás workers pueden servir el valor viejo hasta 'ttl_seconds'.
+    - Con redis_url: compartida entre workers y réplicas; invalidate() se ve en todos al instante.
+      Los valores deben poder guardarse como JSON. Si Redis no responde se usa la de memoria.
+    Durante 'fresh_seconds' después de invalidate(), get_or_set recalcula con 'fresh_loader'
+    (p. ej. leyendo del primario y no de una réplica que todavía no recibe el cambio).
+    Es seguro entre hilos (los endpoints síncronos corren en el thread pool).
+    """
+
+    def __init__(self, name: str, ttl_seconds: float, fresh_seconds: float = 0, redis_url: str = ""):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.fresh_seconds = fresh_seconds
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._generation = 0  # Sube con cada invalidate(): un valor calculado antes ya no se guarda
+        self._fresh_until = 0.0
+        self._lock = threading.Lock()
+        self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.5) if redis_url else None
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any],
+                   fresh_loader: Optional[Callable[[], Any]] = None) -> Any:
+        """Devuelve el valor guardado o lo calcula con 'loader' si no existe o ya expiró."""
+        if self._redis is not None:
+            try:
+                return self._shared_get_or_set(key, loader, fresh_loader)
+            except redis.RedisError as e:
+                print(f"⚠️ Caché '{self.name}' sin Redis, usando memoria del worker: {e}")
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+            generation = self._generation
+            fresh = now < self._fresh_until
+
+        value = (fresh_loader if fresh and fresh_loader else loader)()
+        with self._lock:
+            # Si alguien invalidó mientras calculábamos, el valor puede ser anterior al cambio
+            if self._generation == generation:
+                self._data[key] = (now + self.ttl_seconds, value)
+        return value
+
+    def _shared_get_or_set(self, key: Hashable, loader: Callable[[], Any],
+                           fresh_loader: Optional[Callable[[], Any]]) -> Any:
+        prefix = f"ceitm:cache:{self.name}"
+        generation, fresh = self._redis.mget(f"{prefix}:generation", f"{prefix}:fresh")
+        # La generación va en la llave: tras invalidate() nadie vuelve a leer (ni a pisar) los valores viejos
+        value_key = f"{prefix}:{int(generation or 0)}:{key}"
+        cached = self._redis.get(value_key)
+        if cached is not None:
+            return json.loads(cached)
+
+        value = (fresh_loader if fresh and fresh_loader else loader)()
+        self._redis.set(value_key, json.dumps(value), ex=max(1, int(self.ttl_seconds)))
+        return value
+
+    def invalidate(self) -> None:
+        """Descarta todo lo guardado (en este worker y, con Redis, en todos)."""
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+            self._fresh_until = time.monotonic() + self.fresh_seconds
+
+        if self._redis is not None:
+            prefix = f"ceitm:cache:{self.name}"
+            try:
+                pipeline = self._redis.pipeline()
+                pipeline.incr(f"{prefix}:generation")
+                if self.fresh_seconds:
+                    pipeline.set(f"{prefix}:fresh", 1, ex=max(1, int(self.fresh_seconds)))
+                pipeline.execute()
+            except redis.RedisError as e:
+                print(f"⚠️ No se pudo invalidar la caché '{self.name}' en Redis: {e}")
+
+
+# ==========================================
+# CACHÉS EN DISCO (compartidas entre workers)
+# ==========================================
+def write_file_atomic(path: Path, data: bytes) -> None:
+    """Escribe en un temporal del mismo directorio y hace rename: nadie lee archivos a medias."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def evict_lru_files(directory: Path, pattern: str, max_bytes: int, keep: Optional[Path] = None) -> None:
+    """
+    Desalojo LRU por tamaño: borra los archivos usados hace más tiempo (mtime) hasta
+    que el directorio quede bajo 'max_bytes'. Quien lee un archivo debe tocar su mtime.
+    """
+    entries = []
+    total = 0
+    for path in directory.glob(pattern):
+        if path.suffix == ".tmp":  # Escrituras en curso de otro proceso
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    if total <= max_bytes:
+        return
+
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            path.unlink()
+            total -= size
+        except FileNotFoundError:
+            pass
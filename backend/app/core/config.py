@@ -1,3 +1,5 @@
+import multiprocessing
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -11,11 +13,94 @@ class Settings(BaseSettings):
     POSTGRES_SERVER: str
     POSTGRES_PORT: str
     DATABASE_URL: str
+    # Opcional: URL para el motor asíncrono (asyncpg). Si se deja vacía se deriva de DATABASE_URL.
+    ASYNC_DATABASE_URL: str = ""
+
+    # Réplica de solo lectura (opcional). Vacía = todas las lecturas van al primario.
+    READ_REPLICA_URL: str = ""
+    # Segundos que se deja de usar la réplica después de un fallo de conexión
+    READ_REPLICA_RETRY_SECONDS: int = 30
+    # Retraso máximo esperado de la réplica: tras un cambio, las cachés se rellenan desde el primario
+    READ_REPLICA_LAG_SECONDS: int = 10
+
+    # Caché compartida entre workers de las respuestas públicas (p. ej. "redis://redis:6379/1").
+    # Vacía = caché en memoria de cada worker (un cambio tarda hasta su TTL en verse en los demás).
+    CACHE_REDIS_URL: str = ""
+
+    # Workers de Gunicorn (la misma variable que lee gunicorn.conf.py). Vacío = 2 × núcleos + 1
+    WEB_CONCURRENCY: Optional[int] = None
+
+    # Pool de conexiones. Cada worker abre hasta (size + overflow) conexiones en CADA uno de sus
+    # dos motores (sync y async), así que en total: workers × 2 × (size + overflow).
+    # Ese total debe caber en max_connections de Postgres (100 por defecto). DB_CONNECTION_BUDGET
+    # es la parte para el backend; el resto queda para migrate, el mailer, psql y los 3 reservados
+    # del superusuario. Sin DB_POOL_SIZE/DB_MAX_OVERFLOW, el presupuesto se reparte entre los workers.
+    DB_CONNECTION_BUDGET: int = 80
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: Optional[int] = None
+    DB_POOL_TIMEOUT: int = 30  # Segundos esperando una conexión libre antes de fallar
+    DB_POOL_RECYCLE: int = 1800  # Reabrir conexiones con más de 30 min de vida
+    DB_POOL_PRE_PING: bool = True  # Verifica la conexión antes de usarla (evita errores tras reinicios de Postgres)
+    # Log de cada consulta SQL. Si no se define, solo se activa en desarrollo.
+    SQL_ECHO: Optional[bool] = None
+
+    # Generación de PDFs (pool de procesos por worker)
+    PDF_RENDER_WORKERS: int = 2  # Procesos hijos para diseñar/fusionar expedientes
+    PDF_RENDER_MAX_QUEUE: int = 20  # Peticiones esperando turno antes de responder 503
+    # Caché en disco de expedientes ya generados (fuera de static/: no debe ser pública)
+    PDF_CACHE_DIR: str = "cache/expedientes"
+    PDF_CACHE_MAX_BYTES: int = 500 * 1024 * 1024
+    # Exportación masiva de expedientes (un ZIP por beca)
+    PDF_EXPORT_DIR: str = "cache/exportaciones"
+    PDF_EXPORT_CONCURRENCY: int = 2  # Expedientes renderizándose a la vez por exportación
+    PDF_EXPORT_RETENTION_HOURS: int = 24
+    # Sin latido durante este tiempo, la exportación se da por muerta (el worker que la generaba se cayó)
+    PDF_EXPORT_STALE_SECONDS: int = 120
+    # Normalización de imágenes de evidencias (orientación, resolución y recompresión)
+    PDF_IMAGE_DPI: int = 150
+    PDF_IMAGE_JPEG_QUALITY: int = 80
+    PDF_IMAGE_CACHE_DIR: str = "cache/imagenes"
+    PDF_IMAGE_CACHE_MAX_BYTES: int = 200 * 1024 * 1024
+    # Límites de subida de archivos (se cortan en cuanto se exceden)
+    UPLOAD_MAX_IMAGE_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_MAX_FILE_BYTES: int = 25 * 1024 * 1024
+    # Barrido de archivos subidos que ya ninguna fila usa (0 = desactivado)
+    BLOB_SWEEP_INTERVAL_MINUTES: int = 360
+    BLOB_SWEEP_GRACE_HOURS: int = 48
+
+    # Límite de peticiones por IP (slowapi). Vacío = contadores en memoria por worker
+    # (con N workers el límite real es N veces mayor); "redis://..." = compartidos entre workers y réplicas.
+    RATE_LIMIT_STORAGE_URL: str = ""
+    RATE_LIMIT_STRATEGY: str = "sliding-window-counter"  # O "moving-window" (exacto, más caro) / "fixed-window"
+    RATE_LIMIT_LOGIN: str = "5/minute"
+    RATE_LIMIT_REFRESH_TOKEN: str = "30/minute"
+    RATE_LIMIT_COMPLAINT_CREATE: str = "5/minute"
+    RATE_LIMIT_COMPLAINT_TRACK: str = "10/minute"
+    RATE_LIMIT_SCHOLARSHIP_APPLY: str = "5/minute"
+    RATE_LIMIT_SCHOLARSHIP_STATUS: str = "5/minute"
+    # Proxies (IPs o redes CIDR, separadas por coma) cuyo X-Forwarded-For se cree para saber la IP del cliente
+    TRUSTED_PROXIES: str = "127.0.0.1,::1"
 
     # --- SEGURIDAD (JWT) ---
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Access token corto (lleva rol/área: se autoriza sin consultar la BD) + refresh token largo
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 8
+    # Cada cuánto cada worker trae las revocaciones hechas por los demás
+    TOKEN_REVOCATION_SYNC_SECONDS: int = 5
+    # Caché de usuarios para renovar tokens (varias pestañas renuevan casi a la vez).
+    # "redis://..." = compartida entre workers y réplicas. Vacía = en memoria solo con un
+    # worker (WEB_CONCURRENCY=1); con varios no hay caché y cada renovación lee la BD.
+    PRINCIPAL_CACHE_URL: str = ""
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 1024
+
+    # Hash de contraseñas (bcrypt). Costo: cada +1 duplica el tiempo (12 ≈ 300 ms por login en 1 núcleo).
+    # Las contraseñas guardadas con otro costo se vuelven a hashear solas en el siguiente login.
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2  # Hilos dedicados a bcrypt por worker (no más que los núcleos)
+    PASSWORD_HASH_MAX_QUEUE: int = 16  # Logins esperando turno antes de responder 503
 
     # Valor por defecto: localhost (para desarrollo)
     # En producción lo sobreescribiremos en el archivo .env
@@ -37,6 +122,44 @@ class Settings(BaseSettings):
     USE_CREDENTIALS: bool = True
     VALIDATE_CERTS: bool = True
 
+    # Bandeja de salida de correos (la procesa: python -m app.email_worker)
+    MAIL_OUTBOX_BATCH_SIZE: int = 50  # Correos que toma el worker por vuelta
+    MAIL_OUTBOX_CONNECTIONS: int = 2  # Conexiones SMTP abiertas a la vez (se reutilizan entre correos)
+    MAIL_OUTBOX_MESSAGES_PER_CONNECTION: int = 100  # Se reconecta después de N correos (límite típico de los servidores)
+    MAIL_OUTBOX_POLL_SECONDS: int = 5  # Espera cuando la bandeja está vacía
+    MAIL_OUTBOX_LEASE_SECONDS: int = 300  # Si un worker muere a medio envío, otro retoma sus correos después de esto
+    MAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    MAIL_OUTBOX_RETRY_BASE_SECONDS: int = 30  # Reintentos: 30 s, 1 min, 2 min, 4 min... hasta el máximo
+    MAIL_OUTBOX_RETRY_MAX_SECONDS: int = 3600
+    MAIL_OUTBOX_RETENTION_DAYS: int = 7  # Los correos enviados se borran después de esto
+
+    @property
+    def web_concurrency(self) -> int:
+        return self.WEB_CONCURRENCY or multiprocessing.cpu_count() * 2 + 1
+
+    @property
+    def db_connections_per_engine(self) -> int:
+        """Conexiones máximas de cada motor (sync/async) de un worker según el presupuesto."""
+        return max(2, self.DB_CONNECTION_BUDGET // (self.web_concurrency * 2))
+
+    @property
+    def db_pool_size(self) -> int:
+        if self.DB_POOL_SIZE is not None:
+            return self.DB_POOL_SIZE
+        return max(1, self.db_connections_per_engine // 2)
+
+    @property
+    def db_max_overflow(self) -> int:
+        if self.DB_MAX_OVERFLOW is not None:
+            return self.DB_MAX_OVERFLOW
+        return self.db_connections_per_engine - self.db_pool_size
+
+    @property
+    def sql_echo(self) -> bool:
+        if self.SQL_ECHO is not None:
+            return self.SQL_ECHO
+        return self.ENVIRONMENT == "development"
+
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -1,15 +1,280 @@
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from typing import AsyncGenerator, Iterator, Type
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from .config import settings
 
+def get_engine_options() -> dict:
+    """
+    Opciones del pool tomadas de Settings (tamaño derivado de DB_CONNECTION_BUDGET y los workers).
+    echo solo se activa en desarrollo (o con SQL_ECHO): en producción loguear cada
+    consulta cuesta CPU y disco.
+    """
+    return {
+        "echo": settings.sql_echo,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+# ==========================================
+# MÉTRICAS DEL POOL
+# ==========================================
+class PoolMetrics:
+    """
+    Contadores de un pool de conexiones, para dimensionarlo contra el número de workers.
+    - Eventos de SQLAlchemy: conexiones abiertas, checkouts e invalidaciones.
+    - La clase del pool (pool_class) mide cada checkout: cuánto tardó (espera en la cola
+      o abrir una conexión nueva), cuántos llegaron con el pool agotado y tuvieron que
+      esperar turno, cuántos esperan ahora mismo y cuántos se rindieron (DB_POOL_TIMEOUT).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine = None
+        self.connects = 0
+        self.checkouts = 0
+        self.saturated_checkouts = 0  # Se entregó la última conexión disponible (size + overflow)
+        self.queued_checkouts = 0  # Llegaron con el pool agotado y esperaron a que alguien devolviera una
+        self.waiting = 0  # Esperando conexión en este momento (profundidad de la cola)
+        self.max_waiting = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def pool_class(self, base: Type[QueuePool]) -> Type[QueuePool]:
+        """Subclase del pool que cronometra los checkouts. engine.dispose() la conserva (recreate)."""
+        metrics = self
+
+        class TimedPool(base):
+            def _do_get(self):
+                exhausted = self._max_overflow > -1 and self.checkedout() >= self.size() + self._max_overflow
+                metrics._wait_started(exhausted)
+                start = time.perf_counter()
+                try:
+                    return super()._do_get()
+                except PoolTimeoutError:
+                    metrics._bump("timeouts")
+                    raise
+                finally:
+                    metrics._wait_finished(time.perf_counter() - start)
+
+        TimedPool.__name__ = f"Timed{base.__name__}"
+        return TimedPool
+
+    def attach(self, target_engine) -> None:
+        self.engine = target_engine
+        event.listen(target_engine.pool, "connect", self._on_connect)
+        event.listen(target_engine.pool, "checkout", self._on_checkout)
+        event.listen(target_engine.pool, "invalidate", self._on_invalidate)
+
+    def _wait_started(self, exhausted: bool) -> None:
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            if exhausted:
+                self.queued_checkouts += 1
+
+    def _wait_finished(self, seconds: float) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def _bump(self, name: str) -> None:
+        # Los eventos llegan desde los hilos del thread pool: "+= 1" no es atómico
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self._bump("connects")
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        pool = self.engine.pool
+        saturated = pool.checkedout() >= pool.size() + pool._max_overflow
+        with self._lock:
+            self.checkouts += 1
+            if saturated:
+                self.saturated_checkouts += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self._bump("invalidations")
+
+    def snapshot(self) -> dict:
+        # engine.pool y no una referencia guardada: post_fork (dispose) lo reemplaza por uno nuevo
+        pool = self.engine.pool
+        with self._lock:
+            return {
+                "pool_size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),  # SQLAlchemy lo reporta negativo mientras no se usa
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "saturated_checkouts": self.saturated_checkouts,
+                "queued_checkouts": self.queued_checkouts,
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                "timeouts": self.timeouts,
+                "checkout_wait_avg_ms": round(self.wait_seconds_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "checkout_wait_max_ms": round(self.wait_seconds_max * 1000, 3),
+                "invalidations": self.invalidations,
+            }
+
+
+def _create_engine(metrics: PoolMetrics, database_url: str):
+    engine = create_engine(database_url, poolclass=metrics.pool_class(QueuePool), **get_engine_options())
+    metrics.attach(engine)
+    return engine
+
+
+def _create_async_engine(metrics: PoolMetrics, database_url: str):
+    engine = create_async_engine(database_url, poolclass=metrics.pool_class(AsyncAdaptedQueuePool),
+                                 **get_engine_options())
+    metrics.attach(engine.sync_engine)
+    return engine
+
+
+def to_async_url(database_url: str) -> str:
+    """Cambia el driver síncrono de una URL por su equivalente asíncrono (psycopg2 -> asyncpg)."""
+    url = make_url(database_url)
+    async_drivers = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+    drivername = async_drivers.get(url.get_backend_name(), url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def get_async_database_url() -> str:
+    """
+    URL para el motor asíncrono. Si no se configura ASYNC_DATABASE_URL,
+    se deriva de DATABASE_URL.
+    """
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return to_async_url(settings.DATABASE_URL)
+
+
+pool_metrics = [PoolMetrics("sync"), PoolMetrics("async")]
+
 # Conexión a la BD usando la URL del .env
-# echo=True nos mostrará en consola las consultas SQL (útil para debug)
-engine = create_engine(settings.DATABASE_URL, echo=True)
+engine = _create_engine(pool_metrics[0], settings.DATABASE_URL)
+
+# Motor asíncrono (asyncpg) para los endpoints 'async def' de alto tráfico:
+# no ocupan un hilo del thread pool mientras esperan a Postgres.
+async_engine = _create_async_engine(pool_metrics[1], get_async_database_url())
+
+# Motores de la réplica de solo lectura (None si no está configurada)
+replica_engine = None
+async_replica_engine = None
+if settings.READ_REPLICA_URL:
+    pool_metrics += [PoolMetrics("replica_sync"), PoolMetrics("replica_async")]
+    replica_engine = _create_engine(pool_metrics[2], settings.READ_REPLICA_URL)
+    async_replica_engine = _create_async_engine(pool_metrics[3], to_async_url(settings.READ_REPLICA_URL))
+
+
+def get_pool_metrics() -> dict:
+    """Estado actual de los pools (para dimensionarlos contra el número de workers)."""
+    return {metrics.name: metrics.snapshot() for metrics in pool_metrics}
 
 def init_db():
-    """Crea las tablas en la BD si no existen al iniciar."""
+    """
+    Crea las tablas en la BD si no existen al iniciar.
+    Los índices nuevos sobre tablas que ya existen los agrega 'python -m app.migrate'
+    (CREATE INDEX CONCURRENTLY), no el arranque: construirlos bloquearía las escrituras.
+    """
     SQLModel.metadata.create_all(engine)
 
 def get_session():
     """Dependencia para inyectar la sesión de BD en cada petición."""
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependencia asíncrona (AsyncSession) para endpoints 'async def'.
+    expire_on_commit=False: después del commit los objetos siguen legibles sin
+    volver a consultar la BD (en async no hay carga perezosa implícita).
+    """
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+# ==========================================
+# SESIONES DE SOLO LECTURA (RÉPLICA)
+# ==========================================
+# Momento (time.monotonic) hasta el cual no intentamos usar la réplica tras un fallo
+_replica_down_until = 0.0
+
+# Errores al conectar con una réplica caída. asyncpg no los envuelve en OperationalError:
+# llega el ConnectionRefusedError/OSError crudo, o asyncio.TimeoutError si vence el connect
+REPLICA_CONNECT_ERRORS = (DBAPIError, OSError, asyncio.TimeoutError)
+
+
+def _replica_available() -> bool:
+    return replica_engine is not None and time.monotonic() >= _replica_down_until
+
+
+def _mark_replica_down(error: Exception) -> None:
+    global _replica_down_until
+    _replica_down_until = time.monotonic() + settings.READ_REPLICA_RETRY_SECONDS
+    print(f"⚠️ Réplica de lectura no disponible, usando el primario: {error}")
+
+
+@contextmanager
+def read_session_scope() -> Iterator[Session]:
+    """
+    Sesión de SOLO LECTURA: usa la réplica si está configurada y responde;
+    si no, regresa al primario sin que quien la usa se entere.
+    """
+    if _replica_available():
+        session = Session(replica_engine)
+        try:
+            session.connection()  # Fuerza el checkout (con pre-ping) para detectar la caída aquí
+        except REPLICA_CONNECT_ERRORS as e:
+            session.close()
+            _mark_replica_down(e)
+        else:
+            with session:
+                yield session
+            return
+
+    with Session(engine) as session:
+        yield session
+
+
+def get_read_session():
+    """Dependencia para endpoints de SOLO LECTURA (réplica con respaldo al primario)."""
+    with read_session_scope() as session:
+        yield session
+
+
+async def get_async_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Versión asíncrona de get_read_session (misma lógica de respaldo al primario)."""
+    if _replica_available():
+        session = AsyncSession(async_replica_engine, expire_on_commit=False)
+        try:
+            await session.connection()
+        except REPLICA_CONNECT_ERRORS as e:
+            await session.close()
+            _mark_replica_down(e)
+        else:
+            async with session:
+                yield session
+            return
+
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
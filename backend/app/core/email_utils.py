@@ -1,9 +1,10 @@
-import logging
 from pathlib import Path
-from typing import Any, Dict
-from fastapi import BackgroundTasks
+from typing import Any, Dict, Union
 from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
+from app.models.email_model import OutboxEmail
 
 conf = ConnectionConfig(
     MAIL_USERNAME=settings.MAIL_USERNAME,
@@ -19,26 +20,26 @@ conf = ConnectionConfig(
     TEMPLATE_FOLDER=Path(__file__).parent.parent / 'templates/emails'
 )
 
-# Función para Background Tasks (Producción)
-def send_email_background(
-    background_tasks: BackgroundTasks,
+# Función para la bandeja de salida (Producción)
+def queue_email(
+    session: Union[Session, AsyncSession],
     subject: str,
     email_to: str,
     template_name: str,
     context: Dict[str, Any]
-):
-    try:
-        message = MessageSchema(
-            subject=subject,
-            recipients=[email_to],
-            template_body=context,
-            subtype=MessageType.html
-        )
-        fm = FastMail(conf)
-        background_tasks.add_task(fm.send_message, message, template_name=template_name)
-        print(f"✅ [Background] Tarea de correo encolada para: {email_to}") # Usamos print para asegurar visibilidad
-    except Exception as e:
-        print(f"❌ [Background] Error preparando correo: {str(e)}")
+) -> None:
+    """
+    Deja el correo en la bandeja de salida (tabla OutboxEmail) dentro de la sesión del endpoint:
+    se guarda con su mismo commit, así solo se avisa de cambios que de verdad se confirmaron.
+    Lo envía el worker de correo (python -m app.email_worker), con reintentos.
+    El contexto debe ser serializable a JSON (textos, números, None).
+    """
+    session.add(OutboxEmail(
+        subject=subject,
+        email_to=email_to,
+        template_name=template_name,
+        context=context,
+    ))
 
 # 👇 NUEVA: Función para Envío Inmediato (Test/Debug)
 async def send_email_async(
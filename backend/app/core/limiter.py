@@ -1,5 +1,55 @@
+import ipaddress
+from functools import lru_cache
+from typing import List, Union
+
+from fastapi import Request
 from slowapi import Limiter
-from slowapi.util import get_remote_address
 
-# Inicializamos el limitador usando la dirección IP del cliente como llave
-limiter = Limiter(key_func=get_remote_address)
\ No newline at end of file
+from app.core.config import settings
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+@lru_cache(maxsize=1)
+def _trusted_networks() -> List[IPNetwork]:
+    return [ipaddress.ip_network(item.strip(), strict=False)
+            for item in settings.TRUSTED_PROXIES.split(",") if item.strip()]
+
+
+def _is_trusted(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _trusted_networks())
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    IP real del cliente detrás de Nginx/balanceadores.
+    Solo se lee X-Forwarded-For si la conexión viene de un proxy de confianza (TRUSTED_PROXIES),
+    y se recorre de derecha a izquierda saltando proxies de confianza: el primer salto que
+    no lo es es el cliente. Lo que el cliente escriba a la izquierda no se toma en cuenta,
+    así que no puede cambiar de IP para brincarse el límite.
+    """
+    peer = request.client.host if request.client else "127.0.0.1"
+    if not _is_trusted(peer):
+        return peer
+
+    hops = [hop.strip() for value in request.headers.getlist("x-forwarded-for") for hop in value.split(",")]
+    for hop in reversed([hop for hop in hops if hop]):
+        if not _is_trusted(hop):
+            return hop
+    return peer
+
+
+# Contadores en memoria (por worker) o compartidos en Redis entre workers y réplicas (RATE_LIMIT_STORAGE_URL).
+# Ventana deslizante: no permite ráfagas del doble del límite en el cambio de minuto.
+# Si Redis se cae, se sigue limitando con contadores en memoria hasta que regrese.
+limiter = Limiter(
+    key_func=get_client_ip,
+    storage_uri=settings.RATE_LIMIT_STORAGE_URL or "memory://",
+    strategy=settings.RATE_LIMIT_STRATEGY,
+    key_prefix="ceitm",
+    in_memory_fallback_enabled=bool(settings.RATE_LIMIT_STORAGE_URL),
+)
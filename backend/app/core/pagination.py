@@ -0,0 +1,88 @@
+import base64
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from sqlmodel import Session, select, func
+from sqlmodel.sql.expression import SelectOfScalar
+
+
+def count_query(session: Session, query: SelectOfScalar) -> int:
+    """
+    Cuenta las filas de una consulta filtrada directamente en SQL.
+    Envuelve la consulta en un subquery (sin ORDER BY) y ejecuta un solo
+    SELECT count(*), así no cargamos ningún registro en memoria para saber el total.
+    """
+    subquery = query.order_by(None).subquery()
+    return session.exec(select(func.count()).select_from(subquery)).one()
+
+
+def paginate(
+        session: Session,
+        query: SelectOfScalar,
+        skip: int,
+        limit: int,
+        *order_by: Any
+) -> Tuple[int, List[Any]]:
+    """
+    Devuelve (total, items) para cualquier listado paginado.
+    - total: conteo en SQL sobre la consulta ya filtrada.
+    - items: únicamente la página solicitada (OFFSET/LIMIT).
+    """
+    total = count_query(session, query)
+
+    if order_by:
+        query = query.order_by(*order_by)
+    items = session.exec(query.offset(skip).limit(limit)).all()
+
+    return total, items
+
+
+# ==========================================
+# PAGINACIÓN POR CURSOR (KEYSET)
+# ==========================================
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    """Codifica (created_at, id) del último registro de la página en un token opaco."""
+    raw = f"{created_at.isoformat()}|{item_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decodifica el token generado por encode_cursor. Lanza 400 si fue alterado."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, item_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+
+
+def keyset_paginate(
+        session: Session,
+        query: SelectOfScalar,
+        created_col: Any,
+        id_col: Any,
+        cursor: Optional[str],
+        limit: int
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Devuelve (items, next_cursor) ordenando por (created_at DESC, id DESC).
+    En lugar de OFFSET usamos WHERE (created_at, id) < (cursor), que aprovecha el
+    índice compuesto: la página 500 cuesta lo mismo que la primera.
+    next_cursor es None cuando ya no hay más registros.
+    """
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(tuple_(created_col, id_col) < tuple_(cursor_created_at, cursor_id))
+
+    # Pedimos un registro extra para saber si existe una página siguiente
+    query = query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1)
+    rows = session.exec(query).all()
+
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return items, next_cursor
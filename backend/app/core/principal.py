@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from app.models.user_model import User, UserRole, UserArea
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Foto inmutable del usuario autenticado con lo que se usa para autorizar
+    (rol, área, carrera, activo) y para la bitácora (id, email).
+    Tiene los mismos atributos que User, así que los endpoints no cambian.
+    Viaja dentro del access token: autorizar una petición no consulta la BD.
+    """
+    id: int
+    email: str
+    full_name: str
+    role: UserRole
+    area: UserArea
+    career: Optional[str]
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, email=user.email, full_name=user.full_name, role=user.role,
+                   area=user.area, career=user.career, is_active=user.is_active)
+
+    def to_claims(self) -> Dict[str, Any]:
+        """Claims del access token (el id va en 'sub', como siempre)."""
+        return {
+            "sub": str(self.id),
+            "email": self.email,
+            "name": self.full_name,
+            "role": self.role.value,
+            "area": self.area.value,
+            "career": self.career,
+            "active": self.is_active,
+        }
+
+    @classmethod
+    def from_claims(cls, claims: Dict[str, Any]) -> "Principal":
+        """Lanza KeyError/ValueError si al token le faltan claims o traen valores inválidos."""
+        return cls(id=int(claims["sub"]), email=claims["email"], full_name=claims["name"],
+                   role=UserRole(claims["role"]), area=UserArea(claims["area"]),
+                   career=claims.get("career"), is_active=bool(claims["active"]))
@@ -0,0 +1,162 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import redis
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.principal import Principal
+from app.core.token_revocation import revocations
+from app.models.user_model import User
+
+
+@dataclass(frozen=True)
+class CachedPrincipal:
+    principal: Principal
+    # Epoch en que se leyó de la BD: si el usuario tiene un corte de revocación
+    # igual o posterior, la foto es anterior al cambio y no se usa
+    cached_at: float
+
+
+# ==========================================
+# BACKENDS
+# ==========================================
+class MemoryPrincipalBackend:
+    """
+    TTL + LRU dentro del proceso. Solo se usa con un worker: un delete() no llega a otros
+    procesos, y una renovación en otro worker emitiría tokens con el rol o estado anterior.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._data: "OrderedDict[int, CachedPrincipal]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[CachedPrincipal]:
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is None:
+                return None
+            if entry.cached_at + self.ttl_seconds <= time.time():
+                del self._data[user_id]
+                return None
+            self._data.move_to_end(user_id)
+            return entry
+
+    def set(self, entry: CachedPrincipal) -> None:
+        with self._lock:
+            self._data[entry.principal.id] = entry
+            self._data.move_to_end(entry.principal.id)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, user_id: int) -> None:
+        with self._lock:
+            self._data.pop(user_id, None)
+
+
+class NullPrincipalBackend:
+    """Sin caché: varios workers y sin Redis. La renovación siempre lee el usuario de la BD."""
+
+    def get(self, user_id: int) -> Optional[CachedPrincipal]:
+        return None
+
+    def set(self, entry: CachedPrincipal) -> None:
+        pass
+
+    def delete(self, user_id: int) -> None:
+        pass
+
+
+class RedisPrincipalBackend:
+    """
+    Compartida entre workers y réplicas: un delete() se ve en todos de inmediato.
+    delete() también deja la hora de la invalidación: una foto leída de la BD antes del
+    cambio y guardada después (lectura concurrente en otro worker) se descarta al leerla.
+    Si Redis falla se comporta como un fallo de caché (se consulta la BD), nunca tumba la sesión.
+    """
+    KEY_PREFIX = "ceitm:principal:"
+    INVALIDATED_PREFIX = "ceitm:principal-invalidated:"
+
+    def __init__(self, url: str, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def get(self, user_id: int) -> Optional[CachedPrincipal]:
+        try:
+            raw, invalidated_at = self._client.mget(f"{self.KEY_PREFIX}{user_id}",
+                                                    f"{self.INVALIDATED_PREFIX}{user_id}")
+        except redis.RedisError as e:
+            print(f"⚠️ Caché de usuarios (Redis) no disponible: {e}")
+            return None
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        if invalidated_at is not None and float(invalidated_at) >= data["cached_at"]:
+            return None
+        return CachedPrincipal(Principal.from_claims(data["claims"]), data["cached_at"])
+
+    def set(self, entry: CachedPrincipal) -> None:
+        raw = json.dumps({"claims": entry.principal.to_claims(), "cached_at": entry.cached_at})
+        # El TTL cuenta desde la lectura de la BD: nunca dura más que la marca de invalidación
+        ttl_ms = int((entry.cached_at + self.ttl_seconds - time.time()) * 1000)
+        if ttl_ms <= 0:
+            return
+        try:
+            self._client.set(f"{self.KEY_PREFIX}{entry.principal.id}", raw, px=ttl_ms)
+        except redis.RedisError as e:
+            print(f"⚠️ Caché de usuarios (Redis) no disponible: {e}")
+
+    def delete(self, user_id: int) -> None:
+        try:
+            pipeline = self._client.pipeline()
+            pipeline.set(f"{self.INVALIDATED_PREFIX}{user_id}", time.time(), ex=self.ttl_seconds)
+            pipeline.delete(f"{self.KEY_PREFIX}{user_id}")
+            pipeline.execute()
+        except redis.RedisError as e:
+            # El corte de revocación del usuario hace que la foto vieja se ignore al sincronizar
+            print(f"⚠️ No se pudo invalidar la caché de usuarios (Redis): {e}")
+
+
+def _build_backend():
+    if settings.PRINCIPAL_CACHE_URL:
+        return RedisPrincipalBackend(settings.PRINCIPAL_CACHE_URL, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+    if settings.web_concurrency == 1:
+        return MemoryPrincipalBackend(settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_MAX_ENTRIES)
+    return NullPrincipalBackend()
+
+
+principal_cache = _build_backend()
+
+
+def load_principal(session: Session, user_id: int) -> Optional[Principal]:
+    """
+    Foto vigente del usuario para emitir tokens (/login/refresh-token): de la caché si
+    no ha cambiado desde que se guardó, si no de la BD. Regresa None si ya no existe.
+    """
+    entry = principal_cache.get(user_id)
+    if entry is not None:
+        cutoff = revocations.user_cutoff(user_id)
+        if cutoff is None or cutoff < entry.cached_at:
+            return entry.principal
+
+    # La hora se toma ANTES de leer: un cambio confirmado durante la lectura deja su corte después
+    cached_at = time.time()
+    user = session.get(User, user_id)
+    if user is None:
+        principal_cache.delete(user_id)
+        return None
+
+    principal = Principal.from_user(user)
+    principal_cache.set(CachedPrincipal(principal, cached_at))
+    return principal
+
+
+def invalidate_principal(user_id: int) -> None:
+    """Llamar después del commit (junto con revoke_user_tokens) al editar, desactivar o borrar usuarios."""
+    principal_cache.delete(user_id)
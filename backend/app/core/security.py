@@ -1,33 +1,137 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
-from jose import jwt
+from typing import Any, Callable, Dict, Optional, Tuple
+from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.principal import Principal
 
-# Configuración de Passlib para usar bcrypt (el estándar de oro actual)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Configuración de Passlib para usar bcrypt (el estándar de oro actual).
+# min_rounds = max_rounds = costo configurado: cualquier hash con otro costo queda
+# "deprecado" y verify_and_update() regresa uno nuevo para guardarlo.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
 
 
-def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
+
+def _encode_token(claims: Dict[str, Any], token_type: str, expire: datetime) -> str:
+    # iat con fracciones de segundo: el corte por usuario (token_revocation) lo compara
+    # contra el momento exacto de la revocación
+    to_encode = {
+        **claims,
+        "type": token_type,
+        "jti": uuid.uuid4().hex,
+        "iat": round(time.time(), 3),
+        "exp": expire,
+    }
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def create_access_token(principal: Principal, expires_delta: timedelta = None) -> str:
     """
-    Genera un Token JWT que el frontend guardará.
-    Contiene el ID del usuario (subject) y una fecha de expiración.
+    Genera el Token JWT de corta duración que el frontend manda en cada petición.
+    Lleva la foto del usuario (rol, área, carrera, estado) para autorizar sin ir a la BD.
     """
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return _encode_token(principal.to_claims(), ACCESS_TOKEN_TYPE, expire)
+
+
+def create_refresh_token(user_id: int) -> str:
+    """Token de larga duración que solo sirve para pedir un access token nuevo (se rota en cada uso)."""
+    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    return _encode_token({"sub": str(user_id)}, REFRESH_TOKEN_TYPE, expire)
+
+
+def decode_token(token: str, token_type: str) -> Dict[str, Any]:
+    """Valida firma, expiración y tipo. Lanza JWTError si algo no cuadra."""
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    if payload.get("type") != token_type or payload.get("sub") is None:
+        raise JWTError("Tipo de token inválido")
+    return payload
+
+
+# ==========================================
+# POOL DEDICADO PARA BCRYPT
+# ==========================================
+class PasswordHasherBusy(Exception):
+    """Hay demasiadas contraseñas en cola: se responde 503 en lugar de acumular peticiones."""
+
+
+# bcrypt suelta el GIL, así que unos pocos hilos bastan para ocupar los núcleos.
+# El resto de las peticiones (las que no son login) siguen teniendo CPU libre.
+_password_pool = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_password_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE)
+_password_stats_lock = threading.Lock()
+_password_stats = {"in_flight": 0, "completed": 0, "rejected": 0, "rehashed": 0}
 
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+
+def _bump_stat(name: str, delta: int = 1) -> None:
+    with _password_stats_lock:
+        _password_stats[name] += delta
+
+
+def _run_password_work(func: Callable, *args: Any) -> Any:
+    """
+    Ejecuta 'func' en el pool de bcrypt y espera el resultado.
+    Como máximo PASSWORD_HASH_WORKERS a la vez y PASSWORD_HASH_MAX_QUEUE esperando;
+    si ya está lleno se rechaza de inmediato (no se queda colgado el hilo de la petición).
+    """
+    if not _password_slots.acquire(blocking=False):
+        _bump_stat("rejected")
+        raise PasswordHasherBusy("Demasiados inicios de sesión simultáneos, intenta de nuevo en unos segundos.")
+
+    _bump_stat("in_flight")
+    try:
+        result = _password_pool.submit(func, *args).result()
+        _bump_stat("completed")
+        return result
+    finally:
+        _bump_stat("in_flight", -1)
+        _password_slots.release()
+
+
+def get_password_hash_metrics() -> Dict[str, int]:
+    """Uso del pool de bcrypt en este worker."""
+    with _password_stats_lock:
+        return {
+            "workers": settings.PASSWORD_HASH_WORKERS,
+            "max_queue": settings.PASSWORD_HASH_MAX_QUEUE,
+            "rounds": settings.PASSWORD_BCRYPT_ROUNDS,
+            **_password_stats,
+        }
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Compara una contraseña plana (la del login) con el hash de la BD."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return _run_password_work(pwd_context.verify, plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Igual que verify_password, pero si el hash guardado tiene otro costo (o esquema)
+    regresa también el hash nuevo para guardarlo. Así cambiar PASSWORD_BCRYPT_ROUNDS
+    migra las contraseñas poco a poco, conforme cada usuario inicia sesión.
+    """
+    valid, new_hash = _run_password_work(pwd_context.verify_and_update, plain_password, hashed_password)
+    if new_hash:
+        _bump_stat("rehashed")
+    return valid, new_hash
 
 
 def get_password_hash(password: str) -> str:
     """Convierte una contraseña plana en un hash seguro para guardar en la BD."""
-    return pwd_context.hash(password)
\ No newline at end of file
+    return _run_password_work(pwd_context.hash, password)
\ No newline at end of file
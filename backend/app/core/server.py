@@ -0,0 +1,14 @@
+from uvicorn_worker import UvicornWorker
+
+
+class ProductionUvicornWorker(UvicornWorker):
+    """
+    Worker de Gunicorn para producción: uvloop (event loop en C) y httptools (parser HTTP en C).
+    Ambos vienen incluidos con uvicorn[standard].
+    """
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "lifespan": "on",
+        "proxy_headers": True,
+    }
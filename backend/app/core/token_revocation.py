@@ -0,0 +1,157 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.revoked_token_model import RevokedToken
+
+USER_KEY_PREFIX = "user:"
+
+
+def _epoch(moment: datetime) -> float:
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+class RevocationSet:
+    """
+    Copia en memoria de la tabla de revocaciones: revisar un token son dos búsquedas
+    en diccionarios, sin consultar la BD. Solo guarda revocaciones vigentes (las de
+    tokens ya expirados se purgan), así que se mantiene pequeña.
+    """
+
+    def __init__(self):
+        self._tokens: Dict[str, float] = {}  # jti -> expiración (epoch)
+        self._users: Dict[int, float] = {}  # user_id -> tokens emitidos antes de esto no valen
+        self._lock = threading.Lock()
+        self.synced_until: Optional[datetime] = None
+
+    def add(self, row: RevokedToken) -> None:
+        with self._lock:
+            if row.key.startswith(USER_KEY_PREFIX):
+                cutoff = _epoch(row.revoked_at)
+                self._users[row.user_id] = max(cutoff, self._users.get(row.user_id, 0.0))
+            else:
+                self._tokens[row.key] = _epoch(row.expires_at)
+
+    def is_token_revoked(self, jti: Optional[str]) -> bool:
+        return jti is not None and jti in self._tokens
+
+    def user_cutoff(self, user_id: int) -> Optional[float]:
+        """Epoch del último cambio de permisos/estado del usuario (None si no hay uno vigente)."""
+        return self._users.get(user_id)
+
+    def is_revoked(self, claims: Dict[str, Any]) -> bool:
+        """Para access tokens: revocado por jti o emitido antes del corte de su usuario."""
+        if self.is_token_revoked(claims.get("jti")):
+            return True
+        cutoff = self.user_cutoff(int(claims["sub"]))
+        return cutoff is not None and float(claims.get("iat", 0)) <= cutoff
+
+    def purge_expired(self) -> None:
+        now = _epoch(datetime.utcnow())
+        access_lifetime = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        with self._lock:
+            self._tokens = {jti: exp for jti, exp in self._tokens.items() if exp > now}
+            # Un corte por usuario ya no sirve cuando expiró el último access token anterior a él
+            self._users = {uid: cutoff for uid, cutoff in self._users.items() if cutoff + access_lifetime > now}
+
+
+revocations = RevocationSet()
+
+
+# ==========================================
+# ESCRITURA (BD + memoria de este worker)
+# ==========================================
+def _persist(row: RevokedToken) -> None:
+    with Session(engine) as session:
+        session.merge(row)
+        session.commit()
+    revocations.add(row)
+
+
+def revoke_token(jti: str, user_id: int, expires_at: datetime) -> bool:
+    """
+    Revoca un refresh token (rotación o logout) hasta que expire.
+    Regresa False si ya estaba revocado: el INSERT sobre la llave primaria hace que,
+    aunque dos workers reciban el mismo refresh token a la vez, solo uno lo pueda usar.
+    """
+    row = RevokedToken(key=jti, user_id=user_id, revoked_at=datetime.utcnow(), expires_at=expires_at)
+    with Session(engine, expire_on_commit=False) as session:
+        session.add(row)
+        try:
+            session.commit()
+        except IntegrityError:
+            return False
+    revocations.add(row)
+    return True
+
+
+def revoke_user_tokens(user_id: int) -> None:
+    """
+    Invalida los access tokens ya emitidos de un usuario (sus claims de rol/área/estado
+    quedaron viejos). Llamar después del commit al editar, desactivar o borrar usuarios.
+    El refresh token sigue sirviendo: /login/refresh-token relee el usuario de la BD.
+    """
+    now = datetime.utcnow()
+    _persist(RevokedToken(key=f"{USER_KEY_PREFIX}{user_id}", user_id=user_id, revoked_at=now,
+                          expires_at=now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)))
+
+
+# ==========================================
+# SINCRONIZACIÓN ENTRE WORKERS
+# ==========================================
+def sync_revocations() -> int:
+    """
+    Trae las revocaciones hechas por otros workers desde la última sincronización
+    (al arrancar, todas las vigentes) y purga las expiradas. Regresa cuántas filas leyó.
+    """
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        query = select(RevokedToken).where(RevokedToken.expires_at > now)
+        if revocations.synced_until is not None:
+            # Margen por commits que tardaron en confirmarse; repetir filas no hace daño
+            query = query.where(RevokedToken.revoked_at >= revocations.synced_until - timedelta(seconds=5))
+        rows = session.exec(query).all()
+
+    for row in rows:
+        revocations.add(row)
+    revocations.synced_until = now
+    revocations.purge_expired()
+    return len(rows)
+
+
+def delete_expired_revocations() -> int:
+    with Session(engine) as session:
+        deleted = session.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow())).rowcount
+        session.commit()
+    return deleted
+
+
+async def run_revocation_sync() -> None:
+    """Tarea de fondo: sincroniza cada TOKEN_REVOCATION_SYNC_SECONDS (se arranca en el lifespan)."""
+    last_cleanup = datetime.utcnow()
+    while True:
+        await asyncio.sleep(settings.TOKEN_REVOCATION_SYNC_SECONDS)
+        try:
+            await run_in_threadpool(sync_revocations)
+            # Limpieza de la tabla una vez por hora (cualquier worker puede hacerla)
+            if datetime.utcnow() - last_cleanup >= timedelta(hours=1):
+                await run_in_threadpool(delete_expired_revocations)
+                last_cleanup = datetime.utcnow()
+        except Exception as e:
+            print(f"❌ Error sincronizando tokens revocados: {e}")
+
+
+def start_revocation_sync() -> asyncio.Task:
+    try:
+        sync_revocations()
+    except Exception as e:
+        print(f"❌ No se pudieron cargar los tokens revocados: {e}")
+    return asyncio.create_task(run_revocation_sync())
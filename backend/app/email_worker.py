@@ -0,0 +1,95 @@
+"""
+Worker de la bandeja de salida de correos. Corre aparte del servidor web:
+
+    python -m app.email_worker
+
+Toma lotes de la tabla OutboxEmail, los envía reutilizando conexiones SMTP y
+reintenta con backoff los que fallan. Se pueden correr varios a la vez.
+"""
+import asyncio
+import signal
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.email_model import OutboxEmail
+from app.services.email_outbox import (
+    SmtpSender, claim_batch, send_batch, purge_sent, get_outbox_metrics
+)
+
+
+def _outbox_table_exists() -> bool:
+    return inspect(engine).has_table(OutboxEmail.__tablename__)
+
+
+async def wait_for_schema(stop: asyncio.Event) -> bool:
+    """
+    Las tablas las crea una sola vez el paso de migración (python -m app.migrate) o el maestro
+    de gunicorn (on_starting): el worker no corre init_db() para no competir con ellos, solo espera.
+    """
+    while not stop.is_set():
+        try:
+            if await asyncio.to_thread(_outbox_table_exists):
+                return True
+            print("⏳ Esperando a que exista la tabla de la bandeja de salida...")
+        except Exception as e:
+            print(f"❌ Error conectando a BD: {e}")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.MAIL_OUTBOX_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+    return False
+
+
+async def run_worker() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    if not await wait_for_schema(stop):
+        return
+
+    senders = [SmtpSender() for _ in range(max(1, settings.MAIL_OUTBOX_CONNECTIONS))]
+    last_cleanup = datetime.min
+    print(f"📬 Worker de correo iniciado ({len(senders)} conexiones SMTP, lotes de {settings.MAIL_OUTBOX_BATCH_SIZE}).")
+
+    while not stop.is_set():
+        try:
+            batch = await asyncio.to_thread(claim_batch, settings.MAIL_OUTBOX_BATCH_SIZE)
+            if batch:
+                sent, failed = await send_batch(batch, senders)
+                with Session(engine) as session:
+                    pending = get_outbox_metrics(session)["Pendiente"]
+                print(f"📨 Lote: {sent} enviados, {failed} con error, {pending} pendientes.")
+
+            if datetime.utcnow() - last_cleanup >= timedelta(hours=1):
+                removed = await asyncio.to_thread(purge_sent, settings.MAIL_OUTBOX_RETENTION_DAYS)
+                if removed:
+                    print(f"🧹 Bandeja de salida: {removed} correos enviados eliminados.")
+                last_cleanup = datetime.utcnow()
+        except Exception as e:
+            print(f"❌ Error en el worker de correo: {e}")
+            batch = []
+
+        # Lote lleno: probablemente hay más, se sigue sin esperar
+        if len(batch) < settings.MAIL_OUTBOX_BATCH_SIZE:
+            if not batch:
+                # Sin trabajo no tiene caso mantener conexiones abiertas (el servidor las cortaría)
+                for sender in senders:
+                    await sender.close()
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.MAIL_OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    for sender in senders:
+        await sender.close()
+    print("👋 Worker de correo detenido.")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
@@ -1,6 +1,7 @@
 import os
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from sqlmodel import Session, select
@@ -8,9 +9,17 @@ from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 
-from app.core.database import init_db, get_session
+from app.core.database import init_db, get_session, get_pool_metrics
 from app.core.config import settings
 from app.core.limiter import limiter
+from app.core.security import PasswordHasherBusy, get_password_hash_metrics
+from app.services.pdf_service import close_http_client, shutdown_render_pool, get_render_metrics
+from app.services.blob_store import start_blob_sweeper, release_sweeper_leadership
+from app.services.email_outbox import get_outbox_metrics
+from app.services.export_service import fail_orphaned_exports, abort_running_exports
+from app.core.token_revocation import start_revocation_sync
+from app.api.deps import get_current_active_superuser
+from app.models.user_model import User
 # --- ACTUALIZACIÓN: Agregamos 'shifts' y 'sanctions' a los imports ---
 from app.api.v1.endpoints import (
     convenios, login, utils, users, news, documents,
@@ -19,13 +28,15 @@ from app.api.v1.endpoints import (
 )
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    print("🚀 Iniciando CEITM Platform...")
+def prepare_runtime():
+    """
+    Prepara directorios y tablas. En producción (gunicorn.conf.py) la ejecuta
+    el proceso maestro una sola vez; con uvicorn directo la ejecuta el lifespan.
+    """
     # Asegurar que el directorio de estáticos exista
     static_path = "static/images"
     if not os.path.exists(static_path):
-        os.makedirs(static_path)
+        os.makedirs(static_path, exist_ok=True)
         print(f"📁 Directorio creado: {static_path}")
 
     try:
@@ -33,7 +44,27 @@ async def lifespan(app: FastAPI):
         print("✅ Base de Datos conectada y tablas creadas.")
     except Exception as e:
         print(f"❌ Error conectando a BD: {e}")
+
+    # Las exportaciones que quedaron a medias en el arranque anterior ya no tienen quien las termine
+    fail_orphaned_exports()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    print(f"🚀 Iniciando CEITM Platform (pid {os.getpid()})...")
+    # Si el maestro de Gunicorn ya preparó todo, los workers no lo repiten
+    if os.getenv("CEITM_RUNTIME_READY") != "1":
+        prepare_runtime()
+    sweeper = start_blob_sweeper()
+    revocation_sync = start_revocation_sync()
     yield
+    if sweeper:
+        sweeper.cancel()
+        release_sweeper_leadership()
+    revocation_sync.cancel()
+    await abort_running_exports()
+    await close_http_client()
+    shutdown_render_pool()
     print("👋 Apagando sistema...")
 
 
@@ -49,6 +80,12 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 app.add_middleware(SlowAPIMiddleware)
 
 
+# --- POOL DE BCRYPT SATURADO ---
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
 # --- CONFIGURACIÓN CORS ---
 origins = [
     "http://localhost:5173",
@@ -63,6 +100,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Paginación por cursor de la bitácora
 )
 
 
@@ -99,4 +137,31 @@ def test_db_connection(session: Session = Depends(get_session)):
         session.exec(select(1))
         return {"estado_bd": "Conectada correctamente 🟢"}
     except Exception as e:
-        return {"estado_bd": f"Error de conexión 🔴: {str(e)}"}
\ No newline at end of file
+        return {"estado_bd": f"Error de conexión 🔴: {str(e)}"}
+
+
+@app.get("/metrics/db-pool")
+def db_pool_metrics(current_user: User = Depends(get_current_active_superuser)):
+    """Uso del pool de conexiones de este worker (solo Admin)."""
+    return {"pid": os.getpid(), "pools": get_pool_metrics()}
+
+
+@app.get("/metrics/pdf-render")
+def pdf_render_metrics(current_user: User = Depends(get_current_active_superuser)):
+    """Cola del pool de procesos que genera los expedientes PDF (solo Admin)."""
+    return {"pid": os.getpid(), "render": get_render_metrics()}
+
+
+@app.get("/metrics/password-hashing")
+def password_hashing_metrics(current_user: User = Depends(get_current_active_superuser)):
+    """Cola del pool de bcrypt (login y alta de usuarios) de este worker (solo Admin)."""
+    return {"pid": os.getpid(), "bcrypt": get_password_hash_metrics()}
+
+
+@app.get("/metrics/email-outbox")
+def email_outbox_metrics(
+        session: Session = Depends(get_session),
+        current_user: User = Depends(get_current_active_superuser),
+):
+    """Correos en la bandeja de salida por estado (la procesa python -m app.email_worker) (solo Admin)."""
+    return {"outbox": get_outbox_metrics(session)}
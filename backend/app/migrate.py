@@ -0,0 +1,72 @@
+"""
+Paso de migración: crea tablas nuevas y los índices que falten SIN bloquear escrituras.
+
+Uso:  python -m app.migrate   (en docker-compose corre como el servicio 'migrate' antes del backend)
+
+create_all no agrega índices a tablas que ya existen, y un CREATE INDEX normal bloquea
+INSERT/UPDATE sobre la tabla mientras se construye (minutos en ScholarshipApplication o
+AuditLog). En Postgres se usa CREATE INDEX CONCURRENTLY, que no puede ir dentro de una
+transacción, así que cada índice se crea en autocommit y fuera del arranque del servidor.
+"""
+import importlib
+import pkgutil
+
+from sqlalchemy import Index, text
+from sqlalchemy.schema import CreateIndex
+from sqlmodel import SQLModel
+
+import app.models
+from app.core.database import engine, init_db
+
+
+def _load_models() -> None:
+    """Registra todas las tablas en SQLModel.metadata."""
+    for module in pkgutil.iter_modules(app.models.__path__):
+        importlib.import_module(f"app.models.{module.name}")
+
+
+def _create_index_concurrently(connection, index: Index) -> bool:
+    """Regresa True si lo creó. Un CONCURRENTLY interrumpido deja el índice INVALID: se borra y se repite."""
+    state = connection.execute(
+        text("SELECT i.indisvalid FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid WHERE c.relname = :name"),
+        {"name": index.name},
+    ).first()
+    if state is not None and state.indisvalid:
+        return False
+    if state is not None:
+        print(f"⚠️ Índice {index.name} inválido (creación interrumpida), se vuelve a crear")
+        connection.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"'))
+
+    index.dialect_kwargs["postgresql_concurrently"] = True
+    connection.execute(CreateIndex(index))
+    return True
+
+
+def create_missing_indexes() -> int:
+    created = 0
+    tables = SQLModel.metadata.sorted_tables
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            for table in tables:
+                for index in table.indexes:
+                    if _create_index_concurrently(connection, index):
+                        print(f"🗂️ Índice creado: {index.name}")
+                        created += 1
+        return created
+
+    # SQLite (desarrollo): no hay CONCURRENTLY ni escrituras concurrentes que proteger
+    for table in tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    return created
+
+
+def migrate() -> None:
+    _load_models()
+    init_db()
+    created = create_missing_indexes()
+    print(f"✅ Migración completa ({created} índices nuevos).")
+
+
+if __name__ == "__main__":
+    migrate()
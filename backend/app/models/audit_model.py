@@ -1,9 +1,15 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from datetime import datetime
 from typing import Optional
 
 
 class AuditLog(SQLModel, table=True):
+    # Índice compuesto para la paginación por cursor (created_at, id)
+    __table_args__ = (
+        Index("ix_auditlog_created_id", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
 
     # Quién lo hizo
@@ -0,0 +1,16 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+
+class StoredBlob(SQLModel, table=True):
+    """Archivo subido guardado una sola vez por contenido (static/blobs/ab/cd/<sha256>.<ext>)."""
+    sha256: str = Field(primary_key=True, max_length=64)
+    extension: str = Field(max_length=10)
+    size: int
+
+    # Filas que apuntan al archivo. Cada subida suma una referencia pendiente
+    # y el barrido periódico la ajusta al número real de filas en la BD.
+    ref_count: int = Field(default=0)
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    last_uploaded_at: datetime = Field(default_factory=datetime.utcnow, index=True)
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from typing import Optional
 from enum import Enum
 from datetime import datetime
@@ -18,6 +19,11 @@ class ComplaintStatus(str, Enum):
 
 
 class Complaint(SQLModel, table=True):
+    # Índice compuesto para la paginación por cursor (created_at, id)
+    __table_args__ = (
+        Index("ix_complaint_created_id", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
 
     # --- Datos del Alumno (Reportante) ---
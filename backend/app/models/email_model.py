@@ -0,0 +1,40 @@
+from sqlmodel import SQLModel, Field, JSON
+from sqlalchemy import Index
+from typing import Any, Dict, Optional
+from enum import Enum
+from datetime import datetime
+
+
+class EmailStatus(str, Enum):
+    PENDIENTE = "Pendiente"
+    ENVIANDO = "Enviando"  # Tomado por un worker (hasta 'locked_until')
+    ENVIADO = "Enviado"
+    FALLIDO = "Fallido"  # Se agotaron los reintentos o el servidor lo rechazó de forma definitiva
+
+
+class OutboxEmail(SQLModel, table=True):
+    """
+    Correo por enviar. Se guarda en la misma transacción que el cambio que lo provoca
+    (queja recibida, beca aprobada...) y lo envía el worker de correo (app/email_worker.py):
+    si el servidor se reinicia, los correos pendientes no se pierden.
+    """
+    # Índice para que el worker encuentre rápido lo que toca enviar
+    __table_args__ = (
+        Index("ix_outboxemail_status_next", "status", "next_attempt_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    email_to: str
+    subject: str
+    template_name: str
+    context: Dict[str, Any] = Field(default={}, sa_type=JSON)
+
+    status: EmailStatus = Field(default=EmailStatus.PENDIENTE)
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow)
+    locked_until: Optional[datetime] = None
+    last_error: Optional[str] = Field(default=None, max_length=500)
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    sent_at: Optional[datetime] = None
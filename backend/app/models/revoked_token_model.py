@@ -0,0 +1,16 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from typing import Optional
+
+
+class RevokedToken(SQLModel, table=True):
+    """
+    Revocaciones de tokens, se conservan solo hasta que el token revocado expiraría.
+    - "jti" de un refresh token usado o cerrado (logout).
+    - "user:<id>": corte por usuario; los access tokens emitidos antes de 'revoked_at'
+      dejan de valer (cambio de rol, desactivación, borrado).
+    """
+    key: str = Field(primary_key=True, max_length=64)
+    user_id: Optional[int] = Field(default=None, index=True)
+    revoked_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    expires_at: datetime = Field(index=True)
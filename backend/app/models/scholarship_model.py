@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, List, TYPE_CHECKING
 from enum import Enum
 from datetime import datetime
@@ -82,6 +83,11 @@ class Scholarship(SQLModel, table=True):
 
 # --- SOLICITUD ---
 class ScholarshipApplication(SQLModel, table=True):
+    # Índice compuesto para la paginación por cursor (created_at, id) dentro de cada convocatoria
+    __table_args__ = (
+        Index("ix_scholarshipapplication_scholarship_created_id", "scholarship_id", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     scholarship_id: int = Field(foreign_key="scholarship.id")
 
@@ -1,6 +1,14 @@
+from typing import Optional
 from sqlmodel import SQLModel
 
 # Esto define qué respondemos al loguearse con éxito
 class Token(SQLModel):
     access_token: str
-    token_type: str
\ No newline at end of file
+    token_type: str
+    # Para pedir un access token nuevo en /login/refresh-token cuando el corto expire
+    refresh_token: Optional[str] = None
+
+
+# Cuerpo de /login/refresh-token y /login/logout
+class RefreshTokenRequest(SQLModel):
+    refresh_token: str
@@ -0,0 +1,263 @@
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update, delete, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlmodel import Session, select, col
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.blob_model import StoredBlob
+from app.models.scholarship_model import ScholarshipApplication
+from app.models.complaint_model import Complaint
+from app.models.document_model import Document
+from app.models.convenio_model import Convenio
+from app.models.news_model import News
+from app.models.career_model import Career
+from app.models.map_model import Building
+from app.models.user_model import User
+
+BLOB_ROOT = Path("static/blobs")
+CHUNK_SIZE = 1024 * 1024
+
+# Columnas que guardan URLs de archivos subidos: el barrido cuenta referencias aquí
+URL_COLUMNS = [
+    ScholarshipApplication.student_photo, ScholarshipApplication.doc_request, ScholarshipApplication.doc_motivos,
+    ScholarshipApplication.doc_address, ScholarshipApplication.doc_income, ScholarshipApplication.doc_ine,
+    ScholarshipApplication.doc_kardex, ScholarshipApplication.doc_extra,
+    Complaint.evidence_url, Complaint.resolution_evidence_url,
+    Document.file_url, Convenio.imagen_url, News.imagen_url, Career.image_url, Building.image_url, User.imagen_url,
+]
+
+_BLOB_URL_PATTERN = re.compile(r"/static/blobs/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})\.\w+$")
+
+
+class BlobTooLarge(Exception):
+    """El archivo superó el límite mientras se copiaba."""
+
+
+def blob_path(digest: str, extension: str) -> Path:
+    """Directorios de dos niveles (ab/cd/) para no juntar miles de archivos en una carpeta."""
+    return BLOB_ROOT / digest[:2] / digest[2:4] / f"{digest}.{extension}"
+
+
+def blob_url(digest: str, extension: str) -> str:
+    return f"{settings.DOMAIN}/{blob_path(digest, extension).as_posix()}"
+
+
+# ==========================================
+# ESCRITURA (deduplicada por contenido)
+# ==========================================
+def put(source: BinaryIO, first_chunk: bytes, extension: str, max_bytes: int) -> str:
+    """
+    Copia el archivo por bloques calculando su SHA-256 y regresa su URL pública.
+    Si el contenido ya existía, se descarta la copia y se reutiliza el archivo guardado:
+    el mismo INE subido en cinco becas ocupa disco una sola vez (y tiene la misma URL).
+    Lanza BlobTooLarge en cuanto se pasa de 'max_bytes'.
+    """
+    tmp_dir = BLOB_ROOT / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix=".tmp")
+
+    try:
+        digest = hashlib.sha256()
+        size = 0
+        with os.fdopen(fd, "wb") as tmp_file:
+            chunk = first_chunk
+            while chunk:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise BlobTooLarge()
+                digest.update(chunk)
+                tmp_file.write(chunk)
+                chunk = source.read(CHUNK_SIZE)
+
+        sha256 = digest.hexdigest()
+        # La referencia se registra ANTES de publicar el archivo para que el barrido no lo borre.
+        # Si el contenido ya existía se usa la extensión guardada (p. ej. los mismos bytes ZIP
+        # subidos como .docx y luego como .xlsx): un segundo archivo no lo rastrearía ninguna fila
+        extension = _add_reference(sha256, extension, size)
+
+        final_path = blob_path(sha256, extension)
+        if final_path.exists():
+            os.remove(tmp_path)
+        else:
+            final_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_path, final_path)  # Rename atómico: nadie ve un archivo a medias
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return blob_url(sha256, extension)
+
+
+def _add_reference(sha256: str, extension: str, size: int) -> str:
+    """Suma una referencia al contenido y regresa la extensión con la que quedó guardado."""
+    now = datetime.utcnow()
+    bump = update(StoredBlob).where(StoredBlob.sha256 == sha256) \
+        .values(ref_count=StoredBlob.ref_count + 1, last_uploaded_at=now)
+
+    with Session(engine) as session:
+        if session.execute(bump).rowcount == 0:
+            session.add(StoredBlob(sha256=sha256, extension=extension, size=size, ref_count=1,
+                                   created_at=now, last_uploaded_at=now))
+            try:
+                session.commit()
+                return extension
+            except IntegrityError:
+                # Otra petición subió el mismo contenido al mismo tiempo
+                session.rollback()
+                session.execute(bump)
+        stored_extension = session.exec(select(StoredBlob.extension).where(StoredBlob.sha256 == sha256)).one()
+        session.commit()
+    return stored_extension
+
+
+# ==========================================
+# BARRIDO DE ARCHIVOS SIN REFERENCIAS
+# ==========================================
+def count_references(session: Session) -> Dict[str, int]:
+    """Cuántas filas apuntan a cada blob (buscando sus URLs en todas las columnas de archivos)."""
+    counts: Counter = Counter()
+    for column in URL_COLUMNS:
+        urls = session.exec(select(column).where(col(column).contains("/static/blobs/"))).all()
+        for url in urls:
+            match = _BLOB_URL_PATTERN.search(url)
+            if match:
+                counts[match.group(1)] += 1
+    return counts
+
+
+def sweep_unreferenced_blobs() -> int:
+    """
+    Ajusta ref_count al número real de filas que usan cada archivo y borra los que ya
+    nadie usa. Los archivos recién subidos tienen un periodo de gracia
+    (BLOB_SWEEP_GRACE_HOURS): el alumno sube evidencias antes de enviar su solicitud.
+    Regresa cuántos archivos se borraron.
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=settings.BLOB_SWEEP_GRACE_HOURS)
+    removed = 0
+
+    with Session(engine) as session:
+        counts = count_references(session)
+
+        for blob in session.exec(select(StoredBlob)).all():
+            references = counts.get(blob.sha256, 0)
+            if references > 0 or blob.last_uploaded_at >= cutoff:
+                if blob.ref_count != references:
+                    session.execute(update(StoredBlob)
+                                    .where(StoredBlob.sha256 == blob.sha256)
+                                    .where(StoredBlob.last_uploaded_at == blob.last_uploaded_at)
+                                    .values(ref_count=references))
+                continue
+
+            # Borrado condicional: si alguien lo volvió a subir mientras barríamos, se conserva.
+            # El archivo se borra antes del commit: una subida simultánea del mismo contenido
+            # espera el bloqueo de la fila y después lo vuelve a escribir.
+            deleted = session.execute(delete(StoredBlob)
+                                      .where(StoredBlob.sha256 == blob.sha256)
+                                      .where(StoredBlob.last_uploaded_at < cutoff)).rowcount
+            if deleted:
+                try:
+                    blob_path(blob.sha256, blob.extension).unlink()
+                except FileNotFoundError:
+                    pass
+                removed += 1
+            session.commit()
+
+        session.commit()
+
+    return removed
+
+
+# ==========================================
+# UN SOLO BARRENDERO ENTRE TODOS LOS WORKERS
+# ==========================================
+SWEEPER_LOCK_KEY = 0x43454954  # "CEIT": llave del advisory lock de Postgres
+
+_leader_connection: Optional[Connection] = None
+
+
+def acquire_sweeper_leadership() -> bool:
+    """
+    Cada worker arranca su tarea de barrido, pero solo barre el que tiene el advisory lock
+    de Postgres (uno entre todos los workers y réplicas). El bloqueo vive en una conexión
+    dedicada: si ese worker muere, Postgres lo libera al cerrarse la conexión y otro worker
+    lo toma en su siguiente intento.
+    Fuera de Postgres (SQLite en desarrollo, un solo proceso) siempre es líder.
+    """
+    global _leader_connection
+    if engine.dialect.name != "postgresql":
+        return True
+
+    if _leader_connection is not None:
+        try:
+            _leader_connection.execute(text("SELECT 1"))
+            _leader_connection.commit()
+            return True
+        except DBAPIError:
+            # Se cayó la conexión (reinicio de Postgres): con ella se perdió el bloqueo
+            _leader_connection.invalidate()
+            _leader_connection.close()
+            _leader_connection = None
+
+    connection = engine.connect()
+    try:
+        acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"),
+                                      {"key": SWEEPER_LOCK_KEY}).scalar()
+        connection.commit()  # Sin transacción abierta: el bloqueo es de sesión, no de transacción
+    except Exception:
+        connection.close()
+        raise
+
+    if not acquired:
+        connection.close()
+        return False
+    _leader_connection = connection
+    return True
+
+
+def release_sweeper_leadership() -> None:
+    """Libera el bloqueo al apagar el worker (el siguiente en intentarlo toma el barrido)."""
+    global _leader_connection
+    if _leader_connection is None:
+        return
+    connection, _leader_connection = _leader_connection, None
+    try:
+        connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SWEEPER_LOCK_KEY})
+        connection.commit()
+    except DBAPIError:
+        # Que la conexión no regrese al pool con el bloqueo tomado: se cierra de verdad
+        connection.invalidate()
+    finally:
+        connection.close()
+
+
+async def run_blob_sweeper() -> None:
+    """Tarea de fondo: barre cada BLOB_SWEEP_INTERVAL_MINUTES (se arranca en el lifespan)."""
+    while True:
+        await asyncio.sleep(settings.BLOB_SWEEP_INTERVAL_MINUTES * 60)
+        try:
+            if not await run_in_threadpool(acquire_sweeper_leadership):
+                continue  # Otro worker es el líder
+            removed = await run_in_threadpool(sweep_unreferenced_blobs)
+            if removed:
+                print(f"🧹 Barrido de archivos: {removed} archivos sin referencias eliminados.")
+        except Exception as e:
+            print(f"❌ Error en el barrido de archivos: {e}")
+
+
+def start_blob_sweeper() -> Optional[asyncio.Task]:
+    if settings.BLOB_SWEEP_INTERVAL_MINUTES <= 0:
+        return None
+    return asyncio.create_task(run_blob_sweeper())
@@ -0,0 +1,216 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import formataddr, make_msgid
+from typing import Dict, List, Optional, Tuple
+
+import aiosmtplib
+from jinja2 import TemplateError
+from sqlalchemy import and_, delete, func, or_, update
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.email_utils import conf
+from app.models.email_model import OutboxEmail, EmailStatus
+
+_template_env = conf.template_engine()
+
+
+# ==========================================
+# COLA (BD)
+# ==========================================
+def claim_batch(limit: int) -> List[OutboxEmail]:
+    """
+    Toma hasta 'limit' correos listos para enviarse y los marca como ENVIANDO.
+    SKIP LOCKED (Postgres) deja que varios workers tomen lotes distintos sin esperarse.
+    También retoma correos de un worker que murió a medio envío (lease vencido).
+    """
+    now = datetime.utcnow()
+    with Session(engine, expire_on_commit=False) as session:
+        rows = session.exec(
+            select(OutboxEmail)
+            .where(or_(
+                and_(OutboxEmail.status == EmailStatus.PENDIENTE, OutboxEmail.next_attempt_at <= now),
+                and_(OutboxEmail.status == EmailStatus.ENVIANDO, OutboxEmail.locked_until < now),
+            ))
+            .order_by(OutboxEmail.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).all()
+
+        for row in rows:
+            row.status = EmailStatus.ENVIANDO
+            row.locked_until = now + timedelta(seconds=settings.MAIL_OUTBOX_LEASE_SECONDS)
+            session.add(row)
+        session.commit()
+    return rows
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Backoff exponencial con algo de azar para no reintentar todos a la vez cuando regresa el SMTP."""
+    seconds = min(settings.MAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.MAIL_OUTBOX_RETRY_MAX_SECONDS)
+    return timedelta(seconds=seconds * random.uniform(0.8, 1.2))
+
+
+def record_results(sent_ids: List[int], failures: List[Tuple[int, str, bool]]) -> None:
+    """Guarda el resultado del lote: enviados, y fallidos a reintentar o descartar (error, definitivo)."""
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        if sent_ids:
+            session.execute(
+                update(OutboxEmail)
+                .where(OutboxEmail.id.in_(sent_ids))
+                .values(status=EmailStatus.ENVIADO, sent_at=now, locked_until=None,
+                        attempts=OutboxEmail.attempts + 1, last_error=None)
+            )
+
+        for email_id, error, permanent in failures:
+            email = session.get(OutboxEmail, email_id)
+            if email is None:
+                continue
+            email.attempts += 1
+            email.last_error = error[:500]
+            email.locked_until = None
+            if permanent or email.attempts >= settings.MAIL_OUTBOX_MAX_ATTEMPTS:
+                email.status = EmailStatus.FALLIDO
+            else:
+                email.status = EmailStatus.PENDIENTE
+                email.next_attempt_at = now + retry_delay(email.attempts)
+            session.add(email)
+
+        session.commit()
+
+
+def purge_sent(older_than_days: int) -> int:
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    with Session(engine) as session:
+        deleted = session.execute(
+            delete(OutboxEmail)
+            .where(OutboxEmail.status == EmailStatus.ENVIADO)
+            .where(OutboxEmail.sent_at < cutoff)
+        ).rowcount
+        session.commit()
+    return deleted
+
+
+def get_outbox_metrics(session: Session) -> Dict[str, object]:
+    """Profundidad de la cola: correos por estado y antigüedad del pendiente más viejo."""
+    counts = dict(session.exec(
+        select(OutboxEmail.status, func.count()).group_by(OutboxEmail.status)
+    ).all())
+    oldest = session.exec(
+        select(func.min(OutboxEmail.created_at)).where(OutboxEmail.status == EmailStatus.PENDIENTE)
+    ).one()
+    return {
+        **{status.value: counts.get(status, 0) for status in EmailStatus},
+        "oldest_pending_seconds": int((datetime.utcnow() - oldest).total_seconds()) if oldest else 0,
+    }
+
+
+# ==========================================
+# ENVÍO (SMTP)
+# ==========================================
+def build_message(email: OutboxEmail) -> EmailMessage:
+    """Arma el correo con la misma plantilla (templates/emails) que usaba fastapi-mail."""
+    html = _template_env.get_template(email.template_name).render(**email.context)
+    message = EmailMessage()
+    message["From"] = formataddr((conf.MAIL_FROM_NAME or "", conf.MAIL_FROM))
+    message["To"] = email.email_to
+    message["Subject"] = email.subject
+    message["Message-ID"] = make_msgid()
+    message.set_content(html, subtype="html")
+    return message
+
+
+# Rechazos propios del mensaje (no de la conexión): la conexión sigue sirviendo para el siguiente
+MESSAGE_ERRORS = (aiosmtplib.SMTPResponseException, aiosmtplib.SMTPRecipientsRefused, TemplateError)
+
+
+def _is_permanent_code(code: int) -> bool:
+    # 4xx (greylisting, buzón lleno, servidor ocupado) es temporal: se reintenta con backoff
+    return 500 <= code < 600
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """Rechazos 5xx del destinatario o del mensaje (o plantilla rota): reintentar no sirve de nada."""
+    if isinstance(error, TemplateError):
+        return True
+    if isinstance(error, aiosmtplib.SMTPAuthenticationError):
+        return False  # Credenciales mal configuradas: se arregla la config y se reintenta
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return bool(error.recipients) and all(_is_permanent_code(r.code) for r in error.recipients)
+    return isinstance(error, aiosmtplib.SMTPResponseException) and _is_permanent_code(error.code)
+
+
+class SmtpSender:
+    """
+    Una conexión SMTP que se reutiliza para muchos correos: el saludo, STARTTLS y el login
+    se hacen una vez y no por cada mensaje. Se reconecta sola si el servidor la cerró.
+    """
+
+    def __init__(self):
+        self._client: Optional[aiosmtplib.SMTP] = None
+        self._sent_on_connection = 0
+
+    async def _connect(self) -> None:
+        await self.close()
+        client = aiosmtplib.SMTP(
+            hostname=conf.MAIL_SERVER,
+            port=conf.MAIL_PORT,
+            username=conf.MAIL_USERNAME if conf.USE_CREDENTIALS else None,
+            password=conf.MAIL_PASSWORD.get_secret_value() if conf.USE_CREDENTIALS else None,
+            use_tls=conf.MAIL_SSL_TLS,
+            start_tls=conf.MAIL_STARTTLS,
+            validate_certs=conf.VALIDATE_CERTS,
+            timeout=conf.TIMEOUT,
+        )
+        await client.connect()
+        self._client = client
+        self._sent_on_connection = 0
+
+    async def send(self, message: EmailMessage) -> None:
+        if (self._client is None or not self._client.is_connected
+                or self._sent_on_connection >= settings.MAIL_OUTBOX_MESSAGES_PER_CONNECTION):
+            await self._connect()
+        try:
+            await self._client.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            # El servidor cerró la conexión inactiva: una reconexión y un segundo intento
+            await self._connect()
+            await self._client.send_message(message)
+        self._sent_on_connection += 1
+
+    async def close(self) -> None:
+        if self._client is not None and self._client.is_connected:
+            try:
+                await self._client.quit()
+            except aiosmtplib.SMTPException:
+                self._client.close()
+        self._client = None
+
+
+async def _send_chunk(sender: SmtpSender, emails: List[OutboxEmail],
+                      sent_ids: List[int], failures: List[Tuple[int, str, bool]]) -> None:
+    for email in emails:
+        try:
+            await sender.send(build_message(email))
+            sent_ids.append(email.id)
+        except Exception as e:
+            failures.append((email.id, f"{e.__class__.__name__}: {e}", is_permanent_error(e)))
+            if not isinstance(e, MESSAGE_ERRORS):
+                # Error de conexión: la siguiente vuelta abre una nueva
+                await sender.close()
+
+
+async def send_batch(emails: List[OutboxEmail], senders: List[SmtpSender]) -> Tuple[int, int]:
+    """Reparte el lote entre las conexiones abiertas y envía en paralelo. Regresa (enviados, fallidos)."""
+    sent_ids: List[int] = []
+    failures: List[Tuple[int, str, bool]] = []
+    chunks = [emails[i::len(senders)] for i in range(len(senders))]
+    await asyncio.gather(*[
+        _send_chunk(sender, chunk, sent_ids, failures) for sender, chunk in zip(senders, chunks) if chunk
+    ])
+    await asyncio.to_thread(record_results, sent_ids, failures)
+    return len(sent_ids), len(failures)
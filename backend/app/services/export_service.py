@@ -0,0 +1,252 @@
+import asyncio
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.scholarship_model import ScholarshipApplication
+from app.services import pdf_cache
+from app.services.pdf_service import generate_scholarship_pdf, RenderQueueFull
+
+# Tareas en curso de este worker (la referencia evita que el recolector de basura las cancele)
+_running_jobs: Set[asyncio.Task] = set()
+
+# Cada cuánto se actualiza 'heartbeat_at' mientras la exportación sigue viva
+HEARTBEAT_SECONDS = 15
+
+_JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+# ==========================================
+# ESTADO DE LOS TRABAJOS (en disco, visible para todos los workers)
+# ==========================================
+def _exports_dir() -> Path:
+    path = Path(settings.PDF_EXPORT_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _state_path(job_id: str) -> Path:
+    return _exports_dir() / f"{job_id}.json"
+
+
+def result_path(job: Dict[str, Any]) -> Path:
+    return _exports_dir() / f"{job['job_id']}.zip"
+
+
+def _save_job(job: Dict[str, Any]) -> None:
+    """Escritura atómica del estado: quien consulte el progreso nunca lee un JSON a medias."""
+    if job["status"] == "en_proceso":
+        job["heartbeat_at"] = time.time()
+    fd, tmp_path = tempfile.mkstemp(dir=_exports_dir(), suffix=".tmp")
+    with os.fdopen(fd, "w") as tmp_file:
+        json.dump(job, tmp_file)
+    os.replace(tmp_path, _state_path(job["job_id"]))
+
+
+def _fail_job(job: Dict[str, Any], reason: str) -> None:
+    job["status"] = "error"
+    job["error"] = reason
+    job["finished_at"] = datetime.now().isoformat()
+    _save_job(job)
+
+
+def read_job(job_id: str) -> Optional[Dict[str, Any]]:
+    if not _JOB_ID_PATTERN.match(job_id):
+        return None
+    try:
+        with open(_state_path(job_id)) as state_file:
+            job = json.load(state_file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    # Si el worker que la generaba murió (OOM, kill -9), nadie la va a terminar: no dejamos al cliente esperando
+    stale_limit = time.time() - settings.PDF_EXPORT_STALE_SECONDS
+    if job["status"] == "en_proceso" and job.get("heartbeat_at", 0) < stale_limit:
+        _fail_job(job, "El proceso que generaba la exportación se detuvo")
+    return job
+
+
+def fail_orphaned_exports() -> None:
+    """
+    Al arrancar, ninguna exportación 'en_proceso' tiene quien la termine (vivían en los
+    workers anteriores): se marcan como fallidas para que el cliente pueda reintentar.
+    """
+    for state_path in _exports_dir().glob("*.json"):
+        job = read_job(state_path.stem)
+        if job and job["status"] == "en_proceso":
+            _fail_job(job, "El servidor se reinició durante la exportación")
+
+
+async def abort_running_exports() -> None:
+    """Al apagar el worker: cancela sus exportaciones y las deja marcadas como fallidas."""
+    tasks = list(_running_jobs)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def purge_old_exports() -> None:
+    """Borra exportaciones (estado y archivo) más viejas que PDF_EXPORT_RETENTION_HOURS."""
+    limit = time.time() - settings.PDF_EXPORT_RETENTION_HOURS * 3600
+    for path in _exports_dir().iterdir():
+        try:
+            if path.stat().st_mtime < limit:
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# ==========================================
+# EJECUCIÓN
+# ==========================================
+def start_export(scholarship_id: int, application_ids: List[int], requester_id: int) -> Dict[str, Any]:
+    """
+    Registra el trabajo y lo lanza en segundo plano dentro de este worker.
+    Regresa el estado inicial (con el job_id para consultar el progreso).
+    """
+    purge_old_exports()
+
+    job = {
+        "job_id": uuid.uuid4().hex,
+        "scholarship_id": scholarship_id,
+        "requester_id": requester_id,  # Solo quien la pidió (o un admin) puede consultarla y descargarla
+        "status": "en_proceso",
+        "total": len(application_ids),
+        "done": 0,
+        "failed": [],
+        "error": None,
+        "created_at": datetime.now().isoformat(),
+        "finished_at": None,
+    }
+    _save_job(job)
+
+    task = asyncio.create_task(_run_export(job, application_ids))
+    _running_jobs.add(task)
+    task.add_done_callback(_running_jobs.discard)
+    return job
+
+
+def _load_application(application_id: int) -> Optional[ScholarshipApplication]:
+    with Session(engine) as session:
+        return session.get(ScholarshipApplication, application_id)
+
+
+async def _open_dossier(application: ScholarshipApplication) -> BinaryIO:
+    """
+    Expediente abierto desde la caché de disco; si no existe lo genera y lo guarda.
+    Se abre antes de usarlo para que el desalojo de otro worker no lo borre a medio copiar.
+    """
+    handle = await run_in_threadpool(pdf_cache.open_cached, application)
+    if handle:
+        return handle
+
+    spool_path = pdf_cache.new_spool_file()
+    try:
+        while True:
+            try:
+                await generate_scholarship_pdf(application, spool_path)
+                break
+            except RenderQueueFull:
+                # Las descargas individuales tienen prioridad: esperamos turno en vez de fallar
+                await asyncio.sleep(1)
+        handle = await run_in_threadpool(open, spool_path, "rb")
+        await run_in_threadpool(pdf_cache.store_file, application, spool_path)
+    except Exception:
+        if handle:
+            handle.close()
+        raise
+    finally:
+        pdf_cache.discard_spool_file(spool_path)  # No hace nada si ya se publicó
+
+    return handle
+
+
+def _copy_to_zip(zip_file: zipfile.ZipFile, handle: BinaryIO, entry_name: str) -> None:
+    with handle, zip_file.open(entry_name, "w") as entry:
+        shutil.copyfileobj(handle, entry)
+
+
+def _entry_name(application: ScholarshipApplication) -> str:
+    career = re.sub(r"[^\w\- ]", "", application.career or "Sin carrera").strip() or "Sin carrera"
+    return f"{career}/{application.control_number}.pdf"
+
+
+async def _heartbeat(job: Dict[str, Any]) -> None:
+    """Mantiene fresco 'heartbeat_at' aunque un expediente tarde en renderizarse."""
+    while True:
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        _save_job(job)
+
+
+async def _run_export(job: Dict[str, Any], application_ids: List[int]) -> None:
+    """
+    Renderiza los expedientes con paralelismo acotado (PDF_EXPORT_CONCURRENCY) y agrega
+    cada uno al ZIP en cuanto termina. En memoria solo vive el expediente en curso,
+    sin importar cuántos solicitantes tenga la beca.
+    """
+    final_path = result_path(job)
+    tmp_path = final_path.with_suffix(".part")
+    slots = asyncio.Semaphore(settings.PDF_EXPORT_CONCURRENCY)
+    write_lock = asyncio.Lock()  # zipfile no es seguro entre hilos
+    heartbeat = asyncio.create_task(_heartbeat(job))
+
+    # ZIP_STORED: los PDF ya vienen comprimidos, recomprimirlos solo gasta CPU
+    zip_file = await run_in_threadpool(zipfile.ZipFile, tmp_path, "w", zipfile.ZIP_STORED)
+
+    async def export_one(application_id: int):
+        async with slots:
+            try:
+                application = await run_in_threadpool(_load_application, application_id)
+                if not application:
+                    raise LookupError("La solicitud ya no existe")
+                handle = await _open_dossier(application)
+
+                async with write_lock:
+                    await run_in_threadpool(_copy_to_zip, zip_file, handle, _entry_name(application))
+                job["done"] += 1
+            except Exception as e:
+                print(f"❌ Exportación {job['job_id']}: solicitud {application_id} falló: {e}")
+                job["failed"].append(application_id)
+            _save_job(job)
+
+    try:
+        await asyncio.gather(*(export_one(app_id) for app_id in application_ids))
+        await run_in_threadpool(zip_file.close)
+        os.replace(tmp_path, final_path)
+        job["status"] = "completado"
+    except asyncio.CancelledError:
+        print(f"⚠️ Exportación {job['job_id']} cancelada (el worker se está apagando)")
+        job["status"] = "error"
+        job["error"] = "El servidor se reinició durante la exportación"
+        raise
+    except Exception as e:
+        print(f"❌ Exportación {job['job_id']} abortada: {e}")
+        job["status"] = "error"
+        job["error"] = str(e)
+    finally:
+        heartbeat.cancel()
+        if job["status"] != "completado":
+            try:
+                zip_file.close()
+            except (OSError, ValueError):
+                pass  # Un hilo cancelado aún puede tener una entrada abierta; el archivo se borra igual
+            if tmp_path.exists():
+                tmp_path.unlink()
+        job["finished_at"] = datetime.now().isoformat()
+        _save_job(job)
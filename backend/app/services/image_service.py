@@ -0,0 +1,92 @@
+import hashlib
+import io
+import os
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple, Union
+
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+from app.core.cache import write_file_atomic, evict_lru_files
+
+MM_PER_INCH = 25.4
+
+# Tipos de imagen normalizada (cada uno tiene su tamaño destino y su formato en caché)
+PHOTO = "foto"  # JPEG para el recuadro de la foto del alumno
+PAGE = "pagina"  # PDF de una página para las evidencias escaneadas/fotografiadas
+
+PHOTO_BOX_MM = (33, 43)  # Recuadro de la foto en el expediente (sin el marco)
+PAGE_BOX_MM = (210, 297)  # Hoja A4
+
+
+def _target_pixels(box_mm: Tuple[float, float]) -> Tuple[int, int]:
+    dpi = settings.PDF_IMAGE_DPI
+    return round(box_mm[0] / MM_PER_INCH * dpi), round(box_mm[1] / MM_PER_INCH * dpi)
+
+
+def _prepare(data: Union[bytes, BinaryIO], box_mm: Tuple[float, float]) -> Image.Image:
+    """Orienta según EXIF, reduce al tamaño destino (nunca amplía) y deja la imagen en RGB/L."""
+    img = Image.open(io.BytesIO(data) if isinstance(data, bytes) else data)
+    # draft() deja que el decodificador JPEG reduzca al vuelo: no decodificamos 4000x3000 completos
+    img.draft("RGB", _target_pixels(box_mm))
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    img.thumbnail(_target_pixels(box_mm), Image.Resampling.LANCZOS)
+    return img
+
+
+def normalize_photo(data: Union[bytes, BinaryIO]) -> bytes:
+    """Foto del alumno lista para incrustarse: JPEG del tamaño del recuadro."""
+    img = _prepare(data, PHOTO_BOX_MM)
+    output = io.BytesIO()
+    img.save(output, format="JPEG", quality=settings.PDF_IMAGE_JPEG_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+def normalize_page(data: Union[bytes, BinaryIO]) -> bytes:
+    """Evidencia en imagen convertida a un PDF de una página que cabe en una hoja A4."""
+    img = _prepare(data, PAGE_BOX_MM)
+    # Resolución para que la página mida lo mismo que una hoja A4 (aunque la imagen sea pequeña)
+    resolution = max(
+        img.width / (PAGE_BOX_MM[0] / MM_PER_INCH),
+        img.height / (PAGE_BOX_MM[1] / MM_PER_INCH),
+    )
+    output = io.BytesIO()
+    img.save(output, format="PDF", resolution=resolution, quality=settings.PDF_IMAGE_JPEG_QUALITY)
+    return output.getvalue()
+
+
+# ==========================================
+# CACHÉ POR URL DE ORIGEN
+# ==========================================
+def _cache_dir() -> Path:
+    path = Path(settings.PDF_IMAGE_CACHE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _cache_path(url: str, kind: str) -> Path:
+    # La configuración forma parte de la llave: cambiar DPI/calidad no sirve imágenes viejas
+    raw = f"{kind}|{settings.PDF_IMAGE_DPI}|{settings.PDF_IMAGE_JPEG_QUALITY}|{url}"
+    extension = "jpg" if kind == PHOTO else "pdf"
+    return _cache_dir() / f"{hashlib.sha256(raw.encode()).hexdigest()}.{extension}"
+
+
+def cached(url: str, kind: str) -> Optional[bytes]:
+    """Imagen ya normalizada para esa URL, o None. Con esto un expediente repetido ni descarga ni usa PIL."""
+    path = _cache_path(url, kind)
+    try:
+        os.utime(path)  # LRU
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def store(url: str, kind: str, data: bytes) -> None:
+    path = _cache_path(url, kind)
+    try:
+        write_file_atomic(path, data)
+        evict_lru_files(_cache_dir(), "*", settings.PDF_IMAGE_CACHE_MAX_BYTES, keep=path)
+    except OSError as e:
+        print(f"⚠️ No se pudo guardar la imagen normalizada en caché: {e}")
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+
+from app.core.config import settings
+from app.core.cache import evict_lru_files
+
+# Subir este número cuando cambie el diseño del PDF para que no se sirvan expedientes viejos
+PDF_TEMPLATE_VERSION = 2
+
+
+def _cache_dir() -> Path:
+    path = Path(settings.PDF_CACHE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def dossier_key(app: Any) -> str:
+    """
+    Hash SHA-256 del contenido de la solicitud (todos sus campos, incluidas las URLs de evidencias).
+    Si cualquier dato cambia, cambia la llave y el expediente se vuelve a generar.
+    """
+    data = app.model_dump()
+    raw = json.dumps({"v": PDF_TEMPLATE_VERSION, "app": data}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _dossier_path(app: Any) -> Path:
+    # El ID va al inicio del nombre para poder invalidar todas las versiones de una solicitud
+    return _cache_dir() / f"{app.id}-{dossier_key(app)}.pdf"
+
+
+def open_cached(app: Any) -> Optional[BinaryIO]:
+    """
+    Abre el expediente en caché (y lo marca como usado recientemente) o regresa None.
+    Se entrega el archivo ya abierto y no la ruta: si otro worker lo desaloja o lo invalida
+    mientras se envía, el descriptor sigue siendo válido hasta que lo cerremos.
+    """
+    try:
+        handle = open(_dossier_path(app), "rb")
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(handle.fileno())  # mtime = último acceso, lo usamos para el desalojo LRU
+    except OSError:
+        pass
+    return handle
+
+
+def new_spool_file() -> str:
+    """
+    Archivo temporal dentro del directorio de la caché donde se escribe un expediente nuevo.
+    Al estar en el mismo sistema de archivos, store_file() lo publica con un rename atómico.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=_cache_dir(), suffix=".tmp")
+    os.close(fd)
+    return tmp_path
+
+
+def discard_spool_file(tmp_path: str) -> None:
+    try:
+        os.remove(tmp_path)
+    except FileNotFoundError:
+        pass
+
+
+def store_file(app: Any, tmp_path: str) -> Path:
+    """
+    Publica en la caché un expediente ya escrito en un archivo temporal (rename atómico)
+    y aplica el límite de tamaño de la caché. Regresa la ruta final.
+    """
+    path = _dossier_path(app)
+    try:
+        os.replace(tmp_path, path)
+    except Exception:
+        discard_spool_file(tmp_path)
+        raise
+
+    evict(keep=path)
+    return path
+
+
+def invalidate(application_id: int) -> None:
+    """Borra todas las versiones en caché del expediente de una solicitud."""
+    for path in _cache_dir().glob(f"{application_id}-*.pdf"):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def evict(keep: Optional[Path] = None) -> None:
+    """Desalojo LRU: borra los expedientes usados hace más tiempo hasta quedar bajo PDF_CACHE_MAX_BYTES."""
+    evict_lru_files(_cache_dir(), "*.pdf", settings.PDF_CACHE_MAX_BYTES, keep=keep)
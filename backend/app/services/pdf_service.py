@@ -1,18 +1,60 @@
 import io
+import os
+import mmap
+import asyncio
+import multiprocessing
 import httpx
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlsplit, unquote
 from fpdf import FPDF
+from fpdf.errors import FPDFException
 from pypdf import PdfReader, PdfWriter
 from PIL import Image
 from datetime import datetime
+from app.core.config import settings
+from app.services import image_service
 from app.models.scholarship_model import ScholarshipApplication
 
 
+# --- PLANTILLA DEL ENCABEZADO ---
+LOGO_PATH = "static/images/logo-consejo.png"
+LOGO_WIDTH_MM = 30
+LOGO_DPI = 300  # Resolución de impresión: más píxeles que esto no se notan en papel
+
+_logo: Optional[Image.Image] = None
+
+
+def get_logo() -> Image.Image:
+    """
+    Logo decodificado y reducido a su tamaño impreso una sola vez por proceso
+    (cada hijo del pool de renderizado tiene su copia). El PNG original es de
+    2331x1803: procesarlo completo en cada expediente costaba ~0.3 s por documento.
+    """
+    global _logo
+    if _logo is None:
+        logo = Image.open(LOGO_PATH)
+        width_px = round(LOGO_WIDTH_MM / 25.4 * LOGO_DPI)
+        logo.thumbnail((width_px, width_px * logo.height // logo.width), Image.Resampling.LANCZOS)
+        _logo = logo
+    return _logo
+
+
 class PDFGenerator(FPDF):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Misma fecha en el pie de todas las páginas del documento
+        self.generated_at = datetime.now().strftime("%d/%m/%Y %H:%M")
+
     def header(self):
         # --- HEADER INSTITUCIONAL ---
         # Ajusta las rutas si tienes los archivos de imagen en backend/static/images/
         # self.image("static/images/logo-tecnm.png", 10, 10, 30)
-        self.image("static/images/logo-consejo.png", 170, 10, 30)
+        self.image(get_logo(), 170, 10, LOGO_WIDTH_MM)
 
         self.set_y(15)
         self.set_font('Arial', 'B', 14)
@@ -33,7 +75,7 @@ class PDFGenerator(FPDF):
         self.set_font('Arial', 'I', 8)
         self.set_text_color(128, 128, 128)
         self.cell(0, 10,
-                  f'Página {self.page_no()}/{{nb}} - Documento generado digitalmente por la plataforma del CEITM el {datetime.now().strftime("%d/%m/%Y %H:%M")}',
+                  f'Página {self.page_no()}/{{nb}} - Documento generado digitalmente por la plataforma del CEITM el {self.generated_at}',
                   0, 0, 'C')
 
     def section_title(self, title):
@@ -56,18 +98,285 @@ class PDFGenerator(FPDF):
         self.cell(w_value, 7, val_str, 0, 1 if newline else 0)
 
 
+# --- DESCARGAS DE EVIDENCIAS ---
+DOWNLOAD_TIMEOUT_SECONDS = 15.0  # Por archivo
+DOWNLOAD_DEADLINE_SECONDS = 30.0  # Para TODAS las descargas de un expediente
+MAX_CONNECTIONS_PER_HOST = 4
+
+# Un solo cliente compartido por proceso: reutiliza conexiones (keep-alive) entre descargas y PDFs
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    # El cliente y los semáforos pertenecen a un event loop; si cambia (tests, reinicios) se recrean
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _host_semaphores.clear()
+        _http_client_loop = loop
+        _http_client = httpx.AsyncClient(
+            timeout=DOWNLOAD_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            follow_redirects=True,
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Cierra el cliente compartido (se llama al apagar la app)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    """Limita las descargas simultáneas contra un mismo host (no saturar servidores lentos)."""
+    host = urlsplit(url).netloc
+    if host not in _host_semaphores:
+        _host_semaphores[host] = asyncio.Semaphore(MAX_CONNECTIONS_PER_HOST)
+    return _host_semaphores[host]
+
+
+# --- EVIDENCIAS LOCALES ---
+STATIC_ROOT = Path("static")
+LOCAL_MMAP_THRESHOLD = 1024 * 1024  # Desde 1 MB se lee con mmap en lugar de read()
+
+
+def local_static_path(url: str) -> Optional[Path]:
+    """
+    Si la URL apunta a nuestro propio /static (settings.DOMAIN), regresa la ruta en disco.
+    Así el servidor no se hace peticiones HTTP a sí mismo a través del proxy.
+    Regresa None para hosts externos, archivos inexistentes o rutas fuera de static/.
+    """
+    parts = urlsplit(url)
+    if parts.netloc != urlsplit(settings.DOMAIN).netloc or not parts.path.startswith("/static/"):
+        return None
+
+    static_root = STATIC_ROOT.resolve()
+    path = (static_root / unquote(parts.path[len("/static/"):])).resolve()
+    if static_root not in path.parents or not path.is_file():
+        return None
+    return path
+
+
+@contextmanager
+def open_payload(payload: Union[bytes, Path, str, None]) -> Iterator[BinaryIO]:
+    """
+    Abre como stream lo que llegó al proceso hijo: bytes descargados o un archivo local.
+    Los archivos locales grandes se mapean en memoria (mmap): el sistema operativo
+    pagina el archivo bajo demanda y no hay copia extra en el proceso.
+    """
+    if isinstance(payload, bytes):
+        yield io.BytesIO(payload)
+    elif isinstance(payload, Path):
+        with open(payload, "rb") as local_file:
+            if os.fstat(local_file.fileno()).st_size < LOCAL_MMAP_THRESHOLD:
+                yield io.BytesIO(local_file.read())
+            else:
+                with mmap.mmap(local_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    yield mapped
+    else:
+        # Texto del error de descarga (o None si no había URL)
+        raise Exception(payload)
+
+
 async def download_file(url: str) -> io.BytesIO:
     """Descarga un archivo (imagen o PDF) de una URL de forma asíncrona."""
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, timeout=15.0)
+    client = get_http_client()
+    async with _host_semaphore(url):
+        resp = await client.get(url)
         resp.raise_for_status()
         return io.BytesIO(resp.content)
 
 
-async def generate_scholarship_pdf(app: ScholarshipApplication) -> bytes:
+async def download_all(urls: List[Optional[str]]) -> List[Union[io.BytesIO, Exception, None]]:
     """
-    Genera el PDF unificado con diseño profesional.
+    Descarga todas las URLs al mismo tiempo con un límite global de tiempo.
+    Regresa una lista en el MISMO orden que 'urls': el archivo, la excepción si falló
+    (o si se agotó el tiempo), o None si no había URL.
     """
+    tasks = {
+        index: asyncio.create_task(download_file(url))
+        for index, url in enumerate(urls) if url
+    }
+    if tasks:
+        done, pending = await asyncio.wait(tasks.values(), timeout=DOWNLOAD_DEADLINE_SECONDS)
+        for task in pending:
+            task.cancel()
+
+    results: List[Union[io.BytesIO, Exception, None]] = [None] * len(urls)
+    for index, task in tasks.items():
+        if not task.done() or task.cancelled():
+            results[index] = TimeoutError(f"Tiempo agotado descargando {urls[index]}")
+        elif task.exception() is not None:
+            results[index] = task.exception()
+        else:
+            results[index] = task.result()
+    return results
+
+
+# ==========================================
+# POOL DE PROCESOS PARA EL TRABAJO DE CPU
+# ==========================================
+class RenderQueueFull(Exception):
+    """La cola de renderizado está llena: el endpoint responde 503 en lugar de acumular peticiones."""
+
+
+# Fallas esperables al generar un expediente: disco, proceso hijo muerto o un error de diseño de fpdf
+PDF_GENERATION_ERRORS = (OSError, BrokenProcessPool, FPDFException)
+
+
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_slots: Optional[asyncio.Semaphore] = None
+_render_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+_render_stats = {"running": 0, "waiting": 0, "completed": 0, "rejected": 0, "failed": 0}
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """Pool creado de forma perezosa en cada worker (nunca en el maestro de Gunicorn)."""
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(
+            max_workers=settings.PDF_RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _render_pool
+
+
+def shutdown_render_pool():
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(wait=False, cancel_futures=True)
+        _render_pool = None
+
+
+def _get_render_slots() -> asyncio.Semaphore:
+    global _render_slots, _render_slots_loop
+    loop = asyncio.get_running_loop()
+    if _render_slots is None or _render_slots_loop is not loop:
+        _render_slots = asyncio.Semaphore(settings.PDF_RENDER_WORKERS)
+        _render_slots_loop = loop
+    return _render_slots
+
+
+def get_render_metrics() -> Dict[str, int]:
+    """Profundidad de la cola del pool de PDFs en este worker."""
+    return {
+        "workers": settings.PDF_RENDER_WORKERS,
+        "max_queue": settings.PDF_RENDER_MAX_QUEUE,
+        **_render_stats,
+    }
+
+
+async def run_in_render_pool(func: Callable, *args: Any) -> Any:
+    """
+    Ejecuta 'func' en el pool de procesos sin bloquear el event loop.
+    Backpressure: como máximo PDF_RENDER_WORKERS trabajos a la vez; los demás esperan
+    turno y, si ya hay PDF_RENDER_MAX_QUEUE esperando, se rechaza de inmediato.
+    """
+    global _render_pool
+    if _render_stats["waiting"] >= settings.PDF_RENDER_MAX_QUEUE:
+        _render_stats["rejected"] += 1
+        raise RenderQueueFull("Hay demasiados expedientes en cola, intenta de nuevo en unos segundos.")
+
+    slots = _get_render_slots()
+    _render_stats["waiting"] += 1
+    try:
+        await slots.acquire()
+    finally:
+        _render_stats["waiting"] -= 1
+
+    _render_stats["running"] += 1
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(get_render_pool(), func, *args)
+        _render_stats["completed"] += 1
+        return result
+    except BrokenProcessPool:
+        # Un proceso hijo murió (ej. sin memoria): descartamos el pool para que el siguiente se recree
+        _render_stats["failed"] += 1
+        _render_pool = None
+        raise
+    finally:
+        _render_stats["running"] -= 1
+        slots.release()
+
+
+def _download_payload(result: Union[io.BytesIO, Exception, None]) -> Union[bytes, str, None]:
+    """Convierte el resultado de una descarga en algo que se pueda enviar al proceso hijo."""
+    if result is None:
+        return None
+    if isinstance(result, Exception):
+        return str(result) or result.__class__.__name__
+    return result.getvalue()
+
+
+def evidence_documents(app: Any) -> List[Tuple[str, Optional[str]]]:
+    """Documentos a anexar (el orden aquí es el orden dentro del PDF final)."""
+    return [
+        ("INE / Identificación", app.doc_ine),
+        ("Kardex Académico", app.doc_kardex),
+        ("Comprobante de Ingresos", app.doc_income),
+        ("Comprobante de Domicilio", app.doc_address),
+        ("Documento Extra", app.doc_extra)
+    ]
+
+
+async def generate_scholarship_pdf(app: ScholarshipApplication, output_path: str) -> str:
+    """
+    Genera el PDF unificado con diseño profesional y lo escribe en 'output_path'.
+    Solo las descargas corren en el event loop; el diseño, la conversión de
+    imágenes y la fusión se hacen en el pool de procesos.
+    El resultado nunca vuelve completo a la memoria del worker: el proceso hijo
+    lo escribe directo al archivo y la respuesta lo envía por bloques desde el disco.
+    """
+    docs_to_merge = evidence_documents(app)
+    sources = [(app.student_photo, image_service.PHOTO)] + [(url, image_service.PAGE) for _, url in docs_to_merge]
+
+    # Las imágenes que ya se normalizaron en otro expediente no se descargan ni pasan por PIL
+    normalized = await asyncio.to_thread(
+        lambda: [image_service.cached(url, kind) if url else None for url, kind in sources]
+    )
+
+    # Los archivos de nuestro propio /static los lee el proceso hijo directo del disco
+    local_paths = await asyncio.to_thread(
+        lambda: [local_static_path(url) if url and hit is None else None for hit, (url, _) in zip(normalized, sources)]
+    )
+
+    # Descargamos en paralelo (solo hosts externos) la foto y las evidencias que faltan
+    downloads = await download_all([
+        url if hit is None and local_path is None else None
+        for hit, local_path, (url, _) in zip(normalized, local_paths, sources)
+    ])
+    payloads = [
+        hit if hit is not None else local_path if local_path is not None else _download_payload(result)
+        for hit, local_path, result in zip(normalized, local_paths, downloads)
+    ]
+
+    return await run_in_render_pool(
+        render_scholarship_pdf, app.model_dump(), payloads[0], payloads[1:], output_path, normalized[0] is not None
+    )
+
+
+def render_scholarship_pdf(
+        app_data: Dict[str, Any],
+        photo_download: Union[bytes, Path, str, None],
+        evidence_downloads: List[Union[bytes, Path, str, None]],
+        output_path: str,
+        photo_normalized: bool = False
+) -> str:
+    """
+    Parte de CPU (corre en un proceso hijo): diseño con FPDF, imágenes con PIL y fusión con pypdf.
+    Cada archivo llega como bytes (descargado), Path (archivo local de static/),
+    como texto del error, o None si no había URL.
+    Las imágenes se normalizan (orientación, tamaño, JPEG) y se guardan en caché por URL.
+    El PDF final se escribe en 'output_path' (no se regresa en bytes al proceso padre).
+    """
+    app = SimpleNamespace(**app_data)
+    docs_to_merge = evidence_documents(app)
+
     pdf = PDFGenerator()
     pdf.set_auto_page_break(auto=True, margin=25)
     pdf.alias_nb_pages()
@@ -106,7 +415,13 @@ async def generate_scholarship_pdf(app: ScholarshipApplication) -> bytes:
 
     if app.student_photo:
         try:
-            photo_stream = await download_file(app.student_photo)
+            if photo_normalized:
+                photo_stream = io.BytesIO(photo_download)
+            else:
+                with open_payload(photo_download) as raw_photo:
+                    photo_bytes = image_service.normalize_photo(raw_photo)
+                image_service.store(app.student_photo, image_service.PHOTO, photo_bytes)
+                photo_stream = io.BytesIO(photo_bytes)
             # Insertar imagen dentro del marco
             pdf.image(photo_stream, x=photo_x + 1, y=photo_y + 1, w=photo_w - 2, h=photo_h - 2)
         except Exception as e:
@@ -195,49 +510,37 @@ async def generate_scholarship_pdf(app: ScholarshipApplication) -> bytes:
     merger = PdfWriter()
     merger.append(io.BytesIO(solicitud_pdf_bytes))
 
-    # Lista de documentos a anexar
-    docs_to_merge = [
-        ("INE / Identificación", app.doc_ine),
-        ("Kardex Académico", app.doc_kardex),
-        ("Comprobante de Ingresos", app.doc_income),
-        ("Comprobante de Domicilio", app.doc_address),
-        ("Documento Extra", app.doc_extra)
-    ]
-
     print("Iniciando fusión de evidencias...")
-    for titulo, url in docs_to_merge:
-        if url:
-            try:
-                # Descargar el archivo (imagen o pdf)
-                file_stream = await download_file(url)
-
+    # Los archivos abiertos (mmap incluidos) siguen vivos hasta escribir el PDF final
+    with ExitStack() as open_files:
+        for (titulo, url), download in zip(docs_to_merge, evidence_downloads):
+            if url:
                 try:
-                    # Intento 1: ¿Es un PDF nativo?
-                    reader = PdfReader(file_stream)
-                    merger.append(reader)
-                    print(f"✅ {titulo} anexado como PDF.")
-                except:
-                    # Intento 2: Si falla, asumir que es IMAGEN y convertir a PDF
-                    print(f"🔄 Convirtiendo imagen {titulo} a PDF...")
-                    file_stream.seek(0)  # Resetear puntero del stream
-                    img = Image.open(file_stream)
-
-                    # Convertir RGBA a RGB si es necesario (ej. PNG transparentes)
-                    if img.mode == 'RGBA': img = img.convert('RGB')
-
-                    # Crear PDF en memoria desde la imagen
-                    img_pdf_bytes = io.BytesIO()
-                    img.save(img_pdf_bytes, format='PDF', resolution=100.0)
-                    img_pdf_bytes.seek(0)
-
-                    merger.append(PdfReader(img_pdf_bytes))
-                    print(f"✅ Imagen {titulo} convertida y anexada.")
-
-            except Exception as e:
-                # Si falla una evidencia, no rompemos todo, solo la omitimos y logueamos
-                print(f"❌ Error crítico anexando {titulo} ({url}): {e}")
-
-    # 3. Generar el PDF final unificado
-    final_output_stream = io.BytesIO()
-    merger.write(final_output_stream)
-    return final_output_stream.getvalue()
\ No newline at end of file
+                    # El archivo ya se descargó en paralelo o se lee directo de static/ (imagen o pdf)
+                    file_stream = open_files.enter_context(open_payload(download))
+
+                    try:
+                        # Intento 1: ¿Es un PDF nativo?
+                        reader = PdfReader(file_stream)
+                        merger.append(reader)
+                        print(f"✅ {titulo} anexado como PDF.")
+                    except:
+                        # Intento 2: Si falla, asumir que es IMAGEN, normalizarla y convertirla a PDF
+                        # (la siguiente vez llega desde la caché ya como PDF y entra por el Intento 1)
+                        print(f"🔄 Convirtiendo imagen {titulo} a PDF...")
+                        file_stream.seek(0)  # Resetear puntero del stream
+                        img_pdf_bytes = image_service.normalize_page(file_stream)
+                        image_service.store(url, image_service.PAGE, img_pdf_bytes)
+
+                        merger.append(PdfReader(io.BytesIO(img_pdf_bytes)))
+                        print(f"✅ Imagen {titulo} convertida y anexada.")
+
+                except Exception as e:
+                    # Si falla una evidencia, no rompemos todo, solo la omitimos y logueamos
+                    print(f"❌ Error crítico anexando {titulo} ({url}): {e}")
+
+        # 3. Escribir el PDF final unificado directo al archivo de salida
+        with open(output_path, "wb") as output_file:
+            merger.write(output_file)
+    merger.close()
+    return output_path
\ No newline at end of file
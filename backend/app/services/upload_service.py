@@ -0,0 +1,85 @@
+from pathlib import Path
+from typing import Optional, Set
+
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from app.services import blob_store
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB por bloque: memoria constante sin importar el tamaño del archivo
+
+# Tipos reconocidos por su firma (primeros bytes), no por el nombre ni el Content-Type del cliente
+IMAGE_TYPES = {"jpg", "png", "gif", "webp"}
+DOCUMENT_TYPES = IMAGE_TYPES | {"pdf", "zip", "ole"}
+
+# Formatos que por dentro son ZIP (Office moderno) u OLE (Office 97-2003)
+ZIP_EXTENSIONS = {"docx", "xlsx", "pptx", "zip"}
+OLE_EXTENSIONS = {"doc", "xls", "ppt"}
+
+
+def sniff_file_type(head: bytes) -> Optional[str]:
+    """Identifica el tipo real del archivo con sus primeros bytes (magic numbers)."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        return "zip"
+    if head.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
+        return "ole"
+    return None
+
+
+def _extension_for(file_type: str, filename: Optional[str]) -> str:
+    """Extensión final: la del tipo detectado (la del cliente solo para distinguir docx/xlsx/etc.)."""
+    client_ext = Path(filename or "").suffix.lower().lstrip(".")
+    if file_type == "zip":
+        return client_ext if client_ext in ZIP_EXTENSIONS else "zip"
+    if file_type == "ole":
+        return client_ext if client_ext in OLE_EXTENSIONS else "doc"
+    return file_type
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"El archivo excede el límite de {max_bytes // (1024 * 1024)} MB")
+
+
+def reject_oversized_request(request: Request, max_bytes: int) -> None:
+    """
+    Rechazo temprano por Content-Length (antes de leer el cuerpo).
+    El margen cubre los encabezados del multipart.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + 64 * 1024:
+        raise _too_large(max_bytes)
+
+
+def store_upload(file: UploadFile, allowed_types: Set[str], max_bytes: int) -> str:
+    """
+    Guarda un archivo subido en el almacén por contenido y regresa su URL pública.
+    Es bloqueante: los endpoints síncronos la llaman directo (ya corren en el thread pool)
+    y los asíncronos usan save_upload().
+    - Valida el tipo real con la firma del primer bloque.
+    - Corta en cuanto se pasa de 'max_bytes' (no termina de copiar archivos gigantes).
+    - Archivos idénticos se guardan una sola vez (ver blob_store).
+    """
+    first_chunk = file.file.read(CHUNK_SIZE)
+    file_type = sniff_file_type(first_chunk[:16])
+    if file_type not in allowed_types:
+        raise HTTPException(status_code=400, detail="Tipo de archivo no permitido")
+
+    try:
+        return blob_store.put(file.file, first_chunk, _extension_for(file_type, file.filename), max_bytes)
+    except blob_store.BlobTooLarge:
+        raise _too_large(max_bytes)
+
+
+async def save_upload(file: UploadFile, allowed_types: Set[str], max_bytes: int) -> str:
+    """Versión para endpoints async: toda la copia en un solo viaje al thread pool."""
+    return await run_in_threadpool(store_upload, file, allowed_types, max_bytes)
@@ -0,0 +1,148 @@
+"""
+Prueba de carga: la misma consulta servida por un endpoint 'def' (sesión síncrona, thread pool
+de Starlette con 40 hilos) y por uno 'async def' (AsyncSession, sin ocupar hilos).
+
+    python -m benchmarks.async_load_bench --concurrency 200 --duration 10 --latency-ms 50
+
+--latency-ms simula la espera de red a Postgres: con DATABASE_URL de Postgres se agrega un
+pg_sleep a la consulta; con SQLite se espera en el proceso (time.sleep en el hilo del endpoint
+síncrono, asyncio.sleep en el asíncrono), que es justo la diferencia que se quiere medir.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import time
+
+from benchmarks.common import import_models, setup_env
+
+setup_env()
+import_models()
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from sqlmodel import SQLModel, Session, select  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from app.core.database import engine, get_async_session, get_session  # noqa: E402
+from app.models.news_model import News  # noqa: E402
+
+PORT = 8765
+LATENCY_SECONDS = 0.0
+IS_POSTGRES = engine.dialect.name == "postgresql"
+QUERY = select(News).where(News.is_published == True).order_by(News.created_at.desc())  # noqa: E712
+
+bench_app = FastAPI()
+
+
+@bench_app.get("/sync")
+def read_sync(session: Session = Depends(get_session)):
+    if LATENCY_SECONDS and IS_POSTGRES:
+        session.execute(text("SELECT pg_sleep(:s)"), {"s": LATENCY_SECONDS})
+    elif LATENCY_SECONDS:
+        time.sleep(LATENCY_SECONDS)
+    return session.exec(QUERY).all()
+
+
+@bench_app.get("/async")
+async def read_async(session: AsyncSession = Depends(get_async_session)):
+    if LATENCY_SECONDS and IS_POSTGRES:
+        await session.execute(text("SELECT pg_sleep(:s)"), {"s": LATENCY_SECONDS})
+    elif LATENCY_SECONDS:
+        await asyncio.sleep(LATENCY_SECONDS)
+    return (await session.exec(QUERY)).all()
+
+
+def seed() -> None:
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        if session.exec(select(News)).first() is None:
+            for i in range(5):
+                session.add(News(title=f"Noticia {i}", slug=f"noticia-{i}", excerpt="e", content="c" * 200))
+            session.commit()
+
+
+async def fetch(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, path: str) -> int:
+    """GET mínimo sobre una conexión keep-alive (httpx con cientos de conexiones mide su propio pool)."""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n".encode())
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = next(int(line.split(b":")[1]) for line in head.split(b"\r\n")
+                  if line.lower().startswith(b"content-length:"))
+    await reader.readexactly(length)
+    return status
+
+
+async def load(path: str, concurrency: int, duration: float) -> None:
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection("127.0.0.1", PORT)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                status = await fetch(reader, writer, path)
+            except (OSError, asyncio.IncompleteReadError):
+                errors += 1
+                reader, writer = await asyncio.open_connection("127.0.0.1", PORT)
+                continue
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+        writer.close()
+
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+    print(f"  {path:<7} {len(latencies) / duration:>8.1f} req/s   p50 {statistics.median(latencies) * 1000:>7.1f} ms"
+          f"   p95 {p95 * 1000:>7.1f} ms   errores {errors}")
+
+
+def run_server() -> None:
+    uvicorn.run(bench_app, port=PORT, log_level="warning", timeout_keep_alive=120)
+
+
+def wait_for_server() -> None:
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{PORT}/async", timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError("El servidor de prueba no arrancó")
+
+
+def main() -> None:
+    global LATENCY_SECONDS
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+    LATENCY_SECONDS = args.latency_ms / 1000
+
+    seed()
+    # El servidor en otro proceso: el cliente de carga no le quita CPU (GIL)
+    server = multiprocessing.Process(target=run_server, daemon=True)
+    server.start()
+    wait_for_server()
+
+    print(f"{args.concurrency} clientes, {args.duration:.0f} s, {args.latency_ms:.0f} ms de espera por consulta "
+          f"({engine.dialect.name}):")
+    try:
+        for path in ("/sync", "/async"):
+            asyncio.run(load(path, args.concurrency, args.duration))
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
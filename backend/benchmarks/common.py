@@ -0,0 +1,85 @@
+"""
+Utilidades compartidas por los scripts de benchmarks/.
+Se corren desde backend/, por ejemplo:  python -m benchmarks.pagination_bench
+
+Sin DATABASE_URL usan una BD SQLite temporal; para números representativos apúntalos
+a un Postgres local de pruebas (¡nunca al de producción, los scripts insertan datos!).
+"""
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_env(**overrides: str) -> None:
+    """Variables mínimas para importar app.* fuera de Docker. Llamar antes de cualquier import de app."""
+    tmp_dir = tempfile.mkdtemp(prefix="ceitm-bench-")
+    defaults = {
+        "POSTGRES_USER": "ceitm", "POSTGRES_PASSWORD": "ceitm", "POSTGRES_DB": "ceitm",
+        "POSTGRES_SERVER": "localhost", "POSTGRES_PORT": "5432",
+        "DATABASE_URL": f"sqlite:///{tmp_dir}/bench.db",
+        "SECRET_KEY": "clave-de-benchmark",
+        "MAIL_USERNAME": "bench", "MAIL_PASSWORD": "bench", "MAIL_FROM": "bench@ceitm.mx", "MAIL_SERVER": "localhost",
+        "SQL_ECHO": "false",
+        "PDF_CACHE_DIR": f"{tmp_dir}/expedientes",
+        "PDF_EXPORT_DIR": f"{tmp_dir}/exportaciones",
+        "PDF_IMAGE_CACHE_DIR": f"{tmp_dir}/imagenes",
+        "BLOB_SWEEP_INTERVAL_MINUTES": "0",
+        **overrides,
+    }
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def import_models() -> None:
+    """Registra todas las tablas en SQLModel.metadata (las llaves foráneas se resuelven entre módulos)."""
+    import importlib
+    import pkgutil
+    import app.models
+
+    for module in pkgutil.iter_modules(app.models.__path__):
+        importlib.import_module(f"app.models.{module.name}")
+
+
+@contextmanager
+def timer(label: str):
+    start = time.perf_counter()
+    yield
+    print(f"  {label}: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+def seed_applications(engine, total: int, batch: int = 5000) -> int:
+    """Crea una beca con 'total' solicitudes (INSERT por lotes). Regresa el id de la beca."""
+    from datetime import datetime, timedelta
+    from sqlmodel import Session
+    from app.models.scholarship_model import Scholarship, ScholarshipApplication, ScholarshipType
+
+    with Session(engine) as session:
+        scholarship = Scholarship(name="Benchmark", type=ScholarshipType.ALIMENTICIA, description="d",
+                                  start_date=datetime.utcnow(), end_date=datetime.utcnow(),
+                                  results_date=datetime.utcnow(), folio_identifier="BENCH")
+        session.add(scholarship)
+        session.commit()
+        scholarship_id = scholarship.id
+
+    now = datetime.utcnow()
+    table = ScholarshipApplication.__table__
+    with engine.begin() as connection:
+        for offset in range(0, total, batch):
+            connection.execute(table.insert(), [{
+                "scholarship_id": scholarship_id, "full_name": f"Alumno {i}", "email": "a@ceitm.mx",
+                "phone_number": "0", "control_number": f"{i:08d}", "career": "Sistemas", "semester": "3",
+                "student_photo": "", "arithmetic_average": 90.0, "certified_average": 90.0,
+                "address": "Domicilio", "origin_address": "Origen", "economic_dependence": "Padres",
+                "dependents_count": 3, "family_income": 9000.0, "income_per_capita": 3000.0,
+                "previous_scholarship": "No", "motivos": "x" * 400, "doc_address": "", "doc_income": "",
+                "doc_ine": "", "doc_kardex": "", "status": "PENDIENTE",
+                "created_at": now - timedelta(seconds=i),
+            } for i in range(offset, min(offset + batch, total))])
+    return scholarship_id
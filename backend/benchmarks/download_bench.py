@@ -0,0 +1,85 @@
+"""
+Descarga de la foto y las 5 evidencias de un expediente contra un servidor HTTP local con latencia:
+antes (un AsyncClient nuevo por archivo, una descarga tras otra) contra download_all
+(cliente compartido, todas a la vez con límite por host).
+
+    python -m benchmarks.download_bench --latency-ms 300 --dossiers 10
+"""
+import argparse
+import asyncio
+import io
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.common import setup_env
+
+setup_env()
+
+import httpx  # noqa: E402
+
+from app.services import pdf_service  # noqa: E402
+
+FILES_PER_DOSSIER = 6  # Foto + 5 evidencias
+PAYLOAD = b"x" * 256 * 1024
+
+
+def start_stand_in(latency_seconds: float) -> str:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, como un almacenamiento real
+
+        def do_GET(self):
+            time.sleep(latency_seconds)
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(PAYLOAD)))
+            self.end_headers()
+            self.wfile.write(PAYLOAD)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+async def sequential(urls):
+    """Como estaba antes: un cliente nuevo por archivo, uno tras otro."""
+    results = []
+    for url in urls:
+        async with httpx.AsyncClient(timeout=15.0) as client:
+            response = await client.get(url)
+            results.append(io.BytesIO(response.content))
+    return results
+
+
+async def run(mode: str, host: str, dossiers: int) -> None:
+    fetch = sequential if mode == "secuencial" else pdf_service.download_all
+    urls = [[f"{host}/expediente{d}/archivo{f}" for f in range(FILES_PER_DOSSIER)] for d in range(dossiers)]
+
+    start = time.perf_counter()
+    await fetch(urls[0])
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await asyncio.gather(*[fetch(dossier) for dossier in urls])
+    many = time.perf_counter() - start
+    await pdf_service.close_http_client()
+    print(f"  {mode:<11} 1 expediente: {single * 1000:>7.0f} ms   {dossiers} a la vez: {many * 1000:>7.0f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--dossiers", type=int, default=10)
+    args = parser.parse_args()
+
+    host = start_stand_in(args.latency_ms / 1000)
+    print(f"{FILES_PER_DOSSIER} archivos de {len(PAYLOAD) // 1024} KB por expediente, {args.latency_ms:.0f} ms de latencia, "
+          f"máximo {pdf_service.MAX_CONNECTIONS_PER_HOST} descargas a la vez por host:")
+    for mode in ("secuencial", "concurrente"):
+        asyncio.run(run(mode, host, args.dossiers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Muchos inicios de sesión simultáneos contra un solo worker, midiendo logins por segundo y
+cuánto se atrasa una petición ligera que llega mientras tanto: antes (bcrypt directo en los
+40 hilos del thread pool de Starlette) contra /login/access-token (bcrypt en su pool acotado,
+con 503 + Retry-After cuando la cola se llena).
+
+    python -m benchmarks.login_bench --logins 60 --rounds 12
+"""
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import time
+from collections import Counter
+
+from benchmarks.common import import_models, setup_env
+
+ROUNDS_ARG = argparse.ArgumentParser(add_help=False)
+ROUNDS_ARG.add_argument("--rounds", type=int, default=12)
+setup_env(PASSWORD_BCRYPT_ROUNDS=str(ROUNDS_ARG.parse_known_args()[0].rounds))
+import_models()
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import Depends, HTTPException  # noqa: E402
+from fastapi.security import OAuth2PasswordRequestForm  # noqa: E402
+from sqlmodel import Session, SQLModel, select  # noqa: E402
+
+from app.core.database import engine, get_session  # noqa: E402
+from app.core.limiter import limiter  # noqa: E402
+from app.core.security import get_password_hash, pwd_context  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user_model import User, UserArea, UserRole  # noqa: E402
+
+PORT = 8767
+EMAIL = "bench@ceitm.mx"
+PASSWORD = "secreta123"
+
+
+@app.post("/bench/antes")
+def login_inline(form_data: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(get_session)):
+    """Como estaba antes: bcrypt dentro del hilo de la petición, sin límite de concurrencia."""
+    user = session.exec(select(User).where(User.email == form_data.username)).first()
+    if not user or not pwd_context.verify(form_data.password, user.hashed_password):
+        raise HTTPException(status_code=401)
+    return "ok"
+
+
+@app.get("/bench/ping")
+async def ping():
+    return "pong"
+
+
+def run_server() -> None:
+    limiter.enabled = False  # Se mide bcrypt, no el límite por IP
+    uvicorn.run(app, port=PORT, log_level="warning", lifespan="off")
+
+
+def wait_for_server() -> None:
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{PORT}/bench/ping", timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError("El servidor de prueba no arrancó")
+
+
+async def run(path: str, logins: int) -> None:
+    latencies = []
+    statuses = Counter()
+    done = False
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=300,
+                                 limits=httpx.Limits(max_connections=logins + 1)) as client:
+        async def probe():
+            while not done:
+                start = time.perf_counter()
+                await client.get("/bench/ping")
+                latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.02)
+
+        async def login():
+            response = await client.post(path, data={"username": EMAIL, "password": PASSWORD})
+            statuses[response.status_code] += 1
+
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        done = True
+        await prober
+
+    codes = ", ".join(f"{code}×{count}" for code, count in sorted(statuses.items()))
+    print(f"  {path:<28} {elapsed:>6.2f} s ({statuses[200] / elapsed:>5.1f} ok/s, {codes})   "
+          f"ping p50 {statistics.median(latencies) * 1000:>7.1f} ms   máx {max(latencies) * 1000:>7.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(parents=[ROUNDS_ARG])
+    parser.add_argument("--logins", type=int, default=60)
+    args = parser.parse_args()
+
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(email=EMAIL, hashed_password=get_password_hash(PASSWORD), full_name="Benchmark",
+                         role=UserRole.ADMIN_SYS, area=UserArea.SISTEMAS))
+        session.commit()
+
+    # El servidor en otro proceso: el cliente no le quita CPU (GIL)
+    server = multiprocessing.Process(target=run_server, daemon=True)
+    server.start()
+    wait_for_server()
+
+    print(f"{args.logins} inicios de sesión simultáneos (bcrypt costo {args.rounds}) a un solo worker:")
+    try:
+        for path in ("/bench/antes", "/api/v1/login/access-token"):
+            asyncio.run(run(path, args.logins))
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
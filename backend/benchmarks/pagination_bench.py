@@ -0,0 +1,48 @@
+"""
+Total de un listado paginado: cargar todas las filas y hacer len() contra un COUNT en SQL.
+
+    python -m benchmarks.pagination_bench 10000 100000 1000000
+
+Por cada tamaño imprime latencia y pico de memoria de Python (tracemalloc) de ambas formas.
+"""
+import sys
+import time
+import tracemalloc
+
+from benchmarks.common import import_models, setup_env, seed_applications
+
+setup_env()
+import_models()
+
+from sqlmodel import SQLModel, Session, select  # noqa: E402
+
+from app.core.database import engine  # noqa: E402
+from app.core.pagination import count_query  # noqa: E402
+from app.models.scholarship_model import ScholarshipApplication  # noqa: E402
+
+
+def measure(label: str, fn) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    total = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<12} total={total:>8}  {elapsed * 1000:>9.1f} ms  pico {peak / 1024 / 1024:>8.1f} MiB")
+
+
+def main(sizes) -> None:
+    for size in sizes:
+        SQLModel.metadata.drop_all(engine)
+        SQLModel.metadata.create_all(engine)
+        scholarship_id = seed_applications(engine, size)
+        query = select(ScholarshipApplication).where(ScholarshipApplication.scholarship_id == scholarship_id)
+        print(f"{size} solicitudes:")
+        with Session(engine) as session:
+            measure("len(all())", lambda: len(session.exec(query).all()))
+        with Session(engine) as session:
+            measure("count(*)", lambda: count_query(session, query))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,83 @@
+"""
+Páginas por segundo del formulario del expediente (sin evidencias), en un solo proceso:
+antes (el PNG del logo, 2331x1803, se decodificaba y comprimía en cada documento)
+contra get_logo() (decodificado y reducido una sola vez por proceso).
+
+    python -m benchmarks.pdf_header_bench --documents 30
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.common import import_models, setup_env
+
+setup_env()
+import_models()
+
+from pypdf import PdfReader  # noqa: E402
+
+from app.models.scholarship_model import ScholarshipApplication  # noqa: E402
+from app.services import pdf_service  # noqa: E402
+
+
+def sample_application() -> dict:
+    application = ScholarshipApplication(
+        id=1, scholarship_id=1, full_name="Alumno de Prueba", email="a@ceitm.mx", phone_number="4430000000",
+        control_number="20120001", career="Ingeniería en Sistemas Computacionales", semester="5",
+        student_photo="", arithmetic_average=90.0, certified_average=91.0,
+        address="Av. Tecnológico 1500, Lomas de Santiaguito, Morelia " * 2,
+        origin_address="Uruapan, Michoacán", economic_dependence="Padres", dependents_count=3,
+        family_income=9000.0, income_per_capita=3000.0, previous_scholarship="No",
+        motivos="Necesito apoyo para continuar mis estudios. " * 40,
+        doc_address="", doc_income="", doc_ine="", doc_kardex="", created_at=datetime.utcnow(),
+    )
+    return application.model_dump()
+
+
+def run(mode: str, documents: int, output_dir: str) -> None:
+    # 'antes': get_logo() regresa la ruta del PNG, así fpdf lo vuelve a abrir en cada documento
+    get_logo = pdf_service.get_logo
+    if mode == "antes":
+        pdf_service.get_logo = lambda: pdf_service.LOGO_PATH
+
+    data = sample_application()
+    no_evidences = [None] * len(pdf_service.evidence_documents(pdf_service.SimpleNamespace(**data)))
+    output_path = os.path.join(output_dir, f"{mode}.pdf")
+    try:
+        # Los mensajes de progreso del render no se mezclan con los resultados
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed, pages = render_many(data, no_evidences, output_path, documents)
+    finally:
+        pdf_service.get_logo = get_logo
+
+    print(f"  {mode:<8} {documents / elapsed:>6.1f} documentos/s   {documents * pages / elapsed:>6.1f} páginas/s "
+          f"({pages} páginas por documento, {os.path.getsize(output_path) // 1024} KB)")
+
+
+def render_many(data: dict, no_evidences: list, output_path: str, documents: int):
+    pdf_service.render_scholarship_pdf(data, None, no_evidences, output_path)  # Calentamiento
+    pages = len(PdfReader(output_path).pages)
+
+    start = time.perf_counter()
+    for _ in range(documents):
+        pdf_service.render_scholarship_pdf(data, None, no_evidences, output_path)
+    return time.perf_counter() - start, pages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        print(f"{args.documents} formularios renderizados en un solo proceso:")
+        for mode in ("antes", "despues"):
+            run(mode, args.documents, output_dir)
+
+
+if __name__ == "__main__":
+    main()
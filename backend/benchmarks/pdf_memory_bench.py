@@ -0,0 +1,150 @@
+"""
+Pico de memoria (RSS) al descargar un expediente con evidencias escaneadas grandes:
+el PDF se escribe a un archivo temporal y se envía por bloques, contra el esquema anterior
+de tenerlo completo en memoria (BytesIO -> getvalue() -> otro BytesIO para la respuesta).
+
+Cada modo corre en un proceso nuevo; el pico del worker se mide desde justo antes de la descarga.
+Las evidencias son archivos de nuestro /static (así llegan las subidas), que el proceso hijo
+lee directo del disco; las de hosts externos se descargan en el worker y su tamaño se suma al pico.
+
+    python -m benchmarks.pdf_memory_bench --evidences 3 --pages 12
+"""
+import argparse
+import asyncio
+import io
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import setup_env, import_models
+
+
+def scanned_pdf(pages: int) -> bytes:
+    """PDF con páginas de 'escaneo' (ruido en JPEG, no se puede comprimir más)."""
+    from fpdf import FPDF
+    from PIL import Image
+
+    pdf = FPDF()
+    for _ in range(pages):
+        image = Image.frombytes("RGB", (1600, 1200), os.urandom(1600 * 1200 * 3))
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=95)
+        pdf.add_page()
+        pdf.image(buffer, x=0, y=0, w=210)
+    return bytes(pdf.output())
+
+
+def proc_status_mib(field: str) -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024  # En KiB
+    raise KeyError(field)
+
+
+def reset_peak_rss() -> None:
+    """Reinicia VmHWM (Linux >= 4.0): así el pico no incluye lo que costó importar y preparar."""
+    with open("/proc/self/clear_refs", "w") as clear_refs:
+        clear_refs.write("5")
+
+
+def run_mode(mode: str, evidences: int, static_root: str, results) -> None:
+    # Los mensajes del render (este proceso y sus hijos) no se mezclan con la tabla de resultados
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    setup_env()
+    import_models()
+    from datetime import datetime
+    from sqlmodel import Session
+    from app.core.database import engine, init_db
+    from app.api.v1.endpoints.scholarships import download_application_pdf
+    from app.models.scholarship_model import Scholarship, ScholarshipApplication, ScholarshipType
+    from app.models.user_model import User, UserRole, UserArea
+    from app.core.config import settings
+    from app.services import pdf_service
+
+    pdf_service.STATIC_ROOT = Path(static_root)
+    evidence_url = f"{settings.DOMAIN}/static/evidencia.pdf"
+    docs = ["doc_ine", "doc_kardex", "doc_income", "doc_address", "doc_extra"][:evidences]
+
+    init_db()
+    with Session(engine) as session:
+        scholarship = Scholarship(name="Benchmark", type=ScholarshipType.ALIMENTICIA, description="d",
+                                  start_date=datetime.utcnow(), end_date=datetime.utcnow(),
+                                  results_date=datetime.utcnow(), folio_identifier="BENCH")
+        session.add(scholarship)
+        session.commit()
+        application = ScholarshipApplication(**{
+            "scholarship_id": scholarship.id, "full_name": "Alumno", "email": "a@ceitm.mx", "phone_number": "0",
+            "control_number": "20120001", "career": "Sistemas", "semester": "3", "student_photo": "",
+            "address": "", "origin_address": "", "economic_dependence": "", "dependents_count": 0,
+            "family_income": 0, "income_per_capita": 0, "motivos": "",
+            "doc_address": "", "doc_income": "", "doc_ine": "", "doc_kardex": "",
+            **{doc: evidence_url for doc in docs},
+        })
+        session.add(application)
+        session.commit()
+        application_id = application.id
+
+    user = User(email="bench@ceitm.mx", hashed_password="x", full_name="Bench",
+                role=UserRole.ADMIN_SYS, area=UserArea.SISTEMAS)
+
+    async def download() -> int:
+        with Session(engine) as session:
+            response = await download_application_pdf(application_id, session, user)
+            if mode == "memoria":
+                # Esquema anterior: el expediente completo en un BytesIO y una copia más para la respuesta
+                buffer = io.BytesIO()
+                async for chunk in response.body_iterator:
+                    buffer.write(chunk)
+                body = io.BytesIO(buffer.getvalue())
+                return len(body.getvalue())
+            sent = 0
+            async for chunk in response.body_iterator:
+                sent += len(chunk)  # Se "envía" y se descarta, como hace el servidor
+            return sent
+
+    baseline = proc_status_mib("VmRSS")
+    reset_peak_rss()
+    size = asyncio.run(download())
+    worker_mib = proc_status_mib("VmHWM") - baseline
+    pdf_service.get_render_pool().shutdown(wait=True)  # RUSAGE_CHILDREN solo cuenta hijos ya terminados
+    child_mib = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024  # Linux reporta KiB
+    results.put((mode, size, worker_mib, child_mib))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--evidences", type=int, default=3, choices=range(1, 6))
+    parser.add_argument("--pages", type=int, default=12, help="Páginas escaneadas por evidencia")
+    args = parser.parse_args()
+
+    # static/ temporal: el benchmark no escribe en el static/ real del repositorio.
+    # La evidencia se genera aquí para que su costo no entre en el pico de los procesos medidos
+    static_root = tempfile.mkdtemp(prefix="ceitm-bench-static-")
+    Path(static_root, "evidencia.pdf").write_bytes(scanned_pdf(args.pages))
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    try:
+        for mode in ("memoria", "archivo"):
+            process = context.Process(target=run_mode, args=(mode, args.evidences, static_root, results))
+            process.start()
+            process.join()
+            if process.exitcode != 0:
+                raise SystemExit(f"El modo '{mode}' falló (código {process.exitcode})")
+            mode, size, worker_mib, child_mib = results.get()
+            if mode == "memoria":
+                print(f"Expediente de {size / 1024 / 1024:.0f} MiB "
+                      f"({args.evidences} evidencias de {args.pages} páginas):")
+            print(f"  {mode:<8} pico del worker: +{worker_mib:>6.0f} MiB   "
+                  f"pico del proceso de render: {child_mib:>6.0f} MiB")
+    finally:
+        shutil.rmtree(static_root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Muchas subidas simultáneas a un solo worker, midiendo cuánto se atrasa una petición ligera
+que llega mientras tanto: antes (copyfileobj bloqueante dentro del endpoint async) contra
+/utils/upload/file (copia por bloques en el thread pool, con límite de tamaño y firma).
+
+    python -m benchmarks.upload_bench --uploads 40 --size-mb 8
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from uuid import uuid4
+
+from benchmarks.common import import_models, setup_env
+
+setup_env(UPLOAD_MAX_FILE_BYTES=str(64 * 1024 * 1024))
+import_models()
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import File, UploadFile  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+
+from app.core.database import engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+PORT = 8766
+
+
+@app.post("/bench/antes")
+async def upload_blocking(file: UploadFile = File(...)):
+    """Como estaba antes: copia bloqueante en el event loop, sin límite ni validación."""
+    upload_dir = Path("static/uploads")
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    with (upload_dir / f"{uuid4()}.pdf").open("wb") as buffer:
+        shutil.copyfileobj(file.file, buffer)
+    return "ok"
+
+
+@app.get("/bench/ping")
+async def ping():
+    return "pong"
+
+
+def run_server(work_dir: str) -> None:
+    os.chdir(work_dir)  # static/ del benchmark, no el del repositorio
+    uvicorn.run(app, port=PORT, log_level="warning", lifespan="off")
+
+
+def wait_for_server() -> None:
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{PORT}/bench/ping", timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError("El servidor de prueba no arrancó")
+
+
+async def run(path: str, uploads: int, size_mb: int) -> None:
+    # Contenido distinto por subida: el almacén por contenido no puede ahorrarse la escritura
+    payloads = [b"%PDF-1.4\n" + os.urandom(size_mb * 1024 * 1024) for _ in range(uploads)]
+    latencies = []
+    done = False
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=300) as client:
+        async def probe():
+            while not done:
+                start = time.perf_counter()
+                await client.get("/bench/ping")
+                latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.02)
+
+        async def upload(index: int):
+            response = await client.post(path, files={"file": (f"archivo{index}.pdf", payloads[index],
+                                                               "application/pdf")})
+            response.raise_for_status()
+
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(upload(i) for i in range(uploads)))
+        elapsed = time.perf_counter() - start
+        done = True
+        await prober
+
+    print(f"  {path:<24} {elapsed:>6.2f} s ({uploads * size_mb / elapsed:>6.1f} MB/s)   "
+          f"ping p50 {statistics.median(latencies) * 1000:>7.1f} ms   máx {max(latencies) * 1000:>7.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=40)
+    parser.add_argument("--size-mb", type=int, default=8)
+    args = parser.parse_args()
+
+    SQLModel.metadata.create_all(engine)
+    work_dir = tempfile.mkdtemp(prefix="ceitm-bench-uploads-")
+    # El servidor en otro proceso: el cliente no le quita CPU (GIL)
+    server = multiprocessing.Process(target=run_server, args=(work_dir,), daemon=True)
+    server.start()
+    wait_for_server()
+
+    print(f"{args.uploads} subidas simultáneas de {args.size_mb} MB a un solo worker:")
+    try:
+        for path in ("/bench/antes", "/api/v1/utils/upload/file"):
+            asyncio.run(run(path, args.uploads, args.size_mb))
+    finally:
+        server.terminate()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
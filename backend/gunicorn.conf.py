@@ -0,0 +1,56 @@
+"""
+Perfil de producción: Gunicorn como administrador de procesos y N workers de Uvicorn.
+
+Uso:  gunicorn -c gunicorn.conf.py app.main:app
+
+El proceso maestro prepara la BD y los directorios UNA sola vez (on_starting),
+así los workers no compiten ejecutando init_db() al mismo tiempo.
+"""
+import os
+
+from app.core.config import settings
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+
+# Por defecto 2 workers por núcleo + 1 (PDFs, bcrypt y Excel son trabajo de CPU).
+# Se toma de Settings porque el tamaño del pool de cada worker se deriva de este número.
+workers = settings.web_concurrency
+worker_class = "app.core.server.ProductionUvicornWorker"
+
+# Cargamos la app una vez en el maestro y los workers la heredan con fork (arranque más rápido)
+preload_app = True
+
+# Reinicios ordenados: un worker tiene hasta 'graceful_timeout' para terminar sus peticiones
+timeout = int(os.getenv("WORKER_TIMEOUT", 120))  # Generar un expediente PDF puede tardar
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+# Reciclamos workers de vez en cuando para contener fugas de memoria (PIL/pypdf)
+max_requests = int(os.getenv("MAX_REQUESTS", 1000))
+max_requests_jitter = 100
+
+# Solo los proxies de confianza pueden reescribir la IP del cliente (con "*" cualquiera
+# podría mandar su propio X-Forwarded-For y brincarse el límite de peticiones)
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", os.getenv("TRUSTED_PROXIES", "127.0.0.1,::1"))
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    """Se ejecuta una sola vez en el maestro, antes de crear los workers."""
+    from app.main import prepare_runtime
+
+    prepare_runtime()
+    # Los workers heredan esta variable y se saltan la inicialización en su lifespan
+    os.environ["CEITM_RUNTIME_READY"] = "1"
+
+
+def post_fork(server, worker):
+    """Cada worker descarta las conexiones heredadas del maestro y abre las suyas."""
+    from app.core.database import engine, async_engine, replica_engine, async_replica_engine
+
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+    if replica_engine is not None:
+        replica_engine.dispose(close=False)
+        async_replica_engine.sync_engine.dispose(close=False)
@@ -0,0 +1,129 @@
+"""
+Configuración común de las pruebas: BD SQLite temporal, cliente HTTP y usuarios con token.
+Se corren desde backend/:  pip install -r requirements-dev.txt && python -m pytest
+"""
+import os
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Las variables deben existir antes de importar app.* (Settings se lee al importar)
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+_tmp_dir = tempfile.mkdtemp(prefix="ceitm-tests-")
+_test_env = {
+    "POSTGRES_USER": "ceitm",
+    "POSTGRES_PASSWORD": "ceitm",
+    "POSTGRES_DB": "ceitm",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_PORT": "5432",
+    "DATABASE_URL": f"sqlite:///{_tmp_dir}/test.db",
+    "SECRET_KEY": "clave-de-pruebas",
+    "MAIL_USERNAME": "pruebas",
+    "MAIL_PASSWORD": "pruebas",
+    "MAIL_FROM": "pruebas@ceitm.mx",
+    "MAIL_SERVER": "localhost",
+    "SQL_ECHO": "false",
+    "PASSWORD_BCRYPT_ROUNDS": "4",  # Costo mínimo: las pruebas no miden bcrypt
+    "PDF_CACHE_DIR": f"{_tmp_dir}/expedientes",
+    "PDF_EXPORT_DIR": f"{_tmp_dir}/exportaciones",
+    "PDF_IMAGE_CACHE_DIR": f"{_tmp_dir}/imagenes",
+    "BLOB_SWEEP_INTERVAL_MINUTES": "0",
+}
+for key, value in _test_env.items():
+    os.environ.setdefault(key, value)
+os.chdir(BACKEND_DIR)  # La app monta static/ y templates/ con rutas relativas
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel
+
+from app.core.database import engine
+from app.core import principal_cache
+from app.core.limiter import limiter
+from app.core.principal import Principal
+from app.core.security import create_access_token, get_password_hash
+from app.main import app
+from app.migrate import migrate
+from app.models.scholarship_model import Scholarship, ScholarshipApplication, ScholarshipType
+from app.models.user_model import User, UserRole, UserArea
+
+migrate()
+
+
+@pytest.fixture(autouse=True)
+def clean_database():
+    """Cada prueba empieza con las tablas vacías, los contadores del rate limit en cero y sin usuarios en caché."""
+    yield
+    limiter.reset()
+    # SQLite reutiliza los ids borrados: una foto de otra prueba no debe colarse
+    principal_cache.principal_cache = principal_cache._build_backend()
+    with Session(engine) as session:
+        for table in reversed(SQLModel.metadata.sorted_tables):
+            session.execute(table.delete())
+        session.commit()
+
+
+@pytest.fixture
+def session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def make_user(session):
+    def _make_user(role: UserRole = UserRole.ADMIN_SYS, area: UserArea = UserArea.SISTEMAS,
+                   email: str = None, password: str = "secreta123", **fields) -> User:
+        user = User(email=email or f"{role.value}-{area.name.lower()}@ceitm.mx",
+                    hashed_password=get_password_hash(password), full_name="Usuario de Prueba",
+                    role=role, area=area, **fields)
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        return user
+    return _make_user
+
+
+@pytest.fixture
+def auth_headers():
+    def _auth_headers(user: User) -> dict:
+        return {"Authorization": f"Bearer {create_access_token(Principal.from_user(user))}"}
+    return _auth_headers
+
+
+@pytest.fixture
+def make_scholarship(session):
+    def _make_scholarship(**fields) -> Scholarship:
+        now = datetime.utcnow()
+        scholarship = Scholarship(**{
+            "name": "Beca Alimenticia", "type": ScholarshipType.ALIMENTICIA, "description": "d",
+            "start_date": now, "end_date": now + timedelta(days=30), "results_date": now + timedelta(days=40),
+            "folio_identifier": "ALI", **fields,
+        })
+        session.add(scholarship)
+        session.commit()
+        session.refresh(scholarship)
+        return scholarship
+    return _make_scholarship
+
+
+@pytest.fixture
+def make_application(session):
+    def _make_application(scholarship: Scholarship, control_number: str, **fields) -> ScholarshipApplication:
+        application = ScholarshipApplication(**{
+            "scholarship_id": scholarship.id, "full_name": f"Alumno {control_number}", "email": "a@ceitm.mx",
+            "phone_number": "0", "control_number": control_number, "career": "Sistemas", "semester": "3",
+            "student_photo": "", "address": "", "origin_address": "", "economic_dependence": "",
+            "dependents_count": 0, "family_income": 0, "income_per_capita": 0, "motivos": "",
+            "doc_address": "", "doc_income": "", "doc_ine": "", "doc_kardex": "", **fields,
+        })
+        session.add(application)
+        session.commit()
+        session.refresh(application)
+        return application
+    return _make_application
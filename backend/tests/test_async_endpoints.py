@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+
+from app.core.database import async_engine
+from app.main import app
+from app.models.complaint_model import Complaint, ComplaintType
+from app.models.map_model import Building, Room
+from app.models.news_model import News
+
+
+def test_estatus_de_solicitudes_publico(client, make_scholarship, make_application):
+    scholarship = make_scholarship()
+    make_application(scholarship, "20120001")
+    make_application(scholarship, "20120002")
+
+    response = client.get("/api/v1/becas/status/20120001")
+    assert response.status_code == 200
+    assert [item["control_number"] for item in response.json()] == ["20120001"]
+
+
+def test_seguimiento_de_queja(client, session):
+    session.add(Complaint(full_name="A", control_number="C1", phone_number="0", email="a@ceitm.mx",
+                          career="Sistemas", semester="1", type=ComplaintType.QUEJA, description="d",
+                          tracking_code="CEITM-2026-001"))
+    session.commit()
+
+    assert client.get("/api/v1/quejas/track/ceitm-2026-001").status_code == 200
+    assert client.get("/api/v1/quejas/track/NO-EXISTE").status_code == 404
+
+
+def test_noticias_publicas_solo_publicadas(client, session):
+    session.add(News(title="Visible", slug="visible", excerpt="e", content="c", category="BECAS"))
+    session.add(News(title="Borrador", slug="borrador", excerpt="e", content="c", is_published=False))
+    session.commit()
+
+    assert [n["title"] for n in client.get("/api/v1/noticias/public").json()] == ["Visible"]
+    assert client.get("/api/v1/noticias/public", params={"category": "ACADEMICO"}).json() == []
+
+
+def test_busqueda_del_mapa(client, session):
+    building = Building(name="Edificio K", code="K", tags="sistemas")
+    session.add(building)
+    session.commit()
+    session.add(Room(name="K1", building_id=building.id))
+    session.commit()
+
+    results = client.get("/api/v1/map/buildings/search", params={"q": "k"}).json()
+    assert {(r["type"], r["name"]) for r in results} == {("BUILDING", "Edificio K"), ("ROOM", "K1")}
+
+
+def test_peticiones_concurrentes_en_un_solo_event_loop(session):
+    """Los endpoints async atienden muchas peticiones a la vez sin ocupar hilos del thread pool."""
+    for i in range(20):
+        session.add(News(title=f"Noticia {i}", slug=f"noticia-{i}", excerpt="e", content="c"))
+    session.commit()
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(*[client.get("/api/v1/noticias/public") for _ in range(50)])
+        await async_engine.dispose()  # Las conexiones de aiosqlite quedan ligadas a este event loop
+        return responses
+
+    responses = asyncio.run(run())
+    assert all(r.status_code == 200 and len(r.json()) == 20 for r in responses)
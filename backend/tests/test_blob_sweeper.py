@@ -0,0 +1,83 @@
+import asyncio
+import io
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import select
+
+from app.core.config import settings
+from app.models.blob_model import StoredBlob
+from app.services import blob_store
+
+
+@pytest.fixture(autouse=True)
+def blob_dir(tmp_path, monkeypatch):
+    """El almacén usa rutas relativas (static/blobs): las pruebas escriben en un directorio temporal."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def put_blob(content: bytes) -> str:
+    return blob_store.put(io.BytesIO(b""), content, "pdf", max_bytes=1024)
+
+
+def run_sweeper_briefly(monkeypatch, is_leader: bool) -> list:
+    sweeps = []
+    monkeypatch.setattr(settings, "BLOB_SWEEP_INTERVAL_MINUTES", 0)  # Sin espera entre vueltas
+    monkeypatch.setattr(blob_store, "acquire_sweeper_leadership", lambda: is_leader)
+    monkeypatch.setattr(blob_store, "sweep_unreferenced_blobs", lambda: sweeps.append(1) or 0)
+
+    async def run():
+        task = asyncio.create_task(blob_store.run_blob_sweeper())
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+    asyncio.run(run())
+    return sweeps
+
+
+def test_solo_el_lider_barre(monkeypatch):
+    assert run_sweeper_briefly(monkeypatch, is_leader=False) == []
+    assert run_sweeper_briefly(monkeypatch, is_leader=True)
+
+
+def test_sin_postgres_siempre_es_lider():
+    assert blob_store.acquire_sweeper_leadership()
+    blob_store.release_sweeper_leadership()
+
+
+def test_barrido_borra_solo_lo_que_nadie_usa(session, blob_dir, make_scholarship, make_application):
+    used_url = put_blob(b"%PDF-1.4 INE")
+    orphan_url = put_blob(b"%PDF-1.4 abandonado")
+    recent_url = put_blob(b"%PDF-1.4 recien subido")
+    make_application(make_scholarship(), "20120001", doc_ine=used_url)
+
+    # Los dos primeros ya pasaron el periodo de gracia; el último se acaba de subir
+    old = datetime.utcnow() - timedelta(hours=settings.BLOB_SWEEP_GRACE_HOURS + 1)
+    for blob in session.exec(select(StoredBlob)).all():
+        if blob.sha256 not in recent_url:
+            blob.last_uploaded_at = old
+            session.add(blob)
+    session.commit()
+
+    assert blob_store.sweep_unreferenced_blobs() == 1
+    assert not (blob_dir / orphan_url.removeprefix(f"{settings.DOMAIN}/")).exists()
+    assert (blob_dir / used_url.removeprefix(f"{settings.DOMAIN}/")).exists()
+
+    session.expire_all()
+    remaining = {blob.sha256: blob.ref_count for blob in session.exec(select(StoredBlob)).all()}
+    assert [sha for sha in remaining if sha in orphan_url] == []
+    assert [count for sha, count in remaining.items() if sha in used_url] == [1]
+    assert [count for sha, count in remaining.items() if sha in recent_url] == [0]
+
+
+def test_mismo_contenido_con_otra_extension_reutiliza_el_archivo(session, blob_dir):
+    """Un .docx y un .xlsx son ZIP: los mismos bytes con otra extensión no dejan un archivo sin fila."""
+    content = b"PK\x03\x04 mismo documento"
+    first_url = blob_store.put(io.BytesIO(b""), content, "docx", max_bytes=1024)
+    second_url = blob_store.put(io.BytesIO(b""), content, "xlsx", max_bytes=1024)
+
+    assert second_url == first_url
+    assert [path.suffix for path in (blob_dir / "static/blobs").rglob("*") if path.is_file()] == [".docx"]
+    [blob] = session.exec(select(StoredBlob)).all()
+    assert (blob.extension, blob.ref_count) == ("docx", 2)
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import inspect
+
+from app.core.database import engine
+from app.models.complaint_model import Complaint, ComplaintType
+
+
+@pytest.fixture
+def complaints(session):
+    same_moment = datetime(2026, 3, 1, 12, 0, 0)  # Empates en created_at: el id desempata
+    for i in range(23):
+        session.add(Complaint(
+            full_name=f"Alumno {i}", control_number=f"C{i:03d}", phone_number="0", email="a@ceitm.mx",
+            career="Sistemas", semester="1", type=ComplaintType.QUEJA, description="d",
+            tracking_code=f"T{i:03d}", created_at=same_moment,
+        ))
+    session.commit()
+
+
+def test_cursor_recorre_todo_sin_repetir(client, complaints, make_user, auth_headers):
+    headers = auth_headers(make_user())
+    first = client.get("/api/v1/quejas/", params={"limit": 10}, headers=headers).json()
+    assert first["total"] == 23
+
+    seen = [item["id"] for item in first["items"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = client.get("/api/v1/quejas/", params={"limit": 10, "cursor": cursor}, headers=headers).json()
+        assert page["total"] is None  # En modo cursor ya no se cuenta
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+
+    assert len(seen) == len(set(seen)) == 23
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_cursor_alterado(client, make_user, auth_headers):
+    response = client.get("/api/v1/quejas/", params={"cursor": "no-es-un-cursor"}, headers=auth_headers(make_user()))
+    assert response.status_code == 400
+
+
+def test_migracion_crea_indices_compuestos():
+    indexes = {index["name"] for index in inspect(engine).get_indexes("complaint")}
+    assert "ix_complaint_created_id" in indexes
@@ -0,0 +1,189 @@
+import asyncio
+import socket
+from datetime import datetime, timedelta
+
+import aiosmtplib
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.models.email_model import EmailStatus, OutboxEmail
+from app.services import email_outbox
+
+
+class StandInSmtp:
+    """Servidor SMTP de prueba: acepta todo salvo los destinatarios con respuesta configurada."""
+
+    def __init__(self):
+        self.replies = {}
+        self.delivered = []
+        self.greetings = 0  # Un EHLO por conexión SMTP
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.greetings += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.replies:
+            return self.replies[address]
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.delivered.extend(envelope.rcpt_tos)
+        return "250 OK"
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = StandInSmtp()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    for field, value in {"MAIL_SERVER": "127.0.0.1", "MAIL_PORT": port, "MAIL_STARTTLS": False,
+                         "MAIL_SSL_TLS": False, "USE_CREDENTIALS": False}.items():
+        monkeypatch.setattr(email_outbox.conf, field, value)
+    yield handler
+    controller.stop()
+
+
+def queue(session, email_to: str, **fields) -> OutboxEmail:
+    email = OutboxEmail(email_to=email_to, subject="Tu solicitud", template_name="accepted.html",
+                        context={"name": "Alumno", "scholarship": "Alimenticia"}, **fields)
+    session.add(email)
+    session.commit()
+    session.refresh(email)
+    return email
+
+
+def run_worker_pass() -> list:
+    """Una vuelta del worker: toma un lote, lo envía y guarda el resultado."""
+    async def run():
+        sender = email_outbox.SmtpSender()
+        batch = email_outbox.claim_batch(50)
+        if batch:
+            await email_outbox.send_batch(batch, [sender])
+        await sender.close()
+        return batch
+
+    return asyncio.run(run())
+
+
+def send_through_one_sender(emails: list) -> None:
+    async def run():
+        sender = email_outbox.SmtpSender()
+        for email in emails:
+            await sender.send(email_outbox.build_message(email))
+        await sender.close()
+
+    asyncio.run(run())
+
+
+def test_reutiliza_la_conexion(session, smtp):
+    emails = [queue(session, f"alumno{i}@ceitm.mx") for i in range(5)]
+
+    send_through_one_sender(emails)
+
+    assert smtp.delivered == [f"alumno{i}@ceitm.mx" for i in range(5)]
+    assert smtp.greetings == 1
+
+
+def test_reconecta_despues_del_limite_por_conexion(session, smtp, monkeypatch):
+    monkeypatch.setattr(email_outbox.settings, "MAIL_OUTBOX_MESSAGES_PER_CONNECTION", 2)
+    emails = [queue(session, f"alumno{i}@ceitm.mx") for i in range(5)]
+
+    send_through_one_sender(emails)
+
+    assert len(smtp.delivered) == 5
+    assert smtp.greetings == 3  # 2 + 2 + 1
+
+
+def test_rechazo_temporal_se_reintenta(session, smtp):
+    smtp.replies["greylist@ceitm.mx"] = "450 4.7.1 Greylisted, intenta mas tarde"
+    delivered = queue(session, "ok@ceitm.mx")
+    greylisted = queue(session, "greylist@ceitm.mx")
+
+    run_worker_pass()
+
+    session.refresh(delivered)
+    session.refresh(greylisted)
+    assert delivered.status == EmailStatus.ENVIADO
+    assert greylisted.status == EmailStatus.PENDIENTE
+    assert greylisted.attempts == 1
+    assert "450" in greylisted.last_error
+    assert greylisted.next_attempt_at > datetime.utcnow()
+
+    # Ya pasó el backoff y el servidor lo acepta
+    del smtp.replies["greylist@ceitm.mx"]
+    greylisted.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    session.add(greylisted)
+    session.commit()
+    run_worker_pass()
+
+    session.refresh(greylisted)
+    assert greylisted.status == EmailStatus.ENVIADO
+    assert greylisted.attempts == 2
+    assert smtp.delivered == ["ok@ceitm.mx", "greylist@ceitm.mx"]
+
+
+def test_rechazo_definitivo_no_se_reintenta(session, smtp):
+    smtp.replies["nadie@ceitm.mx"] = "550 5.1.1 El buzon no existe"
+    rejected = queue(session, "nadie@ceitm.mx")
+    delivered = queue(session, "ok@ceitm.mx")
+
+    run_worker_pass()
+
+    session.refresh(rejected)
+    session.refresh(delivered)
+    assert rejected.status == EmailStatus.FALLIDO
+    assert rejected.attempts == 1
+    assert "550" in rejected.last_error
+    # El rechazo no tumbó la conexión: el siguiente correo salió por la misma
+    assert delivered.status == EmailStatus.ENVIADO
+    assert smtp.greetings == 1
+
+
+def test_se_retoman_correos_de_un_worker_caido(session, smtp):
+    now = datetime.utcnow()
+    orphaned = queue(session, "huerfano@ceitm.mx", status=EmailStatus.ENVIANDO,
+                     locked_until=now - timedelta(seconds=1))
+    in_flight = queue(session, "en-curso@ceitm.mx", status=EmailStatus.ENVIANDO,
+                      locked_until=now + timedelta(minutes=5))
+
+    assert [email.id for email in run_worker_pass()] == [orphaned.id]
+
+    session.refresh(orphaned)
+    session.refresh(in_flight)
+    assert orphaned.status == EmailStatus.ENVIADO
+    assert in_flight.status == EmailStatus.ENVIANDO
+    assert smtp.delivered == ["huerfano@ceitm.mx"]
+
+
+def test_solo_5xx_es_definitivo():
+    def refused(*codes):
+        return aiosmtplib.SMTPRecipientsRefused(
+            [aiosmtplib.SMTPRecipientRefused(code, "rechazado", f"{code}@ceitm.mx") for code in codes])
+
+    assert not email_outbox.is_permanent_error(refused(450))
+    assert not email_outbox.is_permanent_error(refused(550, 452))
+    assert email_outbox.is_permanent_error(refused(550, 553))
+    assert not email_outbox.is_permanent_error(aiosmtplib.SMTPSenderRefused(451, "ocupado", "pruebas@ceitm.mx"))
+    assert email_outbox.is_permanent_error(aiosmtplib.SMTPSenderRefused(553, "no permitido", "pruebas@ceitm.mx"))
+    assert not email_outbox.is_permanent_error(aiosmtplib.SMTPAuthenticationError(535, "credenciales"))
+    assert not email_outbox.is_permanent_error(aiosmtplib.SMTPServerDisconnected("se cayó"))
+
+
+def test_worker_espera_el_esquema_sin_crearlo(monkeypatch):
+    from app import email_worker
+
+    async def run(table_exists: bool) -> bool:
+        monkeypatch.setattr(email_worker, "_outbox_table_exists", lambda: table_exists)
+        stop = asyncio.Event()
+        asyncio.get_running_loop().call_later(0.1, stop.set)  # SIGTERM mientras espera
+        return await email_worker.wait_for_schema(stop)
+
+    monkeypatch.setattr(email_worker.settings, "MAIL_OUTBOX_POLL_SECONDS", 0.02)
+    assert asyncio.run(run(True))
+    assert not asyncio.run(run(False))
@@ -0,0 +1,71 @@
+"""Descargas de evidencias contra un servidor HTTP local que agrega latencia."""
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import pytest
+
+from app.services import pdf_service
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """GET /archivo?ms=300 responde el nombre del archivo después de 'ms' milisegundos; /404 falla."""
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        time.sleep(int(parse_qs(parts.query).get("ms", ["0"])[0]) / 1000)
+        if parts.path == "/404":
+            self.send_error(404)
+            return
+        body = parts.path.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def evidence_host():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def download(urls):
+    async def run():
+        try:
+            return await pdf_service.download_all(urls)
+        finally:
+            await pdf_service.close_http_client()
+    return asyncio.run(run())
+
+
+def test_descargas_en_paralelo_y_en_orden(evidence_host):
+    urls = [f"{evidence_host}/doc{i}?ms=300" for i in range(4)]
+    start = time.perf_counter()
+    results = download(urls)
+    elapsed = time.perf_counter() - start
+
+    assert [r.getvalue() for r in results] == [f"/doc{i}".encode() for i in range(4)]
+    assert elapsed < 0.9  # Una tras otra serían 1.2 s
+
+
+def test_errores_y_urls_vacias_conservan_su_lugar(evidence_host):
+    results = download([f"{evidence_host}/foto", None, f"{evidence_host}/404"])
+    assert results[0].getvalue() == b"/foto"
+    assert results[1] is None
+    assert isinstance(results[2], httpx.HTTPStatusError)
+
+
+def test_limite_global_de_tiempo(evidence_host, monkeypatch):
+    monkeypatch.setattr(pdf_service, "DOWNLOAD_DEADLINE_SECONDS", 0.3)
+    results = download([f"{evidence_host}/rapido", f"{evidence_host}/lento?ms=2000"])
+    assert results[0].getvalue() == b"/rapido"
+    assert isinstance(results[1], TimeoutError)
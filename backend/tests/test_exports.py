@@ -0,0 +1,109 @@
+import asyncio
+import io
+import time
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from app.core.config import settings
+from app.models.user_model import UserArea, UserRole
+from app.services import export_service
+
+
+@pytest.fixture
+def fake_render(monkeypatch):
+    """Sustituye el render real (pool de procesos) por uno que escribe un PDF mínimo."""
+    async def fake_generate(application, output_path):
+        Path(output_path).write_bytes(b"%PDF " + application.control_number.encode())
+        return output_path
+
+    monkeypatch.setattr(export_service, "generate_scholarship_pdf", fake_generate)
+
+
+@pytest.fixture
+def scholarship(make_scholarship, make_application):
+    scholarship = make_scholarship()
+    make_application(scholarship, "20120001", career="Sistemas")
+    make_application(scholarship, "20120002", career="Industrial")
+    return scholarship
+
+
+def wait_until_finished(client, job_id, headers):
+    for _ in range(100):
+        job = client.get(f"/api/v1/becas/exports/{job_id}", headers=headers).json()
+        if job["status"] != "en_proceso":
+            return job
+        time.sleep(0.05)
+    raise AssertionError("La exportación no terminó")
+
+
+def test_exportacion_zip_completa(client, scholarship, make_user, auth_headers, fake_render):
+    headers = auth_headers(make_user())
+    job = client.post(f"/api/v1/becas/{scholarship.id}/export", headers=headers).json()
+    assert "format" not in job
+
+    job = wait_until_finished(client, job["job_id"], headers)
+    assert job["status"] == "completado"
+    assert job["done"] == 2
+
+    response = client.get(f"/api/v1/becas/exports/{job['job_id']}/download", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    entries = zipfile.ZipFile(io.BytesIO(response.content)).namelist()
+    assert sorted(entries) == ["Industrial/20120002.pdf", "Sistemas/20120001.pdf"]
+
+
+def test_solo_quien_la_pidio_ve_la_exportacion(client, scholarship, make_user, auth_headers, fake_render):
+    concejal = make_user(role=UserRole.CONCEJAL, area=UserArea.ACADEMICO, career="Sistemas")
+    otro = make_user(role=UserRole.CONCEJAL, area=UserArea.VINCULACION, career="Industrial")
+    admin = make_user()
+
+    job = client.post(f"/api/v1/becas/{scholarship.id}/export", headers=auth_headers(concejal)).json()
+    job = wait_until_finished(client, job["job_id"], auth_headers(concejal))
+    assert job["total"] == 1
+
+    assert client.get(f"/api/v1/becas/exports/{job['job_id']}", headers=auth_headers(otro)).status_code == 403
+    assert client.get(f"/api/v1/becas/exports/{job['job_id']}/download",
+                      headers=auth_headers(otro)).status_code == 403
+    assert client.get(f"/api/v1/becas/exports/{job['job_id']}/download",
+                      headers=auth_headers(admin)).status_code == 200
+
+
+def test_exportacion_sin_latido_se_marca_fallida(monkeypatch):
+    job = {"job_id": "a" * 32, "scholarship_id": 1, "requester_id": 1, "status": "en_proceso",
+           "total": 1, "done": 0, "failed": [], "error": None, "created_at": "", "finished_at": None}
+    export_service._save_job(job)
+    assert export_service.read_job(job["job_id"])["status"] == "en_proceso"
+
+    monkeypatch.setattr(settings, "PDF_EXPORT_STALE_SECONDS", -1)
+    job = export_service.read_job(job["job_id"])
+    assert job["status"] == "error"
+    assert job["finished_at"]
+
+
+def test_arranque_marca_exportaciones_huerfanas():
+    job = {"job_id": "b" * 32, "scholarship_id": 1, "requester_id": 1, "status": "en_proceso",
+           "total": 1, "done": 0, "failed": [], "error": None, "created_at": "", "finished_at": None}
+    export_service._save_job(job)
+
+    export_service.fail_orphaned_exports()
+    assert export_service.read_job(job["job_id"])["status"] == "error"
+
+
+def test_apagado_cancela_y_marca_fallidas(scholarship, monkeypatch):
+    async def slow_generate(application, output_path):
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(export_service, "generate_scholarship_pdf", slow_generate)
+    application_ids = [application.id for application in scholarship.applications]
+
+    async def run():
+        job = export_service.start_export(scholarship.id, application_ids, requester_id=1)
+        await asyncio.sleep(0.1)
+        await export_service.abort_running_exports()
+        return job
+
+    job = asyncio.run(run())
+    assert export_service.read_job(job["job_id"])["status"] == "error"
+    assert not export_service.result_path(job).with_suffix(".part").exists()
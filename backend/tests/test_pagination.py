@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import select
+
+from app.core.pagination import count_query, paginate
+from app.models.complaint_model import Complaint, ComplaintType
+
+
+@pytest.fixture
+def complaints(session):
+    now = datetime.utcnow()
+    for i in range(25):
+        session.add(Complaint(
+            full_name=f"Alumno {i}", control_number=f"C{i:03d}", phone_number="0", email="a@ceitm.mx",
+            career="Sistemas" if i % 2 else "Mecánica", semester="1", type=ComplaintType.QUEJA,
+            description="d", tracking_code=f"T{i:03d}", created_at=now - timedelta(minutes=i),
+        ))
+    session.commit()
+
+
+def test_count_query_respeta_filtros(session, complaints):
+    query = select(Complaint).where(Complaint.career == "Sistemas")
+    assert count_query(session, query) == 12
+    assert count_query(session, select(Complaint).order_by(Complaint.id)) == 25
+
+
+def test_paginate_devuelve_total_y_solo_la_pagina(session, complaints):
+    total, items = paginate(session, select(Complaint), 20, 10, Complaint.created_at.desc())
+    assert total == 25
+    assert [c.tracking_code for c in items] == [f"T{i:03d}" for i in range(20, 25)]
+
+
+def test_paginate_fuera_de_rango(session, complaints):
+    total, items = paginate(session, select(Complaint), 100, 10)
+    assert total == 25
+    assert items == []
+
+
+def test_endpoint_paginado(client, complaints, make_user, auth_headers):
+    headers = auth_headers(make_user())
+    body = client.get("/api/v1/quejas/", params={"skip": 10, "limit": 10}, headers=headers).json()
+    assert body["total"] == 25
+    assert len(body["items"]) == 10
+
+
+@pytest.mark.parametrize("params", [{"limit": 0}, {"limit": 101}, {"skip": -1}])
+def test_endpoint_rechaza_limites_invalidos(client, make_user, auth_headers, params):
+    response = client.get("/api/v1/quejas/", params=params, headers=auth_headers(make_user()))
+    assert response.status_code == 422
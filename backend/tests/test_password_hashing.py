@@ -0,0 +1,68 @@
+from passlib.hash import bcrypt
+
+from app.core import security
+from app.core.config import settings
+
+
+def login(client, password="secreta123"):
+    return client.post("/api/v1/login/access-token", data={"username": "admin@ceitm.mx", "password": password})
+
+
+def rounds_of(hashed: str) -> int:
+    return int(hashed.split("$")[2])
+
+
+def user_with_old_cost(session, make_user, old_hash: str):
+    """Usuario cuyo hash se generó con otro costo (p. ej. antes de subir PASSWORD_BCRYPT_ROUNDS)."""
+    user = make_user(email="admin@ceitm.mx")
+    user.hashed_password = old_hash
+    session.add(user)
+    session.commit()
+    return user
+
+
+def test_login_rehashea_con_el_costo_configurado(client, session, make_user):
+    old_hash = bcrypt.using(rounds=settings.PASSWORD_BCRYPT_ROUNDS + 1).hash("secreta123")
+    user = user_with_old_cost(session, make_user, old_hash)
+    rehashed_before = security.get_password_hash_metrics()["rehashed"]
+
+    assert login(client).status_code == 200
+
+    session.refresh(user)
+    assert user.hashed_password != old_hash
+    assert rounds_of(user.hashed_password) == settings.PASSWORD_BCRYPT_ROUNDS
+    assert security.get_password_hash_metrics()["rehashed"] == rehashed_before + 1
+
+    # Con el costo correcto ya no se vuelve a escribir
+    current_hash = user.hashed_password
+    assert login(client).status_code == 200
+    session.refresh(user)
+    assert user.hashed_password == current_hash
+
+
+def test_contrasena_incorrecta_no_rehashea(client, session, make_user):
+    old_hash = bcrypt.using(rounds=settings.PASSWORD_BCRYPT_ROUNDS + 1).hash("secreta123")
+    user = user_with_old_cost(session, make_user, old_hash)
+
+    assert login(client, password="otra").status_code == 401
+    session.refresh(user)
+    assert user.hashed_password == old_hash
+
+
+def test_verify_and_update_con_costo_vigente():
+    hashed = security.get_password_hash("secreta123")
+    assert security.verify_and_update_password("secreta123", hashed) == (True, None)
+    assert security.verify_and_update_password("otra", hashed) == (False, None)
+
+
+def test_pool_lleno_responde_503(client, make_user, monkeypatch):
+    make_user(email="admin@ceitm.mx")
+    rejected_before = security.get_password_hash_metrics()["rejected"]
+    monkeypatch.setattr(security, "_password_slots", security.threading.BoundedSemaphore(1))
+    security._password_slots.acquire()  # Ocupado por otro login
+
+    response = login(client)
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert security.get_password_hash_metrics()["rejected"] == rejected_before + 1
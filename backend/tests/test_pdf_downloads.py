@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import pytest
+
+from app.api.v1.endpoints import scholarships
+from app.core.config import settings
+from app.services import pdf_cache
+
+CONTENIDO = b"%PDF-1.4 expediente de prueba " * 5000  # Más de un bloque de envío
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Sustituye el render real (pool de procesos) por uno que escribe un PDF fijo."""
+    calls = []
+
+    async def fake_generate(application, output_path):
+        calls.append(application.id)
+        Path(output_path).write_bytes(CONTENIDO)
+        return output_path
+
+    monkeypatch.setattr(scholarships, "generate_scholarship_pdf", fake_generate)
+    return calls
+
+
+@pytest.fixture
+def application(make_scholarship, make_application):
+    return make_application(make_scholarship(), "20120001")
+
+
+@pytest.fixture
+def headers(make_user, auth_headers):
+    return auth_headers(make_user())
+
+
+def spool_files():
+    return list(Path(settings.PDF_CACHE_DIR).glob("*.tmp"))
+
+
+def test_segunda_descarga_sale_de_la_cache(client, application, headers, renders):
+    for _ in range(2):
+        response = client.get(f"/api/v1/becas/applications/{application.id}/download", headers=headers)
+        assert response.status_code == 200
+        assert response.content == CONTENIDO
+        assert response.headers["content-length"] == str(len(CONTENIDO))
+        assert 'filename="20120001.pdf"' in response.headers["content-disposition"]
+
+    assert renders == [application.id]
+    assert spool_files() == []
+
+
+def test_desalojo_durante_la_descarga_no_la_corta(client, application, headers, renders, monkeypatch):
+    """Otro worker borra el expediente justo después de abrirlo: el descriptor abierto sigue sirviendo."""
+    client.get(f"/api/v1/becas/applications/{application.id}/download", headers=headers)
+    open_cached = pdf_cache.open_cached
+
+    def open_then_evict(app):
+        handle = open_cached(app)
+        pdf_cache.invalidate(app.id)
+        return handle
+
+    monkeypatch.setattr(pdf_cache, "open_cached", open_then_evict)
+    response = client.get(f"/api/v1/becas/applications/{application.id}/download", headers=headers)
+
+    assert response.status_code == 200
+    assert response.content == CONTENIDO
+    assert renders == [application.id]
+
+
+def test_expediente_recien_generado_sobrevive_a_la_invalidacion(client, application, headers, monkeypatch):
+    async def fake_generate(app, output_path):
+        Path(output_path).write_bytes(CONTENIDO)
+        return output_path
+
+    store_file = pdf_cache.store_file
+
+    def store_then_invalidate(app, tmp_path):
+        path = store_file(app, tmp_path)
+        pdf_cache.invalidate(app.id)  # Ej. un admin edita la solicitud mientras se descarga
+        return path
+
+    monkeypatch.setattr(scholarships, "generate_scholarship_pdf", fake_generate)
+    monkeypatch.setattr(pdf_cache, "store_file", store_then_invalidate)
+    response = client.get(f"/api/v1/becas/applications/{application.id}/download", headers=headers)
+
+    assert response.status_code == 200
+    assert response.content == CONTENIDO
+
+
+def test_error_al_generar_responde_500_sin_dejar_temporales(client, application, headers, monkeypatch):
+    async def failing_generate(app, output_path):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(scholarships, "generate_scholarship_pdf", failing_generate)
+    response = client.get(f"/api/v1/becas/applications/{application.id}/download", headers=headers)
+
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Error generando PDF"
+    assert spool_files() == []
+
+
+def test_cola_llena_responde_503(client, application, headers, monkeypatch):
+    async def busy_generate(app, output_path):
+        raise scholarships.RenderQueueFull("Hay demasiados expedientes en cola")
+
+    monkeypatch.setattr(scholarships, "generate_scholarship_pdf", busy_generate)
+    response = client.get(f"/api/v1/becas/applications/{application.id}/download", headers=headers)
+
+    assert response.status_code == 503
+    assert spool_files() == []
@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.core.database import PoolMetrics
+
+
+@pytest.fixture
+def tiny_pool(tmp_path):
+    """Pool de una sola conexión, para provocar esperas."""
+    metrics = PoolMetrics("pruebas")
+    engine = create_engine(f"sqlite:///{tmp_path}/pool.db", poolclass=metrics.pool_class(QueuePool),
+                           pool_size=1, max_overflow=0, pool_timeout=0.3)
+    metrics.attach(engine)
+    yield engine, metrics
+    engine.dispose()
+
+
+def test_mide_la_espera_en_la_cola(tiny_pool):
+    engine, metrics = tiny_pool
+    holder = engine.connect()
+    holder.execute(text("SELECT 1"))
+
+    waiter = threading.Thread(target=lambda: engine.connect().close())
+    waiter.start()
+    time.sleep(0.1)
+    assert metrics.snapshot()["waiting"] == 1  # Un checkout formado esperando la única conexión
+    holder.close()
+    waiter.join()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["waiting"] == 0
+    assert snapshot["max_waiting"] == 1
+    assert snapshot["queued_checkouts"] == 1
+    assert snapshot["checkouts"] == 2
+    assert snapshot["checkout_wait_max_ms"] >= 90
+
+
+def test_cuenta_los_timeouts(tiny_pool):
+    engine, metrics = tiny_pool
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+    assert metrics.snapshot()["timeouts"] == 1
+
+
+def test_sobrevive_a_dispose(tiny_pool):
+    engine, metrics = tiny_pool
+    engine.connect().close()
+    engine.dispose(close=False)  # Como post_fork en cada worker de gunicorn
+    engine.connect().close()
+    snapshot = metrics.snapshot()
+    assert snapshot["checkouts"] == 2
+    assert snapshot["checked_in"] == 1  # Del pool nuevo, no del que se descartó
+
+
+def test_contadores_exactos_con_muchos_hilos(tmp_path):
+    metrics = PoolMetrics("pruebas")
+    engine = create_engine(f"sqlite:///{tmp_path}/pool.db", poolclass=metrics.pool_class(QueuePool),
+                           pool_size=4, max_overflow=4, pool_timeout=30)
+    metrics.attach(engine)
+
+    def checkout_many():
+        for _ in range(200):
+            engine.connect().close()
+
+    threads = [threading.Thread(target=checkout_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["checkouts"] == 8 * 200
+    assert snapshot["waiting"] == 0
+    assert snapshot["connects"] <= 8
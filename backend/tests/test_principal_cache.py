@@ -0,0 +1,204 @@
+import time
+
+import fakeredis
+import pytest
+from sqlalchemy import event
+
+from app.core import principal_cache
+from app.core.config import settings
+from app.core.database import engine
+from app.core.principal import Principal
+from app.core.security import ACCESS_TOKEN_TYPE, decode_token
+from app.core import token_revocation
+from app.core.token_revocation import revoke_user_tokens
+from app.models.user_model import UserArea, UserRole
+
+
+@pytest.fixture(autouse=True)
+def single_worker(monkeypatch):
+    """La caché en memoria solo se usa con un worker (con varios, sin Redis, no hay caché)."""
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 1)
+    monkeypatch.setattr(principal_cache, "principal_cache", principal_cache._build_backend())
+
+
+@pytest.fixture
+def shared_redis(monkeypatch):
+    """Dos workers con la caché en el mismo Redis; este proceso de pruebas es el worker 0."""
+    server = fakeredis.FakeServer()
+    workers = []
+    for _ in range(2):
+        backend = principal_cache.RedisPrincipalBackend("redis://localhost", ttl_seconds=60)
+        backend._client = fakeredis.FakeRedis(server=server)
+        workers.append(backend)
+    monkeypatch.setattr(principal_cache, "principal_cache", workers[0])
+    return workers
+
+
+def deactivate_elsewhere(session, user) -> None:
+    """Otro worker desactiva al usuario: confirma en la BD, sin tocar la memoria de este worker."""
+    user.is_active = False
+    session.add(user)
+    session.commit()
+
+
+@pytest.fixture
+def user_queries():
+    """Cuántas consultas a la tabla de usuarios se hacen durante la prueba."""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM "user"' in statement or "FROM user" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    yield statements
+    event.remove(engine, "before_cursor_execute", count)
+
+
+def login(client, email="vocal@ceitm.mx", password="secreta123") -> dict:
+    response = client.post("/api/v1/login/access-token", data={"username": email, "password": password})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def refresh(client, refresh_token: str):
+    return client.post("/api/v1/login/refresh-token", json={"refresh_token": refresh_token})
+
+
+def role_in(tokens: dict) -> str:
+    return decode_token(tokens["access_token"], ACCESS_TOKEN_TYPE)["role"]
+
+
+@pytest.fixture
+def vocal(make_user):
+    return make_user(role=UserRole.VOCAL, area=UserArea.ACADEMICO, email="vocal@ceitm.mx")
+
+
+def test_renovaciones_seguidas_leen_la_bd_una_vez(client, vocal, user_queries):
+    tokens = login(client)
+    user_queries.clear()
+
+    for _ in range(3):
+        response = refresh(client, tokens["refresh_token"])
+        assert response.status_code == 200
+        tokens = response.json()
+
+    assert len(user_queries) == 1
+
+
+def test_cambio_de_rol_se_ve_en_la_siguiente_renovacion(client, vocal, make_user, auth_headers):
+    tokens = refresh(client, login(client)["refresh_token"]).json()  # Ya quedó en caché
+    admin = make_user(email="admin@ceitm.mx")
+
+    response = client.put(f"/api/v1/users/{vocal.id}", json={"role": "coordinador"}, headers=auth_headers(admin))
+    assert response.status_code == 200
+
+    assert role_in(refresh(client, tokens["refresh_token"]).json()) == "coordinador"
+
+
+def test_usuario_desactivado_o_borrado_no_renueva(client, vocal, make_user, auth_headers):
+    admin_headers = auth_headers(make_user(email="admin@ceitm.mx"))
+    first = refresh(client, login(client)["refresh_token"]).json()
+    second = login(client)
+
+    client.put(f"/api/v1/users/{vocal.id}", json={"is_active": False}, headers=admin_headers)
+    assert refresh(client, first["refresh_token"]).status_code == 401
+
+    client.delete(f"/api/v1/users/{vocal.id}", headers=admin_headers)
+    assert refresh(client, second["refresh_token"]).status_code == 401
+
+
+def test_foto_anterior_al_corte_de_revocacion_se_ignora(session, vocal):
+    """Otro worker invalidó (solo su copia) y aquí llega el corte sincronizado: se relee la BD."""
+    stale = Principal.from_user(vocal)
+    principal_cache.principal_cache.set(principal_cache.CachedPrincipal(stale, time.time()))
+    assert principal_cache.load_principal(session, vocal.id) is stale
+
+    vocal.role = UserRole.COORDINADOR
+    session.add(vocal)
+    session.commit()
+    revoke_user_tokens(vocal.id)  # Sin invalidate_principal: la copia de este worker sigue ahí
+
+    assert principal_cache.load_principal(session, vocal.id).role == UserRole.COORDINADOR
+
+
+def test_memoria_expira_y_respeta_el_limite():
+    backend = principal_cache.MemoryPrincipalBackend(ttl_seconds=60, max_entries=2)
+    entries = [principal_cache.CachedPrincipal(
+        Principal(id=i, email=f"{i}@ceitm.mx", full_name="U", role=UserRole.VOCAL, area=UserArea.ACADEMICO,
+                  career=None, is_active=True), time.time()) for i in range(3)]
+    for entry in entries:
+        backend.set(entry)
+
+    assert backend.get(0) is None  # Desalojado por LRU
+    assert backend.get(2) == entries[2]
+
+    backend.set(principal_cache.CachedPrincipal(entries[1].principal, time.time() - 61))
+    assert backend.get(1) is None  # Expirado
+
+
+def test_redis_compartida_entre_workers(vocal, shared_redis):
+    workers = shared_redis
+    entry = principal_cache.CachedPrincipal(Principal.from_user(vocal), time.time())
+    workers[0].set(entry)
+    assert workers[1].get(vocal.id) == entry
+
+    workers[1].delete(vocal.id)
+    assert workers[0].get(vocal.id) is None
+
+
+def test_desactivado_en_otro_worker_no_renueva(client, session, vocal, shared_redis):
+    tokens = refresh(client, login(client)["refresh_token"]).json()  # Ya quedó en la caché compartida
+    assert shared_redis[0].get(vocal.id) is not None
+
+    deactivate_elsewhere(session, vocal)
+    shared_redis[1].delete(vocal.id)  # invalidate_principal en el otro worker
+
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_foto_guardada_despues_de_invalidar_se_ignora(vocal, shared_redis):
+    """Un worker leyó la BD justo antes del cambio y guarda su foto después de la invalidación."""
+    read_before_change = time.time()
+    shared_redis[1].delete(vocal.id)
+    shared_redis[0].set(principal_cache.CachedPrincipal(Principal.from_user(vocal), read_before_change))
+
+    assert shared_redis[0].get(vocal.id) is None
+    assert shared_redis[1].get(vocal.id) is None
+
+
+def test_varios_workers_sin_redis_leen_la_bd(client, session, vocal, monkeypatch):
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 3)
+    monkeypatch.setattr(principal_cache, "principal_cache", principal_cache._build_backend())
+    assert isinstance(principal_cache.principal_cache, principal_cache.NullPrincipalBackend)
+
+    tokens = refresh(client, login(client)["refresh_token"]).json()
+    deactivate_elsewhere(session, vocal)  # Sin invalidar nada en este worker
+
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+@pytest.mark.parametrize("cache", ["redis", "varios workers sin redis"])
+def test_pestanas_no_renuevan_tras_revocar_en_otro_worker(client, vocal, make_user, auth_headers, monkeypatch,
+                                                         request, cache):
+    """La otra pestaña renueva justo después de la desactivación, antes de la sincronización de revocaciones."""
+    if cache == "redis":
+        request.getfixturevalue("shared_redis")
+    else:
+        monkeypatch.setattr(settings, "WEB_CONCURRENCY", 3)
+        monkeypatch.setattr(principal_cache, "principal_cache", principal_cache._build_backend())
+
+    first_tab = refresh(client, login(client)["refresh_token"]).json()  # En la caché compartida
+    second_tab = login(client)
+    admin_headers = auth_headers(make_user(email="admin@ceitm.mx"))
+
+    # El otro worker registra el corte en la BD y en SU memoria; la de este worker no se entera
+    local_cutoff = token_revocation.revocations.user_cutoff(vocal.id)
+    with monkeypatch.context() as other_worker:
+        other_worker.setattr(token_revocation, "revocations", token_revocation.RevocationSet())
+        response = client.put(f"/api/v1/users/{vocal.id}", json={"is_active": False}, headers=admin_headers)
+        assert response.status_code == 200
+    assert token_revocation.revocations.user_cutoff(vocal.id) == local_cutoff
+
+    assert refresh(client, second_tab["refresh_token"]).status_code == 401
+    assert refresh(client, first_tab["refresh_token"]).status_code == 401
@@ -0,0 +1,83 @@
+import fakeredis
+import pytest
+import redis
+from fastapi.testclient import TestClient
+from limits import parse
+from limits.storage import RedisStorage
+from limits.strategies import STRATEGIES
+from starlette.requests import Request
+
+from app.core import limiter as limiter_module
+from app.core.config import settings
+from app.core.limiter import get_client_ip
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def trusted_proxies(monkeypatch):
+    """Nginx en 10.0.0.0/8 (además de localhost); la lista se cachea, hay que limpiarla."""
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", "127.0.0.1,::1,10.0.0.0/8")
+    limiter_module._trusted_networks.cache_clear()
+    yield
+    limiter_module._trusted_networks.cache_clear()
+
+
+def request_from(peer: str, *forwarded_for: str) -> Request:
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded_for]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "client": (peer, 50000)})
+
+
+def test_peer_sin_confianza_ignora_x_forwarded_for():
+    assert get_client_ip(request_from("203.0.113.7", "198.51.100.1")) == "203.0.113.7"
+
+
+def test_proxy_de_confianza_toma_el_ultimo_salto_ajeno():
+    assert get_client_ip(request_from("10.0.0.5", "198.51.100.1")) == "198.51.100.1"
+    # Cadena cliente -> balanceador (10.0.0.9) -> nginx (10.0.0.5): se saltan los proxies propios
+    assert get_client_ip(request_from("10.0.0.5", "198.51.100.1, 10.0.0.9")) == "198.51.100.1"
+    # Varias cabeceras cuentan como una sola lista, en orden
+    assert get_client_ip(request_from("10.0.0.5", "198.51.100.1", "10.0.0.9")) == "198.51.100.1"
+
+
+def test_cliente_no_puede_falsificar_la_izquierda_de_la_cadena():
+    """Lo que manda el cliente queda a la izquierda de lo que agregó nuestro proxy."""
+    assert get_client_ip(request_from("10.0.0.5", "1.2.3.4, 198.51.100.1")) == "198.51.100.1"
+    assert get_client_ip(request_from("10.0.0.5", "no-es-ip, 198.51.100.1")) == "198.51.100.1"
+
+
+def test_cadena_vacia_o_solo_proxies_regresa_el_peer():
+    assert get_client_ip(request_from("10.0.0.5")) == "10.0.0.5"
+    assert get_client_ip(request_from("10.0.0.5", "10.0.0.9, ::1")) == "10.0.0.5"
+    assert get_client_ip(request_from("::1", "2001:db8::1")) == "2001:db8::1"
+
+
+def test_limite_de_login_por_ip_real_detras_del_proxy(make_user):
+    make_user(email="admin@ceitm.mx")
+    limit = parse(settings.RATE_LIMIT_LOGIN).amount
+
+    with TestClient(app, client=("10.0.0.5", 50000)) as client:
+        def login(ip: str):
+            return client.post("/api/v1/login/access-token", headers={"X-Forwarded-For": ip},
+                               data={"username": "admin@ceitm.mx", "password": "otra"})
+
+        assert [login("198.51.100.1").status_code for _ in range(limit)] == [401] * limit
+        assert login("198.51.100.1").status_code == 429
+        # Otro cliente detrás del mismo proxy tiene su propio contador
+        assert login("198.51.100.2").status_code == 401
+
+
+def test_contadores_compartidos_entre_workers_con_redis():
+    """Con RATE_LIMIT_STORAGE_URL, dos workers suman sobre los mismos contadores."""
+    server = fakeredis.FakeServer()
+    workers = []
+    for _ in range(2):
+        pool = redis.ConnectionPool(connection_class=fakeredis.FakeConnection, server=server)
+        storage = RedisStorage("redis://localhost", connection_pool=pool)
+        workers.append(STRATEGIES[settings.RATE_LIMIT_STRATEGY](storage))
+
+    limit = parse("3/minute")
+    assert workers[0].hit(limit, "ceitm", "198.51.100.1")
+    assert workers[1].hit(limit, "ceitm", "198.51.100.1")
+    assert workers[0].hit(limit, "ceitm", "198.51.100.1")
+    assert not workers[1].hit(limit, "ceitm", "198.51.100.1")
+    assert workers[1].hit(limit, "ceitm", "198.51.100.2")
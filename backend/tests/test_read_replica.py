@@ -0,0 +1,78 @@
+"""Ruteo a la réplica de lectura con dos BDs locales (la 'réplica' es otro archivo SQLite)."""
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, SQLModel, select
+
+from app.core import database
+from app.models.news_model import News
+
+
+def add_news(engine, title: str) -> None:
+    with Session(engine) as session:
+        session.add(News(title=title, slug=title.lower().replace(" ", "-"), excerpt="e", content="c"))
+        session.commit()
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    url = f"{tmp_path}/replica.db"
+    replica_engine = create_engine(f"sqlite:///{url}")
+    async_replica_engine = create_async_engine(f"sqlite+aiosqlite:///{url}")
+    SQLModel.metadata.create_all(replica_engine)
+    add_news(replica_engine, "Desde la replica")
+    add_news(database.engine, "Desde el primario")
+
+    monkeypatch.setattr(database, "replica_engine", replica_engine)
+    monkeypatch.setattr(database, "async_replica_engine", async_replica_engine)
+    monkeypatch.setattr(database, "_replica_down_until", 0.0)
+    yield
+    replica_engine.dispose()
+    asyncio.run(async_replica_engine.dispose())
+
+
+def read_titles(session: Session):
+    return [news.title for news in session.exec(select(News)).all()]
+
+
+def test_sesion_de_lectura_usa_la_replica(replica):
+    with database.read_session_scope() as session:
+        assert read_titles(session) == ["Desde la replica"]
+
+
+def test_endpoint_async_usa_la_replica(client, replica):
+    assert [n["title"] for n in client.get("/api/v1/noticias/public").json()] == ["Desde la replica"]
+
+
+def test_replica_caida_regresa_al_primario(replica, monkeypatch, tmp_path):
+    monkeypatch.setattr(database, "replica_engine", create_engine(f"sqlite:///{tmp_path}/no/existe.db"))
+    with database.read_session_scope() as session:
+        assert read_titles(session) == ["Desde el primario"]
+    # Tras el fallo se deja de intentar la réplica por READ_REPLICA_RETRY_SECONDS
+    assert not database._replica_available()
+
+
+@pytest.mark.parametrize("error", [ConnectionRefusedError(111, "Connection refused"), asyncio.TimeoutError()])
+def test_replica_async_caida_regresa_al_primario(client, replica, monkeypatch, error):
+    """asyncpg entrega el error de conexión crudo (sin OperationalError) y aun así se usa el primario."""
+    async def refuse():
+        raise error
+
+    down = create_async_engine("sqlite+aiosqlite://", async_creator=refuse)
+    monkeypatch.setattr(database, "async_replica_engine", down)
+
+    response = client.get("/api/v1/noticias/public")
+
+    assert response.status_code == 200
+    assert [n["title"] for n in response.json()] == ["Desde el primario"]
+    assert not database._replica_available()
+    asyncio.run(down.dispose())
+
+
+def test_sin_replica_lee_del_primario(monkeypatch):
+    add_news(database.engine, "Desde el primario")
+    monkeypatch.setattr(database, "replica_engine", None)
+    with database.read_session_scope() as session:
+        assert read_titles(session) == ["Desde el primario"]
@@ -0,0 +1,22 @@
+from app.core.config import Settings
+
+REQUIRED = dict(POSTGRES_USER="u", POSTGRES_PASSWORD="p", POSTGRES_DB="d", POSTGRES_SERVER="s",
+                POSTGRES_PORT="5432", DATABASE_URL="sqlite://", SECRET_KEY="k",
+                MAIL_USERNAME="m", MAIL_PASSWORD="m", MAIL_FROM="m@ceitm.mx", MAIL_SERVER="s")
+
+
+def total_connections(settings: Settings) -> int:
+    return settings.web_concurrency * 2 * (settings.db_pool_size + settings.db_max_overflow)
+
+
+def test_pool_derivado_cabe_en_el_presupuesto():
+    for workers in (1, 3, 5, 9, 17, 33):
+        settings = Settings(**REQUIRED, WEB_CONCURRENCY=workers)
+        assert settings.db_pool_size >= 1
+        if workers <= 20:  # Con más workers que presupuesto/4 manda el mínimo de 2 por motor
+            assert total_connections(settings) <= settings.DB_CONNECTION_BUDGET
+
+
+def test_pool_explicito_tiene_prioridad():
+    settings = Settings(**REQUIRED, WEB_CONCURRENCY=2, DB_POOL_SIZE=7, DB_MAX_OVERFLOW=3)
+    assert (settings.db_pool_size, settings.db_max_overflow) == (7, 3)
@@ -0,0 +1,125 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.attendance_model import Attendance, AttendanceStatus
+from app.models.career_model import Career
+from app.models.scholarship_model import ApplicationStatus, ScholarshipType
+from app.models.student_model import Student
+from app.models.user_model import UserArea, UserRole
+
+
+@pytest.fixture
+def headers(make_user, auth_headers):
+    return auth_headers(make_user(role=UserRole.VOCAL, area=UserArea.BECAS, email="becas@ceitm.mx"))
+
+
+@pytest.fixture
+def make_student(session):
+    def _make_student(control_number: str, full_name: str, career: Career = None) -> Student:
+        student = Student(control_number=control_number, full_name=full_name, email=f"{control_number}@ceitm.mx",
+                          career_id=career.id if career else None)
+        session.add(student)
+        session.commit()
+        return student
+    return _make_student
+
+
+def roster(client, headers, **params) -> dict:
+    response = client.get("/api/v1/students/", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def add_faults(session, control_number: str, days: list, status=AttendanceStatus.FALTA) -> None:
+    for day in days:
+        session.add(Attendance(student_id=control_number, date=day, status=status))
+    session.commit()
+
+
+def test_campos_por_alumno(client, session, headers, make_student, make_scholarship, make_application):
+    career = Career(name="Ingeniería en Sistemas Computacionales", slug="sistemas")
+    session.add(career)
+    session.commit()
+    make_student("20120001", "Ana", career)
+    now = datetime.utcnow()
+    food = make_scholarship(type=ScholarshipType.ALIMENTICIA, results_date=now - timedelta(days=10))
+    cle = make_scholarship(type=ScholarshipType.CLE, folio_identifier="CLE", results_date=now - timedelta(days=3))
+
+    # Dos servicios contados (uno liberado); la más reciente por fecha decide el tipo de beca
+    make_application(cle, "20120001", student_id="20120001", status=ApplicationStatus.APROBADA,
+                     created_at=now - timedelta(days=1))
+    make_application(food, "20120001", student_id="20120001", status=ApplicationStatus.LIBERADA,
+                     created_at=now - timedelta(days=30))
+    # Pendientes y rechazadas no cuentan ni deciden la beca vigente
+    make_application(food, "20120001", student_id="20120001", status=ApplicationStatus.RECHAZADA, created_at=now)
+
+    today = date.today()
+    monday = today - timedelta(days=today.weekday())
+    add_faults(session, "20120001", [monday, monday + timedelta(days=1)])
+    add_faults(session, "20120001", [monday - timedelta(days=7)])  # Semana pasada
+    add_faults(session, "20120001", [monday + timedelta(days=2)], status=AttendanceStatus.JUSTIFICADO)
+
+    [item] = roster(client, headers)["items"]
+
+    assert item["scholarship_type"] == ScholarshipType.CLE.value
+    assert item["days_active"] == 3
+    assert item["total_services"] == 2
+    assert item["released_services"] == 1
+    assert item["current_week_faults"] == 2
+    assert item["career"] == "Ingeniería en Sistemas Computacionales"
+    assert item["career_rel"] == {"name": "Ingeniería en Sistemas Computacionales"}
+
+
+def test_solo_becarios_aprobados_o_liberados(client, headers, make_student, make_scholarship, make_application):
+    scholarship = make_scholarship()
+    make_student("20120001", "Ana")
+    make_student("20120002", "Beto")
+    make_student("20120003", "Carla")  # Sin solicitudes
+    make_application(scholarship, "20120001", student_id="20120001", status=ApplicationStatus.APROBADA)
+    make_application(scholarship, "20120002", student_id="20120002", status=ApplicationStatus.PENDIENTE)
+
+    page = roster(client, headers)
+
+    assert page["total"] == 1
+    assert [item["control_number"] for item in page["items"]] == ["20120001"]
+    assert page["items"][0]["current_week_faults"] == 0
+    assert page["items"][0]["career"] is None
+
+
+@pytest.fixture
+def three_students(make_student, make_scholarship, make_application):
+    scholarship = make_scholarship()
+    for control_number, name in (("20120001", "Ana López"), ("20120002", "Beto Ruiz"), ("19120003", "Carla López")):
+        make_student(control_number, name)
+        make_application(scholarship, control_number, student_id=control_number, status=ApplicationStatus.APROBADA)
+
+
+def test_busqueda_y_orden(client, headers, three_students):
+    by_name = roster(client, headers, search="lópez", sort_by="name_asc")
+    assert by_name["total"] == 2
+    assert [item["full_name"] for item in by_name["items"]] == ["Ana López", "Carla López"]
+
+    by_control = roster(client, headers, search="2012")
+    assert by_control["total"] == 2
+    assert [item["control_number"] for item in by_control["items"]] == ["20120002", "20120001"]
+
+    assert roster(client, headers, search="nadie") == {"total": 0, "items": []}
+
+
+def test_total_con_pagina_fuera_de_rango(client, headers, three_students):
+    first = roster(client, headers, limit=2, sort_by="control_asc")
+    assert first["total"] == 3
+    assert [item["control_number"] for item in first["items"]] == ["19120003", "20120001"]
+
+    # Página vacía: el total se cuenta aparte y no se pierde
+    assert roster(client, headers, skip=10, limit=2) == {"total": 3, "items": []}
+
+
+def test_padron_vacio(client, headers):
+    assert roster(client, headers) == {"total": 0, "items": []}
+
+
+def test_sin_permiso(client, make_user, auth_headers):
+    headers = auth_headers(make_user(role=UserRole.VOCAL, area=UserArea.ACADEMICO, email="vocal@ceitm.mx"))
+    assert client.get("/api/v1/students/", headers=headers).status_code == 403
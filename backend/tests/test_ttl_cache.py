@@ -0,0 +1,72 @@
+import fakeredis
+import pytest
+
+from app.core.cache import TTLCache
+
+
+def make_cache(**kwargs) -> TTLCache:
+    return TTLCache("pruebas", ttl_seconds=60, **kwargs)
+
+
+def shared_caches(count: int, **kwargs):
+    """Varias instancias (como varios workers) sobre el mismo Redis falso."""
+    server = fakeredis.FakeServer()
+    caches = []
+    for _ in range(count):
+        cache = make_cache(**kwargs)
+        cache._redis = fakeredis.FakeRedis(server=server)
+        caches.append(cache)
+    return caches
+
+
+def test_guarda_hasta_invalidar():
+    cache = make_cache()
+    calls = []
+    loader = lambda: calls.append(1) or len(calls)
+    assert cache.get_or_set("k", loader) == 1
+    assert cache.get_or_set("k", loader) == 1
+    cache.invalidate()
+    assert cache.get_or_set("k", loader) == 2
+
+
+def test_tras_invalidar_usa_fresh_loader():
+    cache = make_cache(fresh_seconds=60)
+    assert cache.get_or_set("k", lambda: "réplica", fresh_loader=lambda: "primario") == "réplica"
+    cache.invalidate()
+    assert cache.get_or_set("k", lambda: "réplica", fresh_loader=lambda: "primario") == "primario"
+
+
+def test_no_guarda_valor_calculado_antes_de_una_invalidacion():
+    cache = make_cache()
+
+    def slow_loader():
+        cache.invalidate()  # Un cambio llega mientras se calcula
+        return "viejo"
+
+    assert cache.get_or_set("k", slow_loader) == "viejo"
+    assert cache.get_or_set("k", lambda: "nuevo") == "nuevo"
+
+
+def test_redis_comparte_invalidacion_entre_workers():
+    worker_a, worker_b = shared_caches(2, fresh_seconds=60)
+    assert worker_a.get_or_set("k", lambda: [1]) == [1]
+    assert worker_b.get_or_set("k", lambda: pytest.fail("debió salir de Redis")) == [1]
+
+    worker_a.invalidate()
+    assert worker_b.get_or_set("k", lambda: [2], fresh_loader=lambda: [3]) == [3]
+    assert worker_a.get_or_set("k", lambda: pytest.fail("debió salir de Redis")) == [3]
+
+
+def test_endpoint_refleja_asignaciones(client, session, make_user, auth_headers, make_scholarship, make_application):
+    from app.models.scholarship_model import ApplicationStatus, Cafeteria
+
+    cafeteria = Cafeteria(nombre="Cafetería 1", campus="1", limite_becas=10)
+    session.add(cafeteria)
+    session.commit()
+    application = make_application(make_scholarship(), "00000001")
+
+    assert client.get("/api/v1/becas/cafeterias").json()[0]["becas_asignadas"] == 0
+    response = client.patch(f"/api/v1/becas/applications/{application.id}", headers=auth_headers(make_user()),
+                            json={"status": ApplicationStatus.APROBADA.value, "cafeteria_asignada_id": cafeteria.id})
+    assert response.status_code == 200
+    assert client.get("/api/v1/becas/cafeterias").json()[0]["becas_asignadas"] == 1
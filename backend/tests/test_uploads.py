@@ -0,0 +1,93 @@
+import io
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from sqlmodel import select
+
+from app.core.config import settings
+from app.models.blob_model import StoredBlob
+from app.services import upload_service
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+PDF = b"%PDF-1.4\n" + b"x" * 64
+
+
+@pytest.fixture(autouse=True)
+def blob_dir(tmp_path, monkeypatch):
+    """El almacén usa rutas relativas (static/blobs): las pruebas escriben en un directorio temporal."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def stored_path(url: str) -> Path:
+    return Path(url.removeprefix(f"{settings.DOMAIN}/"))
+
+
+@pytest.mark.parametrize("head, expected", [
+    (b"\xff\xd8\xff\xe0\x00\x10JFIF", "jpg"),
+    (PNG, "png"),
+    (b"GIF89a\x01\x00", "gif"),
+    (b"RIFF\x24\x00\x00\x00WEBPVP8 ", "webp"),
+    (PDF, "pdf"),
+    (b"PK\x03\x04\x14\x00", "zip"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1\x00", "ole"),
+    (b"<html><script>", None),
+    (b"", None),
+])
+def test_firma_del_archivo(head, expected):
+    assert upload_service.sniff_file_type(head) == expected
+
+
+def test_subir_imagen(client, session):
+    response = client.post("/api/v1/utils/upload-image", files={"file": ("foto.png", PNG, "image/png")})
+
+    assert response.status_code == 200
+    url = response.json()["url"]
+    assert url.endswith(".png")
+    assert stored_path(url).read_bytes() == PNG
+    assert session.exec(select(StoredBlob)).one().ref_count == 1
+
+
+def test_mismo_contenido_se_guarda_una_vez(client, session):
+    urls = [client.post("/api/v1/utils/upload/file", files={"file": (name, PDF, "application/pdf")}).json()
+            for name in ("ine.pdf", "copia-del-ine.pdf")]
+
+    assert urls[0] == urls[1]
+    assert session.exec(select(StoredBlob)).one().ref_count == 2
+
+
+def test_el_tipo_lo_decide_la_firma_y_no_el_cliente(client, blob_dir):
+    response = client.post("/api/v1/utils/upload-image",
+                           files={"file": ("foto.png", b"<html><script>alert(1)</script>", "image/png")})
+
+    assert response.status_code == 400
+    assert [path for path in blob_dir.rglob("*") if path.is_file()] == []
+
+
+def test_documento_office_conserva_su_extension(client):
+    url = client.post("/api/v1/utils/upload/file",
+                      files={"file": ("oficio.docx", b"PK\x03\x04" + b"\x00" * 32, "application/octet-stream")}).json()
+    assert url.endswith(".docx")
+
+
+def test_content_length_excedido_se_rechaza_antes_de_leer(client, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_MAX_IMAGE_BYTES", 1024)
+    big = PNG + b"\x00" * (200 * 1024)
+
+    response = client.post("/api/v1/utils/upload-image", files={"file": ("foto.png", big, "image/png")})
+
+    assert response.status_code == 413
+
+
+def test_limite_se_aplica_mientras_se_copia(session, blob_dir, monkeypatch):
+    """Sin Content-Length confiable (chunked) el corte ocurre al pasar el límite, sin dejar temporales."""
+    monkeypatch.setattr(upload_service, "CHUNK_SIZE", 16)
+    upload = UploadFile(io.BytesIO(PDF + b"y" * 1024), filename="grande.pdf")
+
+    with pytest.raises(HTTPException) as error:
+        upload_service.store_upload(upload, upload_service.DOCUMENT_TYPES, max_bytes=512)
+
+    assert error.value.status_code == 413
+    assert [path for path in blob_dir.rglob("*") if path.is_file()] == []
+    assert session.exec(select(StoredBlob)).all() == []
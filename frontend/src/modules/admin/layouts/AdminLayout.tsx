@@ -21,6 +21,7 @@ import {
 } from 'lucide-react';
 import { useAuthStore } from '../../../shared/store/authStore';
 import { usePermissions } from '../../../shared/hooks/usePermissions';
+import { logoutSession } from '../../../shared/services/api';
 import { IMAGES } from "../../../shared/config/constants";
 
 export const AdminLayout = () => {
@@ -63,6 +64,7 @@ export const AdminLayout = () => {
   };
 
   const handleLogout = () => {
+    logoutSession();
     logout();
     navigate('/login');
   };
@@ -66,7 +66,7 @@ export const LoginPage = () => {
       const tokenData = await login(formData.email, formData.password);
       const token = tokenData.access_token;
 
-      setToken(token);
+      setToken(token, tokenData.refresh_token);
 
       try {
           const userData = await getCurrentUser();
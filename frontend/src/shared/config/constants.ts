@@ -26,6 +26,8 @@ export const DOMAIN_URL = IS_PRODUCTION ? 'http://ceitm.ddnsking.com' : 'http://
 export const ENDPOINTS = {
     AUTH: {
         LOGIN: '/login/access-token',
+        REFRESH: '/login/refresh-token', // POST { refresh_token } -> tokens nuevos
+        LOGOUT: '/login/logout',
         ME: '/users/me',
     },
     USERS: {
@@ -29,6 +29,67 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// El access token dura pocos minutos: ante un 401 se renueva con el refresh token
+// y se repite la petición una vez. Una sola renovación a la vez para todas las peticiones.
+let refreshing: Promise<string | null> | null = null;
+
+// Tokens tal como están en localStorage ahora mismo (otra pestaña pudo haberlos rotado)
+const readPersistedTokens = (): { token: string | null; refreshToken: string | null } => {
+  try {
+    const state = JSON.parse(localStorage.getItem('auth-storage') ?? '{}').state ?? {};
+    return { token: state.token ?? null, refreshToken: state.refreshToken ?? null };
+  } catch {
+    return { token: null, refreshToken: null };
+  }
+};
+
+// Si otra pestaña ganó la rotación, su respuesta puede tardar un poco más que nuestro 401
+const ROTATION_GRACE_MS = 1500;
+
+const adoptTokensFromOtherTab = async (usedRefreshToken: string): Promise<string | null> => {
+  const deadline = Date.now() + ROTATION_GRACE_MS;
+  for (;;) {
+    const persisted = readPersistedTokens();
+    if (persisted.token && persisted.refreshToken && persisted.refreshToken !== usedRefreshToken) {
+      useAuthStore.getState().setToken(persisted.token, persisted.refreshToken);
+      return persisted.token;
+    }
+    if (!persisted.refreshToken || Date.now() >= deadline) return null; // Sesión cerrada o sin rotación
+    await new Promise((resolve) => setTimeout(resolve, 250));
+  }
+};
+
+const refreshAccessToken = async (): Promise<string | null> => {
+  const { refreshToken, setToken, logout } = useAuthStore.getState();
+  if (!refreshToken) return null;
+  try {
+    const response = await axios.post(`${API_BASE_URL}${ENDPOINTS.AUTH.REFRESH}`, { refresh_token: refreshToken });
+    setToken(response.data.access_token, response.data.refresh_token);
+    return response.data.access_token;
+  } catch {
+    // Cada refresh token sirve una sola vez: si otra pestaña ya lo usó, se toman los suyos
+    const token = await adoptTokensFromOtherTab(refreshToken);
+    if (!token) logout();
+    return token;
+  }
+};
+
+api.interceptors.response.use(
+  (response) => response,
+  async (error) => {
+    const original = error.config;
+    if (error.response?.status !== 401 || !original || original._retry || original.url === ENDPOINTS.AUTH.LOGIN) {
+      return Promise.reject(error);
+    }
+    original._retry = true;
+    refreshing = refreshing ?? refreshAccessToken().finally(() => { refreshing = null; });
+    const token = await refreshing;
+    if (!token) return Promise.reject(error);
+    original.headers.Authorization = `Bearer ${token}`;
+    return api(original);
+  }
+);
+
 // --- USUARIOS & AUTH ---
 export const login = async (username: string, password: string) => {
   const formData = new FormData();
@@ -38,6 +99,14 @@ export const login = async (username: string, password: string) => {
   return response.data;
 };
 
+// Revoca el refresh token en el servidor (no esperamos la respuesta para salir)
+export const logoutSession = () => {
+  const refreshToken = useAuthStore.getState().refreshToken;
+  if (refreshToken) {
+    api.post(ENDPOINTS.AUTH.LOGOUT, { refresh_token: refreshToken }).catch(() => {});
+  }
+};
+
 export const getCurrentUser = async () => {
   const response = await api.get(ENDPOINTS.AUTH.ME);
   return response.data;
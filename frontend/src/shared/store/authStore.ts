@@ -19,11 +19,12 @@ export interface User {
 
 interface AuthState {
   token: string | null;
+  refreshToken: string | null; // Para renovar el token corto sin volver a pedir contraseña
   user: User | null;
   isAuthenticated: boolean;
 
   // Acciones
-  setToken: (token: string) => void;
+  setToken: (token: string, refreshToken?: string | null) => void;
   setUser: (user: User) => void;
   logout: () => void;
 }
@@ -32,22 +33,40 @@ export const useAuthStore = create<AuthState>()(
   persist(
     (set) => ({
       token: null,
+      refreshToken: null,
       user: null,
       isAuthenticated: false,
 
-      setToken: (token: string) =>
-        set({ token, isAuthenticated: !!token }),
+      setToken: (token: string, refreshToken?: string | null) =>
+        set((state) => ({
+          token,
+          refreshToken: refreshToken === undefined ? state.refreshToken : refreshToken,
+          isAuthenticated: !!token,
+        })),
 
       setUser: (user: User) =>
         set({ user }),
 
       logout: () => {
         localStorage.removeItem('token'); // Limpiar token crudo si lo usabas
-        set({ token: null, user: null, isAuthenticated: false });
+        set({ token: null, refreshToken: null, user: null, isAuthenticated: false });
       },
     }),
     {
       name: 'auth-storage', // Nombre para guardar en localStorage automáticamente
     }
   )
-);
\ No newline at end of file
+);
+
+// Varias pestañas comparten 'auth-storage': cuando otra renueva o cierra la sesión,
+// esta adopta los tokens nuevos en lugar de seguir usando un refresh token ya rotado.
+if (typeof window !== 'undefined') {
+  window.addEventListener('storage', (event) => {
+    if (event.key !== 'auth-storage') return;
+    if (event.newValue === null) {
+      useAuthStore.setState({ token: null, refreshToken: null, user: null, isAuthenticated: false });
+    } else {
+      useAuthStore.persist.rehydrate();
+    }
+  });
+}
@@ -67,6 +67,7 @@ export interface LoginCredentials {
 export interface AuthResponse {
   access_token: string;
   token_type: string;
+  refresh_token?: string;
   user: User;
 }
 